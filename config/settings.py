@@ -11,6 +11,9 @@ CATALOG_URL = f"{BASE_URL}/catalogue/"
 BASKET_URL = f"{BASE_URL}/basket/"
 REGISTER_URL = f"{BASE_URL}/accounts/register/"
 MAIN_PAGE_URL = BASE_URL + "/"
+CHECKOUT_URL = f"{BASE_URL}/checkout/"
+SHIPPING_ADDRESS_URL = f"{BASE_URL}/checkout/shipping-address/"
+PAYMENT_DETAILS_URL = f"{BASE_URL}/checkout/payment-details/"
 
 # Product URLs for specific tests
 PRODUCT_URLS = {
@@ -40,6 +43,11 @@ NEW_USER = {
     "confirm_password": "newpassword123"
 }
 
+# Pre-provisioned accounts leased one per test (see utils/user_pool.py)
+USER_POOL_SIZE = 8
+USER_POOL_PROVISION_TIMEOUT = 300   # Seconds to wait for bulk registration
+USER_POOL_LEASE_TIMEOUT = 120       # Seconds to wait for a free pooled user
+
 # Empty credentials
 EMPTY_USER = {
     "email": "",
@@ -61,6 +69,9 @@ DEFAULT_LANGUAGE = "en"      # Default browser language
 WINDOW_WIDTH = 1920
 WINDOW_HEIGHT = 1080
 
+# Pages loaded into the pre-warmed profile template (--profile-template)
+PROFILE_WARMUP_URLS = [MAIN_PAGE_URL, CATALOG_URL, LOGIN_URL, BASKET_URL]
+
 # ==================== TEST DATA ====================
 # Product data for tests
 PRODUCTS = {
@@ -73,9 +84,29 @@ PRODUCTS = {
         "title": "The City and the Stars",
         "price": "£10.99",
         "stock": True
+    },
+    "coders_at_work": {
+        "title": "Coders at Work",
+        "price": "£19.99",
+        "stock": True
     }
 }
 
+# Product index built by crawling the catalogue (utils/catalogue_index.py)
+PRODUCT_INDEX_TTL = 24 * 3600     # Seconds before the catalogue is crawled again
+PRODUCT_INDEX_FALLBACK_TTL = 600  # Seconds the settings fallback (crawl failed) is reused before crawling again
+CRAWLER_WORKERS = 8               # Concurrent catalogue/API requests while crawling
+
+# Shipping address used by checkout flows (form field name -> value)
+SHIPPING_ADDRESS = {
+    "first_name": "Test",
+    "last_name": "Customer",
+    "line1": "1 Test Street",
+    "line4": "London",
+    "postcode": "SW1A 1AA",
+    "country": "GB",
+}
+
 # Promo codes (based on bugs you found!)
 PROMO_CODES = {
     "valid": "OFFER20",
@@ -92,16 +123,99 @@ ALLURE_RESULTS_DIR = "allure-results"
 # Test data paths
 TEST_DATA_PATH = "data/data_manager.json"
 
+# Streaming case sources (data/cases/*.jsonl|csv) are split into at most this many shards, none empty
+CASE_SHARDS = 8
+
+# Seed for generated negative-input corpora (data/generators.py)
+CORPUS_SEED = 20240101
+
+# State shared by xdist workers and kept across runs (user pool, run directories)
+RUN_ARTIFACTS_DIR = ".run"
+RUN_DIRS_TO_KEEP = 10
+
 # ==================== TEST CONFIGURATION ====================
 # Slow test threshold in seconds
 SLOW_TEST_THRESHOLD = 5.0
 
-# Retry configuration for flaky tests
-RETRY_COUNT = 2
-RETRY_DELAY = 1
+# Reruns of known-flaky tests (utils/rerun_policy.py), run at the end of the run
+RETRY_COUNT = 2                    # Reruns unless the test sets @pytest.mark.flaky(reruns=N)
+FLAKY_HISTORY_RUNS = 30            # Latest runs a test's flake rate is computed over
+FLAKY_RATE_THRESHOLD = 0.05        # Unmarked tests with a higher flake rate count as known-flaky
+
+# Results warehouse (utils/results_db.py)
+RESULTS_DB_RUNS_TO_KEEP = 200      # Older runs are deleted from .run/results.db
+SCHEDULE_HISTORY_RUNS = 10         # Runs averaged to order tests longest-first
+
+# Allure reporting of low-level helpers (utils/step_reporting.py)
+HELPER_STEP_MODE = "collapsed"     # full | collapsed | sampled, overridden by --helper-steps
+HELPER_STEP_SAMPLE_EVERY = 50      # In sampled mode one helper call in N becomes an Allure step
+HELPER_STEP_BUFFER_SIZE = 200      # Helper calls and deferred attachments kept per test for failures
+
+# ==================== FUZZING ====================
+FUZZ_MAX_IN_FLIGHT = 32            # Concurrent requests per fuzz run
+FUZZ_REQUEST_TIMEOUT = 15          # Seconds before a request counts as transport_error
+FUZZ_CASES_PER_KIND = 1000         # Generated payloads per corpus kind
+FUZZ_TIMING_FACTOR = 5.0           # Latency above median * factor is a timing anomaly...
+FUZZ_TIMING_MIN_SECONDS = 1.0      # ...but only when it is also above this absolute floor
+FUZZ_BODY_SCAN_BYTES = 20000       # Response characters scanned for stack traces
+FUZZ_MINIMIZE_LIMIT = 10           # Findings minimized after a run
+
+# ==================== API LATENCY ====================
+API_LATENCY_HISTORY_RUNS = 20      # Earlier runs in .run/results.db whose p95 make up the baseline
+API_LATENCY_MIN_HISTORY = 3        # Runs needed before an endpoint has a baseline
+API_LATENCY_MIN_SAMPLES = 5        # Requests per run needed to store or judge an endpoint
+API_LATENCY_TOLERANCE = 0.5        # p95 more than 50% above the baseline p95...
+API_LATENCY_MIN_DELTA_MS = 100     # ...and at least this much slower is a regression
+
+# ==================== API CACHE ====================
+API_CACHEABLE_ENDPOINTS = ("products", "countries", "options")   # API_ENDPOINTS names served from cache
+API_CACHE_TTL = 300                # Seconds a cached response is used without revalidation
+API_CACHE_MAX_ENTRIES = 256        # In-memory LRU size per worker
+
+# ==================== CIRCUIT BREAKER ====================
+HEALTH_CHECK_URL = MAIN_PAGE_URL
+HEALTH_CHECK_TIMEOUT = 10          # Seconds; a slower answer counts as the site being down
+CIRCUIT_BREAKER_THRESHOLD = 5      # Consecutive connectivity failures (all workers) that open the breaker
+CIRCUIT_BREAKER_BACKOFF = (15, 30, 60, 120)  # Seconds before each re-probe; abort when all fail
+ENVIRONMENT_FAILURE_EXIT_CODE = 6  # Exit status when the run is aborted because the site is down
+
+# ==================== SCREENSHOTS ====================
+SCREENSHOT_FORMAT = "webp"         # webp | avif | png (256 colours) for failure screenshots
+SCREENSHOT_QUALITY = 80            # WebP/AVIF quality
+SCREENSHOT_DEDUPE_DISTANCE = 4     # dHash bits (of 64) within which two screenshots count as the same
+SCREENSHOT_ENCODE_WORKERS = 2      # Encoder threads per worker
+STEP_SCREENSHOT_BUFFER = 0         # Step screenshots kept per test for failures, 0 = off (--step-screenshots)
+
+# ==================== VISUAL BASELINES ====================
+VISUAL_BASELINE_DIR = "data/visual_baselines"   # <browser>-<width>x<height>/<name>.png plus index.json
+VISUAL_PIXEL_TOLERANCE = 16        # Largest channel difference (0-255) still counted as the same pixel
+VISUAL_MAX_DIFF_RATIO = 0.001      # Share of unmasked pixels allowed to differ
+
+# ==================== NETWORK CAPTURE ====================
+NETWORK_DRAIN_INTERVAL = 1.0       # Seconds between reads of Chrome's performance log during a test
+NETWORK_MAX_INFLIGHT = 500         # Unfinished requests held in memory; the oldest is dropped beyond this
+NETWORK_MAX_ENTRIES = 5000         # Entries written per test; later requests are only counted
+NETWORK_MAX_BODY_BYTES = 64 * 1024 # Characters of an XHR/fetch response body kept (--network-bodies)
+NETWORK_SLOWEST_COUNT = 5          # Slowest requests listed in the summary
+
+# ==================== BROWSER TELEMETRY ====================
+TELEMETRY_INTERVAL = 2.0           # Seconds between RSS/CPU/JS heap samples of the running browser
+TELEMETRY_MAX_RSS_MB = 2048        # Driver + browser process tree above this is reported as over its limit...
+TELEMETRY_MAX_JS_HEAP_MB = 512     # ...and so is a page whose used JS heap grew above this
+TELEMETRY_QUIT_TIMEOUT = 30        # Seconds driver.quit may take before the watchdog kills the process tree
+TELEMETRY_EXIT_GRACE = 3           # Seconds after quit before remaining browser processes are killed
+TELEMETRY_TOP_TESTS = 5            # Tests with the highest peak RSS listed in the run summary
 
 # ==================== LOGGING CONFIGURATION ====================
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_CONSOLE_FORMAT = "%(asctime)s [%(levelname)8s] %(message)s"
+LOG_CONSOLE_DATE_FORMAT = "%H:%M:%S"
+
+# Background writer for logs and Allure files (utils/async_writer.py)
+ASYNC_WRITER_QUEUE_SIZE = 10000    # Queued records and files; INFO/DEBUG records are dropped when full
+ASYNC_WRITER_BLOCK_SECONDS = 1.0   # WARNING+ records wait this long for room before being dropped
+ASYNC_WRITER_MAX_PENDING_BYTES = 64 * 1024 * 1024  # Queued file bytes; beyond that files are written inline
+ASYNC_WRITER_BATCH_SIZE = 500      # Queue items written per write/flush
 
 
@@ -5,14 +5,31 @@ Pytest configuration with settings integration
 import pytest
 import logging
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.firefox import GeckoDriverManager
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
+import json
 import time
 from data.api_endpoints import API_ENDPOINTS
+from utils.api_cache import api_cache
+from utils.async_writer import AsyncWriter, AsyncWriterPlugin
+from utils.api_timing import LatencyHistory, api_timings, slow_test_requests
+from utils.basket_seeder import BasketSeeder
+from utils.catalogue_index import known_products, load_product_index
+from utils.circuit_breaker import CircuitBreaker, CircuitBreakerPlugin, preflight
+from utils.network_capture import NetworkCapturePlugin, capture_path, enable_network_log, network_capture
+from utils.rerun_policy import ResultsHistory, RerunPolicy
+from utils.results_db import ResultsDB, ResultsRecorder, count_webdriver_commands, order_longest_first
+from utils.browser_telemetry import BrowserTelemetryPlugin, browser_monitor
+from utils.browser_profile import ProfileTemplate, build_chrome_options
+from utils.screenshots import ScreenshotPlugin
+from utils.run_context import artifacts_dir, init_run_id, prune_old_runs, run_dir, worker_id
+from utils.step_reporting import MODES as HELPER_STEP_MODES, HelperStepPlugin, attach_detail
+from utils.tracing import TimelinePlugin, tracer
+from utils.visual import visual_baselines
+from utils.user_pool import UserPool
 import allure
 
 # Import project settings
@@ -25,11 +42,8 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).parent
 sys.path.insert(0, str(ROOT_DIR))
 
-# Setup logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format=settings.LOG_FORMAT
-)
+# Logging is routed through the async writer in pytest_configure
+logging.getLogger().setLevel(getattr(logging, settings.LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
 
@@ -53,6 +67,169 @@ def pytest_addoption(parser):
         default=settings.DEFAULT_LANGUAGE,
         help='Browser language: en, ru, es, etc.'
     )
+    parser.addoption(
+        '--profile-template',
+        action='store_true',
+        default=False,
+        help='Launch Chrome from copies of a pre-warmed profile template'
+    )
+    parser.addoption(
+        '--fuzz',
+        action='store_true',
+        default=False,
+        help='Run tests marked fuzz (high-volume API fuzzing)'
+    )
+    parser.addoption(
+        '--visual',
+        action='store_true',
+        default=False,
+        help='Run tests marked visual (screenshot comparisons against data/visual_baselines)'
+    )
+    parser.addoption(
+        '--catalogue',
+        action='store_true',
+        default=False,
+        help='Parametrize catalogue_product over every crawled product instead of the known ones'
+    )
+    parser.addoption(
+        '--no-longest-first',
+        action='store_true',
+        default=False,
+        help='Keep collection order instead of running historically slow tests first'
+    )
+    parser.addoption(
+        '--timeline',
+        action='store_true',
+        default=False,
+        help='Record fixture, page and step spans into a Chrome trace of the run (timeline.json)'
+    )
+    parser.addoption(
+        '--helper-steps',
+        choices=HELPER_STEP_MODES,
+        default=settings.HELPER_STEP_MODE,
+        help='Allure reporting of low-level page helpers: every call, only on failure, or sampled'
+    )
+    parser.addoption(
+        '--step-screenshots',
+        type=int,
+        default=settings.STEP_SCREENSHOT_BUFFER,
+        metavar='N',
+        help='Keep screenshots of the last N top-level steps of each test and attach them when it fails'
+    )
+    parser.addoption(
+        '--update-baselines',
+        action='store_true',
+        default=False,
+        help='Write visual baselines (missing or changed) from the current screenshots'
+    )
+    parser.addoption(
+        '--network-capture',
+        action='store_true',
+        default=False,
+        help='Record the browser\'s requests per test (Chrome); kept for failed or slow tests'
+    )
+    parser.addoption(
+        '--network-bodies',
+        action='store_true',
+        default=False,
+        help='With --network-capture, also record XHR/fetch response bodies'
+    )
+    parser.addoption(
+        '--no-browser-telemetry',
+        action='store_true',
+        default=False,
+        help='Do not sample browser memory/CPU (the driver.quit watchdog stays on)'
+    )
+    parser.addoption(
+        '--sync-logging',
+        action='store_true',
+        default=False,
+        help='Write logs and Allure files in the test thread instead of the background writer'
+    )
+    parser.addoption(
+        '--no-preflight',
+        action='store_true',
+        default=False,
+        help='Do not probe the shop before the run'
+    )
+    parser.addoption(
+        '--fail-on-latency-regression',
+        action='store_true',
+        default=False,
+        help='Fail the run when an API endpoint p95 regresses against earlier runs'
+    )
+
+
+def pytest_configure(config):
+    """
+    Pick the run id before xdist spawns workers so they inherit it, start the background
+    log and artifact writer and probe the shop. Then register the plugins:
+    - results warehouse and reruns of known-flaky tests
+    - span timeline (--timeline) and the run-wide circuit breaker
+    - helper step reporting, failure screenshots and visual baseline updates
+    - network capture (--network-capture) and browser telemetry
+    """
+    if not hasattr(config, "workerinput"):
+        init_run_id()
+        prune_old_runs()
+    if config.getoption("--sync-logging"):
+        logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL), format=settings.LOG_FORMAT)
+    else:
+        writer = AsyncWriter()
+        writer.install(run_dir() / "logs" / f"{worker_id()}.log", console=not hasattr(config, "workerinput"))
+        config.pluginmanager.register(AsyncWriterPlugin(writer), "async_writer")
+    if not (hasattr(config, "workerinput") or config.option.collectonly or config.getoption("--no-preflight")):
+        preflight()
+    results_db = ResultsDB()
+    config.pluginmanager.register(ResultsRecorder(results_db), "results_recorder")
+    config.pluginmanager.register(RerunPolicy(ResultsHistory(results_db)), "rerun_policy")
+    if config.getoption("--timeline"):
+        config.pluginmanager.register(TimelinePlugin(), "timeline")
+    config.pluginmanager.register(CircuitBreakerPlugin(CircuitBreaker(run_dir() / "circuit_breaker.json")),
+                                  "circuit_breaker")
+    config.pluginmanager.register(HelperStepPlugin(config.getoption("--helper-steps")), "helper_steps")
+    config.pluginmanager.register(ScreenshotPlugin(config.getoption("--step-screenshots")), "screenshots")
+    visual_baselines.update = config.getoption("--update-baselines")
+    if config.getoption("--network-capture"):
+        config.pluginmanager.register(NetworkCapturePlugin(), "network_capture")
+    config.pluginmanager.register(BrowserTelemetryPlugin(not config.getoption("--no-browser-telemetry")),
+                                  "browser_telemetry")
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize catalogue_product with known products, or the whole crawled catalogue with --catalogue"""
+    if "catalogue_product" not in metafunc.fixturenames:
+        return
+    products = list(load_product_index()) if metafunc.config.getoption("--catalogue") else known_products()
+    metafunc.parametrize("catalogue_product", products, ids=[f"{p['id']}-{p['slug']}" for p in products])
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip opt-in test groups unless their option is given; run historically slow tests first"""
+    if not config.getoption("--no-longest-first"):
+        results_db = config.pluginmanager.get_plugin("results_recorder").db
+        order_longest_first(items, results_db.mean_durations(settings.SCHEDULE_HISTORY_RUNS))
+
+    if not config.getoption("--fuzz"):
+        skip_fuzz = pytest.mark.skip(reason="Fuzzing runs only with --fuzz")
+        for item in items:
+            if "fuzz" in item.keywords:
+                item.add_marker(skip_fuzz)
+
+    if not (config.getoption("--visual") or config.getoption("--update-baselines")):
+        skip_visual = pytest.mark.skip(reason="Visual baseline checks run only with --visual or --update-baselines")
+        for item in items:
+            if "visual" in item.keywords:
+                item.add_marker(skip_visual)
+
+
+@pytest.fixture(scope="session")
+def chrome_profile_template(request, tmp_path_factory):
+    """Warmed Chrome profile built once per worker, cloned for every driver"""
+    headless = request.config.getoption("--headless").lower() == 'true'
+    language = request.config.getoption("--language")
+    root = tmp_path_factory.mktemp("chrome_profile")
+    return ProfileTemplate(root, headless, language).build()
 
 
 @pytest.fixture(scope="function")
@@ -67,21 +244,21 @@ def browser(request):
 
     logger.info(f"Starting {browser_name} browser (headless: {headless}, language: {language})")
 
-    if browser_name == "chrome":
-        options = ChromeOptions()
-        options.add_experimental_option('prefs', {'intl.accept_languages': language})
+    profile_clone = None
+    launch_start = time.perf_counter()
 
-        if headless:
-            options.add_argument('--headless=new')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
+    if browser_name == "chrome":
+        if request.config.getoption("--profile-template"):
+            profile_clone = request.getfixturevalue("chrome_profile_template").clone()
 
-        options.add_argument(f'--window-size={settings.WINDOW_WIDTH},{settings.WINDOW_HEIGHT}')
+        options = build_chrome_options(headless, language, profile_clone)
+        if request.config.getoption("--network-capture"):
+            enable_network_log(options)
 
-        driver = webdriver.Chrome(
-            service=ChromeService(ChromeDriverManager().install()),
-            options=options
-        )
+        with tracer.span("ChromeDriverManager.install", "browser"):
+            driver_path = ChromeDriverManager().install()
+        with tracer.span("webdriver.Chrome", "browser"):
+            driver = webdriver.Chrome(service=ChromeService(driver_path), options=options)
 
     elif browser_name == "firefox":
         options = FirefoxOptions()
@@ -90,22 +267,43 @@ def browser(request):
         if headless:
             options.add_argument('--headless')
 
-        driver = webdriver.Firefox(
-            service=FirefoxService(GeckoDriverManager().install()),
-            options=options
-        )
+        with tracer.span("GeckoDriverManager.install", "browser"):
+            driver_path = GeckoDriverManager().install()
+        with tracer.span("webdriver.Firefox", "browser"):
+            driver = webdriver.Firefox(service=FirefoxService(driver_path), options=options)
 
     else:
         raise pytest.UsageError("--browser must be 'chrome' or 'firefox'")
 
+    launch_ms = (time.perf_counter() - launch_start) * 1000
+    request.node.user_properties.append(("browser_launch_ms", round(launch_ms, 1)))
+    logger.info(f"Browser launched in {launch_ms:.0f} ms (profile template: {profile_clone is not None})")
+
+    webdriver_commands = count_webdriver_commands(driver)
+    browser_monitor.attach(driver, request.node.nodeid)
+    if browser_name == "chrome" and request.config.getoption("--network-capture"):
+        attempt = getattr(request.node, "execution_count", 1)
+        network_capture.start(driver, capture_path(request.node.nodeid, attempt),
+                              bodies=request.config.getoption("--network-bodies"))
+    elif request.config.getoption("--network-capture"):
+        logger.info(f"Network capture needs Chrome's performance log, skipped for {browser_name}")
+
     # Apply settings
     driver.implicitly_wait(settings.IMPLICIT_WAIT)
     driver.set_page_load_timeout(settings.PAGE_LOAD_TIMEOUT)
 
     yield driver
 
+    network_capture.finish()
     logger.info("Closing browser")
-    driver.quit()
+    with tracer.span("driver.quit", "browser"):
+        telemetry = browser_monitor.quit(driver)
+    request.node.user_properties.append(("webdriver_commands", sum(webdriver_commands.values())))
+    if telemetry is not None:
+        request.node.user_properties.append(("browser_telemetry", telemetry))
+
+    if profile_clone is not None:
+        ProfileTemplate.discard(profile_clone)
 
 
 # URL fixtures using our settings
@@ -145,6 +343,29 @@ def invalid_user():
     return settings.INVALID_USER
 
 
+@pytest.fixture(scope="session")
+def user_pool():
+    """Registered accounts shared by all workers; provisioned once, reused across runs"""
+    return UserPool(artifacts_dir() / "user_pool.json", run_dir() / "leases").provision()
+
+
+@pytest.fixture
+def pooled_user(user_pool):
+    """Existing account leased exclusively for one test, reset and returned afterwards"""
+    user = user_pool.lease()
+    yield user
+    user_pool.release(user)
+
+
+# Basket state fixture
+@pytest.fixture
+def basket_seeder():
+    """Seed basket contents over the API; call sync_to_browser() before opening BASKET_URL"""
+    seeder = BasketSeeder()
+    yield seeder
+    seeder.close()
+
+
 # API endpoints fixture
 @pytest.fixture
 def api_endpoints():
@@ -179,29 +400,96 @@ def checkout_api_url(api_endpoints):
     return api_endpoints["checkout"]
 
 
+# API latency fixtures
+@pytest.fixture(scope="session")
+def latency_history(pytestconfig):
+    """Per-endpoint p95 of earlier runs in the results database, used as the regression baseline"""
+    return LatencyHistory(pytestconfig.pluginmanager.get_plugin("results_recorder").db)
+
+
+@pytest.fixture(autouse=True)
+def api_latency(request, latency_history):
+    """Attach the timings of API requests made by the test and flag requests slower than the baseline"""
+    api_timings.reset_test()
+    yield
+    samples = list(api_timings.test_samples)
+    if not samples:
+        return
+
+    attach_detail(json.dumps(samples, indent=2), name="API Timings", attachment_type=allure.attachment_type.JSON)
+    slow = slow_test_requests(latency_history, samples)
+    if slow:
+        request.node.user_properties.append(("api_latency_regressions", slow))
+        logger.warning(f"🐢 '{request.node.name}' made {len(slow)} request(s) slower than the p95 baseline: "
+                       f"{', '.join(sorted({s['endpoint'] for s in slow}))}")
+
+
 # Timer fixture using settings
 @pytest.fixture(autouse=True)
 def test_timer(request):
-    start_time = time.time()
+    start_time = time.perf_counter()
     yield
-    duration = time.time() - start_time
+    duration = time.perf_counter() - start_time
     if duration > settings.SLOW_TEST_THRESHOLD:
         logger.warning(f"⏱ Slow test '{request.node.name}' took {duration:.2f}s")
 
 
-@pytest.hookimpl(tryfirst=True, hookwrapper=True)
-def pytest_runtest_makereport(item, call):
-    outcome = yield
-    report = outcome.get_result()
-
-    if report.when == "call" and report.failed:
-        browser = item.funcargs.get('browser')
-        if browser:
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            test_name = item.name
-            allure.attach(
-                browser.get_screenshot_as_png(),
-                name=f"screenshot_on_failure_{test_name}_{timestamp}",
-                attachment_type=allure.attachment_type.PNG
-            )
+def pytest_sessionfinish(session):
+    """Workers hand their API timings and cache stats to the controller; the controller compares them to earlier runs"""
+    config = session.config
+    if hasattr(config, "workerinput"):
+        config.workeroutput["api_timings"] = api_timings.to_dict()
+        config.workeroutput["api_cache"] = dict(api_cache.stats)
+        return
+
+    summary = api_timings.summary()
+    if not summary:
+        return
+    history = LatencyHistory(config.pluginmanager.get_plugin("results_recorder").db)
+    api_timings.regressions = history.regressions(summary)
+
+    if (api_timings.regressions and config.getoption("--fail-on-latency-regression")
+            and session.exitstatus == pytest.ExitCode.OK):
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Merge API timings and cache stats of a finished xdist worker"""
+    output = getattr(node, "workeroutput", {})
+    if output.get("api_timings"):
+        api_timings.merge_dict(output["api_timings"])
+    api_cache.stats.update(output.get("api_cache", {}))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if hasattr(config, "workerinput"):
+        return
+
+    hit_rate = api_cache.hit_rate()
+    if hit_rate is not None:
+        stats = api_cache.stats
+        terminalreporter.write_sep("=", "API cache")
+        terminalreporter.write_line(
+            f"hit rate {hit_rate:.0%}: {stats['hit']} hits, {stats['revalidated']} revalidated (304), "
+            f"{stats['miss']} misses, {stats['invalidate']} invalidations"
+        )
+
+    summary = api_timings.summary()
+    if not summary:
+        return
+
+    terminalreporter.section("API latency (ms)")
+    terminalreporter.write_line(f"{'endpoint':<45} {'count':>6} {'p50':>8} {'p95':>8} {'p99':>8} "
+                                f"{'dns p95':>8} {'conn p95':>8} {'ttfb p95':>8}")
+    for endpoint, row in summary.items():
+        terminalreporter.write_line(
+            f"{endpoint:<45} {row['count']:>6} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+            f"{row['dns_p95_ms']:>8.1f} {row['connect_p95_ms']:>8.1f} {row['ttfb_p95_ms']:>8.1f}"
+        )
+    for regression in api_timings.regressions:
+        terminalreporter.write_line(
+            f"REGRESSION {regression['endpoint']}: p95 {regression['p95_ms']:.0f} ms "
+            f"vs baseline {regression['baseline_p95_ms']:.0f} ms",
+            red=True
+        )
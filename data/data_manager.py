@@ -6,12 +6,15 @@ Contains both static test data from JSON files and dynamic data generators.
 
 Key Features:
 - JSON-based test data configuration for easy maintenance
+- Lazy per-category loading backed by a pickle cache keyed on file mtime
+- O(1) lookup of test cases by name
+- Streaming JSONL/CSV case sources sharded by case name (data/cases/)
 - Dynamic data generators for unique test scenarios
 - Type-safe access to test data categories
 - Support for user, registration, security and other test data types
 
 Usage:
-    from test_data import test_data
+    from data.data_manager import data_manager as test_data
 
     # Static data
     user = test_data.valid_user
@@ -27,11 +30,18 @@ Data Categories:
 - [extensible]: Add new categories as needed
 """
 
+import hashlib
 import json
+import os
+import pickle
 import random
-import time
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+from config import settings
+from data.generators import generate_corpus
+from data.sources import CaseSource, case_source
+from data.unique_id import unique_ids
 
 
 class DataManager:
@@ -41,14 +51,26 @@ class DataManager:
     Combines static configuration from JSON files with dynamic data
     generation capabilities for comprehensive test coverage.
 
+    Categories are loaded on first access only. The JSON file is parsed at
+    most once per change: every category is then pickled into cache_dir
+    next to a manifest holding the source file stamp, so later imports (and
+    other xdist workers) unpickle just the categories they touch.
+
     Attributes:
         data_path (Path): Path to data_manager.json configuration file
-        _data (Dict): Loaded test data from JSON configuration
+        cache_dir (Path): Directory holding per-category pickle caches
+        _categories (Dict): Categories loaded so far
+        _indexes (Dict): Per-category {case name: case} indexes
     """
 
+    CACHE_VERSION = 1
+
     def __init__(self):
         self.data_path = Path(__file__).parent / "data_manager.json"
-        self._data = self._load_data()
+        self.cache_dir = Path(__file__).parent / ".cache"
+        self._categories: Dict[str, Any] = {}
+        self._indexes: Dict[str, Dict[str, Dict]] = {}
+        self._manifest: Optional[Dict[str, Any]] = None
 
     def _load_data(self) -> Dict[str, Any]:
         """
@@ -64,43 +86,176 @@ class DataManager:
         with open(self.data_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
+    # Category Cache
+    def _source_stamp(self) -> Tuple[int, int, int]:
+        """Identify the current JSON file version by cache version, mtime and size."""
+        stat = self.data_path.stat()
+        return self.CACHE_VERSION, stat.st_mtime_ns, stat.st_size
+
+    def _read_pickle(self, path: Path) -> Any:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def _write_pickle(self, path: Path, value: Any) -> None:
+        """Write atomically so concurrent workers never read a partial file."""
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def _rebuild_cache(self) -> Dict[str, Any]:
+        """Parse the JSON file once and pickle every category separately."""
+        stamp = self._source_stamp()
+        data = self._load_data()
+        self.cache_dir.mkdir(exist_ok=True)
+
+        digests = {}
+        for category, value in data.items():
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            digests[category] = hashlib.sha1(payload).hexdigest()
+            self._write_pickle(self.cache_dir / f"{category}.pickle", value)
+
+        manifest = {"stamp": stamp, "digests": digests}
+        self._write_pickle(self.cache_dir / "manifest.pickle", manifest)
+        return manifest
+
+    def _current_manifest(self) -> Dict[str, Any]:
+        """Return a manifest matching the JSON file on disk, rebuilding the cache if stale."""
+        stamp = self._source_stamp()
+        if self._manifest is not None and self._manifest["stamp"] == stamp:
+            return self._manifest
+
+        try:
+            manifest = self._read_pickle(self.cache_dir / "manifest.pickle")
+        except (OSError, pickle.UnpicklingError, EOFError):
+            manifest = None
+
+        if manifest is None or manifest.get("stamp") != stamp:
+            manifest = self._rebuild_cache()
+        return manifest
+
+    def _category(self, name: str) -> Any:
+        """
+        Get one top-level category of test data, loading it on first access.
+
+        Raises:
+            KeyError: If the category does not exist in data_manager.json
+        """
+        if name in self._categories:
+            return self._categories[name]
+
+        self._manifest = self._current_manifest()
+        if name not in self._manifest["digests"]:
+            raise KeyError(f"Unknown test data category: {name}")
+
+        try:
+            value = self._read_pickle(self.cache_dir / f"{name}.pickle")
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self._manifest = self._rebuild_cache()
+            value = self._read_pickle(self.cache_dir / f"{name}.pickle")
+
+        self._categories[name] = value
+        return value
+
+    def get_case(self, category: str, name: str) -> Dict:
+        """
+        Look up a test case by name in O(1).
+
+        Args:
+            category: JSON category or data/cases/ source holding cases with a "name" key;
+                for a JSON category that is an object, its values are the cases
+            name: Case name
+
+        Raises:
+            KeyError: If no case with this name exists
+        """
+        index = self._indexes.get(category)
+        if index is None:
+            try:
+                cases = self._category(category)
+            except KeyError:
+                cases = self.stream_cases(category)
+            if isinstance(cases, dict):
+                cases = cases.values()
+            index = {case["name"]: case for case in cases if isinstance(case, dict) and "name" in case}
+            self._indexes[category] = index
+        if name not in index:
+            raise KeyError(f"No test case '{name}' in {category}")
+        return index[name]
+
+    # Streaming Case Sources
+    def stream_cases(self, source_name: str) -> Iterator[Dict]:
+        """
+        Lazily yield every case of a data/cases/ source.
+
+        Args:
+            source_name: File name without extension, e.g. "login_validation"
+        """
+        return iter(case_source(source_name))
+
+    def case_shard_count(self, source_name: str, max_shards: int = settings.CASE_SHARDS) -> int:
+        """
+        Number of shards to split a data/cases/ source into: at most max_shards, none of them empty.
+
+        Args:
+            source_name: File name without extension
+            max_shards: Upper bound (default: settings.CASE_SHARDS)
+        """
+        return case_source(source_name).shard_count(max_shards)
+
+    def case_shard(self, source_name: str, shard: int, shard_count: int) -> Iterator[Dict]:
+        """
+        Lazily yield the cases of one shard of a data/cases/ source.
+
+        Args:
+            source_name: File name without extension
+            shard: Shard number in range(shard_count)
+            shard_count: Total number of shards, from case_shard_count()
+        """
+        return case_source(source_name).shard(shard, shard_count)
+
     # User Management
     @property
     def valid_user(self) -> Dict[str, str]:
         """Get valid user credentials for positive authentication tests."""
-        return self._data["users"]["valid_user"]
+        return self._category("users")["valid_user"]
 
     @property
     def admin_user(self) -> Dict[str, str]:
         """Get admin user credentials for role-based testing."""
-        return self._data["users"]["admin_user"]
+        return self._category("users")["admin_user"]
 
     # Registration Data
     @property
     def invalid_emails(self) -> List[str]:
         """Get list of invalid email formats for validation testing."""
-        return self._data["registration"]["invalid_emails"]
+        return self._category("registration")["invalid_emails"]
 
     @property
     def weak_passwords(self) -> List[str]:
         """Get list of weak passwords for strength validation testing."""
-        return self._data["registration"]["weak_passwords"]
+        return self._category("registration")["weak_passwords"]
 
     @property
     def strong_passwords(self) -> List[str]:
         """Get list of strong passwords for successful registration tests."""
-        return self._data["registration"]["strong_passwords"]
+        return self._category("registration")["strong_passwords"]
 
     # Security Testing
     @property
     def sql_injection(self) -> str:
         """Get SQL injection pattern for security testing."""
-        return self._data["security"]["sql_injection"]
+        return self._category("security")["sql_injection"]
 
     @property
     def xss_attempt(self) -> str:
         """Get XSS attack pattern for security testing."""
-        return self._data["security"]["xss_attempt"]
+        return self._category("security")["xss_attempt"]
+
+    @property
+    def security_payloads(self) -> List[str]:
+        """Get every predefined attack pattern (SQL injection, XSS, path traversal...)."""
+        return list(self._category("security").values())
 
     # Dynamic Data Generators
     def generate_unique_email(self, prefix: str = "test") -> str:
@@ -111,11 +266,17 @@ class DataManager:
             prefix: Email local part prefix (default: "test")
 
         Returns:
-            Unique email string with timestamp and random suffix
+            Unique email string built from run id, worker id and a monotonic counter
         """
-        timestamp = int(time.time())
-        random_suffix = random.randint(10000, 99999)
-        return f"{prefix}_{timestamp}_{random_suffix}@example.com"
+        return unique_ids.email(prefix)
+
+    def generate_unique_username(self, prefix: str = "user") -> str:
+        """Generate a unique username, collision-free across xdist workers and runs."""
+        return unique_ids.username(prefix)
+
+    def generate_order_reference(self) -> str:
+        """Generate a unique order reference."""
+        return unique_ids.order_reference()
 
     def get_random_invalid_email(self) -> str:
         """
@@ -126,6 +287,20 @@ class DataManager:
         """
         return random.choice(self.invalid_emails)
 
+    def generated_cases(self, kind: str, count: int = 1000, seed: int = settings.CORPUS_SEED) -> CaseSource:
+        """
+        Get a reproducible generated corpus of negative inputs.
+
+        Args:
+            kind: invalid_emails, boundary_passwords, unicode_edge_cases or injection_strings
+            count: Maximum number of cases
+            seed: Random seed (default: settings.CORPUS_SEED)
+
+        Returns:
+            Streaming source of {"name", "kind", "value"} cases, cached on disk
+        """
+        return generate_corpus(kind, count, seed)
+
     def get_random_weak_password(self) -> str:
         """
         Get random weak password from predefined list.
@@ -136,8 +311,23 @@ class DataManager:
         return random.choice(self.weak_passwords)
 
     def reload_data(self) -> None:
-        """Reload test data from JSON file (useful for runtime updates)."""
-        self._data = self._load_data()
+        """
+        Pick up runtime changes of the JSON file.
+
+        Only categories whose content changed are dropped from memory;
+        unchanged ones stay loaded.
+        """
+        if self._manifest is None:
+            return
+
+        old_digests = self._manifest["digests"]
+        self._manifest = self._current_manifest()
+        new_digests = self._manifest["digests"]
+
+        for category in list(self._categories):
+            if old_digests.get(category) != new_digests.get(category):
+                self._categories.pop(category, None)
+                self._indexes.pop(category, None)
 
     def _load_test_cases(self, filename: str) -> List[Dict]:
         """Load test cases from JSON file"""
@@ -146,8 +336,8 @@ class DataManager:
 
     @property
     def login_validation_cases(self) -> List[Dict]:
-        """Get all login validation test cases"""
-        return self._data["login_validation_cases"]
+        """Get all login validation test cases (prefer case_shard for large runs)"""
+        return list(self.stream_cases("login_validation"))
 
 
 # Global singleton instance for easy access across the test framework
@@ -0,0 +1,191 @@
+"""
+Bulk generators for negative registration and login inputs
+
+Produces large, deduplicated and reproducible corpora from small building
+blocks: every kind combines its blocks with itertools.product in one pass,
+shuffles the whole batch with a seeded Random and keeps the first `count`
+unique values. Corpora are cached as JSONL under data/.cache/corpora/, so a
+fuzzing run re-reads the file instead of regenerating, and the result is a
+regular streaming CaseSource that can be sharded like data/cases/ sources.
+
+Kinds:
+- invalid_emails: malformed addresses (structure, characters, length limits)
+- boundary_passwords: lengths around the validator limits and weak classes
+- unicode_edge_cases: zero-width, bidi, combining, astral and normalization cases
+- injection_strings: SQL, XSS, template, command and traversal payloads in several encodings
+
+Usage:
+    source = generate_corpus("invalid_emails", count=5000, seed=42)
+    for case in source:
+        case["name"], case["value"]
+"""
+
+import html
+import itertools
+import json
+import os
+import random
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+from urllib.parse import quote
+
+from data.sources import JsonlSource
+
+# Bump when generator output changes so stale caches are not reused
+GENERATOR_VERSION = 1
+
+CORPORA_DIR = Path(__file__).parent / ".cache" / "corpora"
+
+PASSWORD_MIN_LENGTH = 8
+PASSWORD_MAX_LENGTH = 128
+
+_LOCAL_PARTS = ["user", "john.doe", "a", "test_user", "first+tag", "x" * 64, "ivan.petrov"]
+_DOMAINS = ["example.com", "mail.example.org", "ex.co", "sub.domain.example.net", "a" * 63 + ".com"]
+
+
+def _invalid_emails() -> Iterable[str]:
+    mutations = [
+        lambda local, domain: f"{local}{domain}",                     # missing @
+        lambda local, domain: f"{local}@@{domain}",                   # double @
+        lambda local, domain: f"@{domain}",                           # empty local part
+        lambda local, domain: f"{local}@",                            # empty domain
+        lambda local, domain: f".{local}@{domain}",                   # leading dot
+        lambda local, domain: f"{local}.@{domain}",                   # trailing dot
+        lambda local, domain: f"{local}..x@{domain}",                 # consecutive dots
+        lambda local, domain: f"{local}@{domain.split('.')[0]}",      # no TLD
+        lambda local, domain: f"{local}@.{domain}",                   # domain starts with dot
+        lambda local, domain: f"{local}@{domain}.",                   # domain ends with dot
+        lambda local, domain: f"{local}@{domain.replace('.', '..', 1)}",
+        lambda local, domain: f"{local}@-{domain}",                   # label starts with hyphen
+        lambda local, domain: f"{local} @{domain}",                   # whitespace
+        lambda local, domain: f" {local}@{domain} ",
+        lambda local, domain: f"{local}@{domain}\n",
+        lambda local, domain: f"{local}x{'x' * 64}@{domain}",         # local part over 64 chars
+        lambda local, domain: f"{local}@{'d' * 250}.{domain}",        # address over 254 chars
+        lambda local, domain: f"{local}@[300.1.1.1]",                 # bad IP literal
+        lambda local, domain: f"{local}@{domain}/path",
+        lambda local, domain: f"\"{local}@{domain}",                  # unbalanced quote
+    ]
+    illegal_chars = ["", "(", ")", "<", ">", ",", ";", ":", "\\", "[", "]", "\"", "\t"]
+
+    for mutate, local, domain, char in itertools.product(mutations, _LOCAL_PARTS, _DOMAINS, illegal_chars):
+        yield mutate(f"{local}{char}", domain)
+
+
+def _boundary_passwords() -> Iterable[str]:
+    lengths = sorted({0, 1, PASSWORD_MIN_LENGTH - 1, PASSWORD_MIN_LENGTH, PASSWORD_MIN_LENGTH + 1,
+                      PASSWORD_MAX_LENGTH - 1, PASSWORD_MAX_LENGTH, PASSWORD_MAX_LENGTH + 1, 1024, 4096})
+    alphabets = ["0123456789", "abcdefghij", "ABCDEFGHIJ", "Aa1!", " ", "\u00e9\u00df\u00f8", "\U0001f600"]
+    fillers = [
+        lambda alphabet, n: (alphabet * (n // len(alphabet) + 1))[:n],
+        lambda alphabet, n: alphabet[0] * n,
+        lambda alphabet, n: " " + (alphabet * n)[:max(n - 2, 0)] + " ",
+    ]
+    for length, alphabet, fill in itertools.product(lengths, alphabets, fillers):
+        yield fill(alphabet, length)
+
+    # Dictionary and user-attribute passwords that pass the length check
+    yield from ["password", "password1", "12345678", "qwertyui", "iloveyou", "testuser100", "example.com"]
+
+
+def _unicode_edge_cases() -> Iterable[str]:
+    specials = {
+        "zero_width_space": "\u200b",
+        "zero_width_joiner": "\u200d",
+        "bom": "\ufeff",
+        "rtl_override": "\u202e",
+        "combining_acute": "e\u0301",
+        "precomposed_acute": "\u00e9",
+        "fullwidth_at": "\uff20",
+        "cyrillic_a": "\u0430",
+        "greek_omicron": "\u03bf",
+        "emoji": "\U0001f4a9",
+        "family_emoji": "\U0001f468\u200d\U0001f469\u200d\U0001f467",
+        "null_byte": "\x00",
+        "bell": "\x07",
+        "line_separator": "\u2028",
+        "replacement_char": "\ufffd",
+        "turkish_dotless_i": "\u0131",
+        "german_sharp_s": "\u00df",
+        "nbsp": "\u00a0",
+    }
+    templates = [
+        lambda s: f"user{s}@example.com",
+        lambda s: f"{s}user@example.com",
+        lambda s: f"user@exa{s}mple.com",
+        lambda s: f"Pass{s}word123!",
+        lambda s: s * 64,
+        lambda s: s,
+    ]
+    for special, template in itertools.product(specials.values(), templates):
+        yield template(special)
+
+
+def _injection_strings() -> Iterable[str]:
+    payloads = [
+        "' OR '1'='1", "' OR 1=1--", "admin'--", "' UNION SELECT NULL,NULL--", "'; DROP TABLE users--",
+        "1; WAITFOR DELAY '0:0:5'--", "' AND SLEEP(5)--",
+        "<script>alert(1)</script>", "\"><img src=x onerror=alert(1)>", "javascript:alert(1)",
+        "<svg onload=alert(1)>",
+        "{{7*7}}", "${7*7}", "<%= 7*7 %>",
+        "; ls -la", "| cat /etc/passwd", "$(id)", "`id`",
+        "../../etc/passwd", "..\\..\\windows\\win.ini",
+        "*)(uid=*))(|(uid=*", "{\"$gt\": \"\"}", "%00",
+    ]
+    contexts = [
+        lambda p: p,
+        lambda p: f"user@example.com{p}",
+        lambda p: f"{p}@example.com",
+        lambda p: f"\"{p}\"",
+    ]
+    encodings = [
+        lambda s: s,
+        lambda s: quote(s, safe=""),
+        lambda s: quote(quote(s, safe=""), safe=""),
+        html.escape,
+        str.upper,
+    ]
+    for payload, context, encode in itertools.product(payloads, contexts, encodings):
+        yield encode(context(payload))
+
+
+GENERATORS: Dict[str, Callable[[], Iterable[str]]] = {
+    "invalid_emails": _invalid_emails,
+    "boundary_passwords": _boundary_passwords,
+    "unicode_edge_cases": _unicode_edge_cases,
+    "injection_strings": _injection_strings,
+}
+
+
+def build_corpus(kind: str, count: int, seed: int) -> List[str]:
+    """
+    Generate a deduplicated, seeded sample of one kind.
+
+    Args:
+        kind: Key of GENERATORS
+        count: Maximum number of values (fewer if the kind has fewer unique values)
+        seed: Random seed; the same seed always yields the same corpus
+
+    Raises:
+        KeyError: If the kind is unknown
+    """
+    values = list(dict.fromkeys(GENERATORS[kind]()))
+    random.Random(seed).shuffle(values)
+    return values[:count]
+
+
+def generate_corpus(kind: str, count: int = 1000, seed: int = 0, corpora_dir: Path = CORPORA_DIR) -> JsonlSource:
+    """
+    Return a streaming source over a cached corpus, generating it on first use.
+
+    Each case is {"name": "<kind>_<n>", "kind": kind, "value": value}.
+    """
+    path = Path(corpora_dir) / f"{kind}_s{seed}_n{count}_v{GENERATOR_VERSION}.jsonl"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for number, value in enumerate(build_corpus(kind, count, seed)):
+                f.write(json.dumps({"name": f"{kind}_{number:05d}", "kind": kind, "value": value}) + "\n")
+        os.replace(tmp_path, path)
+    return JsonlSource(path)
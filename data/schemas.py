@@ -0,0 +1,96 @@
+"""
+Response schemas for the shop API
+
+A JSON Schema subset understood by utils.schema: type (name or list),
+enum, pattern, format (uri, decimal), minLength, minimum, properties,
+required, additionalProperties (bool), items, minItems.
+
+Only fields the tests rely on are required; django-oscar adds more fields
+across versions and those are allowed.
+"""
+
+URI = {"type": "string", "format": "uri"}
+NULLABLE_URI = {"type": ["string", "null"], "format": "uri"}
+DECIMAL = {"type": "string", "format": "decimal"}
+NULLABLE_DECIMAL = {"type": ["string", "null"], "format": "decimal"}
+
+PRICE = {
+    "type": "object",
+    "required": ["currency", "excl_tax"],
+    "properties": {
+        "currency": {"type": "string", "pattern": r"^[A-Z]{3}$"},
+        "excl_tax": DECIMAL,
+        "incl_tax": NULLABLE_DECIMAL,
+        "tax": NULLABLE_DECIMAL,
+    },
+}
+
+BASKET = {
+    "type": "object",
+    "required": ["id", "url", "lines", "total_excl_tax", "currency"],
+    "properties": {
+        "id": {"type": "integer", "minimum": 1},
+        "url": URI,
+        "owner": NULLABLE_URI,
+        "status": {"type": "string", "enum": ["Open", "Merged", "Saved", "Frozen", "Submitted"]},
+        "lines": URI,
+        "total_excl_tax": DECIMAL,
+        "total_excl_tax_excl_discounts": NULLABLE_DECIMAL,
+        "total_incl_tax": NULLABLE_DECIMAL,
+        "total_incl_tax_excl_discounts": NULLABLE_DECIMAL,
+        "total_tax": NULLABLE_DECIMAL,
+        "currency": {"type": ["string", "null"]},
+        "voucher_discounts": {"type": "array"},
+        "offer_discounts": {"type": "array"},
+        "is_tax_known": {"type": "boolean"},
+    },
+}
+
+LOGIN_ERROR = {
+    "type": "object",
+    "required": ["non_field_errors"],
+    "properties": {
+        "non_field_errors": {"type": "array", "minItems": 1, "items": {"type": "string", "minLength": 1}},
+    },
+}
+
+PRODUCT = {
+    "type": "object",
+    "required": ["id", "url", "title"],
+    "properties": {
+        "id": {"type": "integer", "minimum": 1},
+        "url": URI,
+        "upc": {"type": ["string", "null"]},
+        "title": {"type": "string", "minLength": 1},
+        "structure": {"type": "string", "enum": ["standalone", "parent", "child"]},
+        "price": {"type": ["string", "object"]},
+        "availability": {"type": ["string", "object"]},
+        "images": {"type": "array"},
+    },
+}
+
+ORDER = {
+    "type": "object",
+    "required": ["number", "status", "url"],
+    "properties": {
+        "number": {"type": "string", "pattern": r"^\d+$"},
+        "status": {"type": "string", "minLength": 1},
+        "url": URI,
+        "basket": NULLABLE_URI,
+        "currency": {"type": "string"},
+        "total_incl_tax": DECIMAL,
+        "total_excl_tax": DECIMAL,
+        "lines": {"type": ["string", "array"]},
+        "guest_email": {"type": ["string", "null"]},
+    },
+}
+
+SCHEMAS = {
+    "basket": BASKET,
+    "login_error": LOGIN_ERROR,
+    "product": PRODUCT,
+    "product_list": {"type": "array", "items": PRODUCT},
+    "price": PRICE,
+    "order": ORDER,
+    "order_list": {"type": "array", "items": ORDER},
+}
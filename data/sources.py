@@ -0,0 +1,113 @@
+"""
+Streaming test-data sources
+
+Large parametrized matrices (validation cases, security payloads) live in
+JSONL or CSV files under data/cases/ and are read one case at a time, so
+memory stays flat however big a dataset grows.
+
+Cases are split into shards by a stable hash (crc32) of the case name.
+Tests parametrize over shard numbers rather than cases: collection never
+holds the cases in memory, every xdist worker collects the same tests (as
+xdist requires), and each shard lands on one worker which streams only its
+own cases. The shard count is the largest one up to CASE_SHARDS that
+leaves no shard empty; finding it is one streaming pass over the names.
+
+Usage:
+    source = case_source("login_validation")
+    shards = source.shard_count(8)
+    for case in source.shard(0, shards):
+        ...
+"""
+
+import csv
+import json
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterator, Union
+
+CASES_DIR = Path(__file__).parent / "cases"
+
+
+def shard_of(case_name: str, shard_count: int) -> int:
+    """Stable shard number of a case (same in every process and every run)."""
+    return zlib.crc32(case_name.encode("utf-8")) % shard_count
+
+
+class CaseSource(ABC):
+    """
+    Lazily iterated collection of test cases stored in a file.
+
+    Attributes:
+        path (Path): Data file backing this source
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[Dict]:
+        """Yield the cases one at a time."""
+
+    def shard(self, index: int, shard_count: int) -> Iterator[Dict]:
+        """
+        Yield only the cases belonging to one shard.
+
+        Args:
+            index: Shard number in range(shard_count)
+            shard_count: Total number of shards
+        """
+        for case in self:
+            if shard_of(case["name"], shard_count) == index:
+                yield case
+
+    def shard_count(self, max_shards: int) -> int:
+        """
+        Largest number of shards up to max_shards that leaves no shard empty (1 for an empty source).
+
+        One streaming pass; per candidate count only the shard numbers seen so far are kept.
+        """
+        seen = {count: set() for count in range(2, max_shards + 1)}
+        for case in self:
+            value = zlib.crc32(case["name"].encode("utf-8"))
+            for count, shards in seen.items():
+                shards.add(value % count)
+            if all(len(shards) == count for count, shards in seen.items()):
+                break
+        return max((count for count, shards in seen.items() if len(shards) == count), default=1)
+
+
+class JsonlSource(CaseSource):
+    """One JSON object per line; blank lines and lines starting with # are skipped."""
+
+    def __iter__(self) -> Iterator[Dict]:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield json.loads(line)
+
+
+class CsvSource(CaseSource):
+    """CSV with a header row; every value is read as a string."""
+
+    def __iter__(self) -> Iterator[Dict]:
+        with open(self.path, 'r', encoding='utf-8', newline='') as f:
+            yield from csv.DictReader(f)
+
+
+_SOURCE_TYPES = {".jsonl": JsonlSource, ".csv": CsvSource}
+
+
+def case_source(name: str, cases_dir: Path = CASES_DIR) -> CaseSource:
+    """
+    Find the data file for a named source in data/cases/.
+
+    Raises:
+        FileNotFoundError: If no .jsonl or .csv file with this name exists
+    """
+    for suffix, source_type in _SOURCE_TYPES.items():
+        path = cases_dir / f"{name}{suffix}"
+        if path.exists():
+            return source_type(path)
+    raise FileNotFoundError(f"No case source '{name}' in {cases_dir} (expected .jsonl or .csv)")
@@ -0,0 +1,130 @@
+"""
+Collision-free unique ID generator for test data
+
+Snowflake-style 64-bit ids built from:
+- 41 bits: milliseconds since ID_EPOCH_MS
+- 10 bits: xdist worker index (unique within a run)
+- 12 bits: per-millisecond sequence counter
+
+Rendered values are additionally tagged with the run id, so ids from
+parallel CI jobs or reruns never collide either. Replaces the old
+time.time() + random suffix scheme that could repeat under -n auto.
+
+Usage:
+    from data.unique_id import unique_ids
+
+    unique_ids.email()             # test_3f9a1c_1h3kq9z0b4@example.com
+    unique_ids.username("buyer")   # buyer_3f9a1c_1h3kq9z0b5
+    unique_ids.order_reference()   # ORD-3F9A1C-1H3KQ9Z0B6
+
+    python -m data.unique_id --benchmark 1000000
+"""
+
+import argparse
+import threading
+import time
+from typing import Optional
+
+from utils.run_context import run_id, worker_index
+
+ID_EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+_BASE36_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def to_base36(number: int) -> str:
+    """Encode a non-negative integer in lowercase base36."""
+    if number == 0:
+        return "0"
+    digits = []
+    while number:
+        number, remainder = divmod(number, 36)
+        digits.append(_BASE36_ALPHABET[remainder])
+    return "".join(reversed(digits))
+
+
+class UniqueIdGenerator:
+    """
+    Thread-safe Snowflake id generator.
+
+    Attributes:
+        worker (int): Worker component of generated ids
+        run_tag (str): Short run id prefix used in rendered values
+    """
+
+    def __init__(self, worker: Optional[int] = None, run_tag: Optional[str] = None):
+        self.worker = (worker_index() if worker is None else worker) & MAX_WORKER
+        self.run_tag = (run_tag or run_id())[:6]
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def next_id(self) -> int:
+        """
+        Return the next id.
+
+        Ids are strictly increasing within a process: the clock never goes
+        backwards (a regressed wall clock reuses the last millisecond) and an
+        exhausted sequence waits for the next millisecond.
+        """
+        with self._lock:
+            now = max(int(time.time() * 1000) - ID_EPOCH_MS, self._last_ms)
+            if now == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    while now <= self._last_ms:
+                        now = int(time.time() * 1000) - ID_EPOCH_MS
+            else:
+                self._sequence = 0
+            self._last_ms = now
+            return (now << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker << SEQUENCE_BITS) | self._sequence
+
+    def token(self) -> str:
+        """Next id rendered as "<run_tag>_<base36 id>"."""
+        return f"{self.run_tag}_{to_base36(self.next_id())}"
+
+    def email(self, prefix: str = "test", domain: str = "example.com") -> str:
+        """Unique email address."""
+        return f"{prefix}_{self.token()}@{domain}"
+
+    def username(self, prefix: str = "user") -> str:
+        """Unique username."""
+        return f"{prefix}_{self.token()}"
+
+    def order_reference(self, prefix: str = "ORD") -> str:
+        """Unique order reference."""
+        return f"{prefix}-{self.token().replace('_', '-').upper()}"
+
+
+def benchmark(count: int = 1_000_000) -> float:
+    """
+    Measure generator throughput.
+
+    Args:
+        count: Number of ids to generate
+
+    Returns:
+        Ids generated per second
+    """
+    generator = UniqueIdGenerator()
+    start = time.perf_counter()
+    ids = [generator.next_id() for _ in range(count)]
+    elapsed = time.perf_counter() - start
+    assert len(set(ids)) == count, "Duplicate ids generated"
+    return count / elapsed
+
+
+# Global singleton shared by DataManager, page objects and fixtures
+unique_ids = UniqueIdGenerator()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the unique id generator")
+    parser.add_argument("--benchmark", type=int, default=1_000_000, metavar="COUNT")
+    args = parser.parse_args()
+    print(f"{benchmark(args.benchmark):,.0f} ids/s ({args.benchmark:,} ids, no duplicates)")
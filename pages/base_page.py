@@ -4,7 +4,7 @@ import math
 import time
 import logging
 import allure
-from typing import List, Tuple, Optional, Union, Any
+from typing import List, Tuple, Optional, Sequence, Union, Any
 
 import pytest
 from selenium.common.exceptions import NoSuchElementException, NoAlertPresentException, TimeoutException
@@ -14,6 +14,10 @@ from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from utils.results_db import test_activity
+from utils.step_reporting import helper_step
+from utils.tracing import traced
+from utils.visual import element_regions, visual_baselines
 from .locators import BasePageLocators, MainPageLocators
 
 logger = logging.getLogger(__name__)
@@ -42,6 +46,7 @@ class BasePage:
         self.url = url
         self.timeout = timeout
         self._wait = WebDriverWait(browser, timeout, poll_frequency=poll_frequency)
+        test_activity.record_page_object(type(self).__name__)
 
         # Avoid implicit waits when using explicit waits
         if use_implicit_wait:
@@ -51,6 +56,7 @@ class BasePage:
 
         logger.info("Initialized BasePage for URL: %s", url)
 
+    @traced
     @allure.step("Open page URL")
     def open(self) -> None:
         """Open the page URL."""
@@ -68,7 +74,7 @@ class BasePage:
         )
 
     # ====== ELEMENT PRESENCE & VISIBILITY INCLUDING WAITING ======
-    @allure.step("Check if element is present: {locator}")
+    @helper_step("Check if element is present: {locator}")
     def is_element_present(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> bool:
         """Check if element is present in DOM."""
         try:
@@ -79,7 +85,7 @@ class BasePage:
             logger.warning(f"element {locator} is NOT present within {timeout}")
             return False
 
-    @allure.step("Check if element is visible: {locator}")
+    @helper_step("Check if element is visible: {locator}")
     def is_element_visible(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> bool:
         """Check if element is visible on page."""
         try:
@@ -88,7 +94,7 @@ class BasePage:
         except TimeoutException:
             return False
 
-    @allure.step("Check if element is clickable: {locator}")
+    @helper_step("Check if element is clickable: {locator}")
     def is_element_clickable(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> bool:
         """Check if element is clickable."""
         try:
@@ -97,7 +103,7 @@ class BasePage:
         except TimeoutException:
             return False
 
-    @allure.step("Check if element is absent: {locator}")
+    @helper_step("Check if element is absent: {locator}")
     def is_element_absent(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> bool:
         """Check that element is NOT present in DOM."""
         try:
@@ -106,7 +112,7 @@ class BasePage:
         except TimeoutException:
             return False
 
-    @allure.step("Check if element is invisible: {locator}")
+    @helper_step("Check if element is invisible: {locator}")
     def is_element_invisible(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> bool:
         """Check that element is NOT visible (may still be in DOM)."""
         try:
@@ -115,7 +121,7 @@ class BasePage:
         except TimeoutException:
             return False
 
-    @allure.step("Check user is logged in")
+    @helper_step("Check user is logged in")
     def _is_user_logged_in(self) -> bool:
         """Check if user is logged in from ANY page."""
         try:
@@ -130,26 +136,31 @@ class BasePage:
             return False
 
     # ====== WAIT METHODS ======
-    @allure.step("Wait for presence of element: {locator}")
+    @traced
+    @helper_step("Wait for presence of element: {locator}")
     def wait_for_presence(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> WebElement:
         """Wait for element to be present in DOM and return it."""
         return self._temporary_wait(timeout).until(EC.presence_of_element_located(locator))
 
-    @allure.step("Wait for presence of all elements: {locator}")
+    @traced
+    @helper_step("Wait for presence of all elements: {locator}")
     def wait_for_presence_of_all(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> List[WebElement]:
         """Wait for all elements with locator to be present in DOM and return them."""
         return self._temporary_wait(timeout).until(EC.presence_of_all_elements_located(locator))
 
-    @allure.step("Wait for visibility of element: {locator}")
+    @traced
+    @helper_step("Wait for visibility of element: {locator}")
     def wait_for_visibility(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> WebElement:
         """Wait for element to be visible and return it."""
         return self._temporary_wait(timeout).until(EC.visibility_of_element_located(locator))
 
-    @allure.step("Wait for element to be clickable: {locator}")
+    @traced
+    @helper_step("Wait for element to be clickable: {locator}")
     def wait_for_clickable(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> WebElement:
         """Wait for element to be clickable and return it."""
         return self._temporary_wait(timeout).until(EC.element_to_be_clickable(locator))
 
+    @traced
     def _wait_for_url_contains(self, text: str, timeout: Optional[int] = None) -> bool:
         """Wait for URL to contain specific text."""
         try:
@@ -160,7 +171,8 @@ class BasePage:
             logger.warning("URL does not contain '%s' within timeout", text)
             return False
 
-    @allure.step("Wait for URL to change from: {original_url}")
+    @traced
+    @helper_step("Wait for URL to change from: {original_url}")
     def _wait_for_url_change(self, original_url: Optional[str] = None, timeout: Optional[int] = None) -> bool:
         """Wait for URL to change from original URL."""
         original = original_url or self.browser.current_url
@@ -173,14 +185,14 @@ class BasePage:
             return False
 
     # ====== ELEMENT INTERACTIONS ======
-    @allure.step("Click on element: {locator}")
+    @helper_step("Click on element: {locator}")
     def click(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> None:
         """Click on element after ensuring it's clickable."""
         element = self.wait_for_clickable(locator, timeout)
         element.click()
         logger.debug("Clicked element: %s", locator)
 
-    @allure.step("Type text '{text}' to element: {locator}")
+    @helper_step("Type text '{text}' to element: {locator}")
     def send_keys(self, locator: Tuple[By, str], text: str, timeout: Optional[int] = None) -> None:
         """Type text into input field after ensuring it's clickable."""
         element = self.wait_for_clickable(locator, timeout)
@@ -188,13 +200,13 @@ class BasePage:
         element.send_keys(text)
         logger.debug("Typed text '%s' into %s", text, locator)
 
-    @allure.step("Get text from element: {locator}")
+    @helper_step("Get text from element: {locator}")
     def get_text(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> str:
         """Get text from visible element."""
         element = self.wait_for_presence(locator, timeout)
         return element.text.strip()
 
-    @allure.step("Get texts from all matching elements: {locator}")
+    @helper_step("Get texts from all matching elements: {locator}")
     def get_all_texts(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> List[str]:
         """Get texts from all matching elements."""
         elements = self.wait_for_presence_of_all(locator, timeout)
@@ -318,6 +330,36 @@ class BasePage:
         assert self.is_element_absent(locator, timeout), f"Element {element_name} is present but should not be"
         logger.debug("Element %s is not present as expected", element_name)
 
+    @allure.step("Verify visual baseline: {name}")
+    def should_match_visual_baseline(self, name: str, locator: Optional[Tuple[By, str]] = None,
+                                     mask: Sequence[Tuple[By, str]] = ()) -> None:
+        """
+        Compare the viewport (or one element) with its stored baseline.
+
+        Args:
+            name: Baseline name, unique per browser and window size
+            locator: Element to capture instead of the viewport
+            mask: Locators of dynamic regions (prices, totals, messages) left out of the comparison
+        """
+        element = self.wait_for_visibility(locator) if locator else None
+        png = element.screenshot_as_png if element is not None else self.browser.get_screenshot_as_png()
+        masked = [found for masked_locator in mask for found in self.browser.find_elements(*masked_locator)]
+        browser_name = self.browser.capabilities.get("browserName", "browser")
+
+        result = visual_baselines.compare(browser_name, name, png, element_regions(self.browser, masked, element))
+        test_activity.record_visual_comparison(name, result.passed, result.prefiltered, result.diff_ratio,
+                                               result.compare_ms, result.baseline_bytes)
+        logger.info("Visual baseline %s: %s (%.0f ms)", name, result.message, result.compare_ms)
+        if not result.passed:
+            if not result.missing:
+                baseline = visual_baselines.directory(browser_name) / f"{name}.png"
+                allure.attach(baseline.read_bytes(), name=f"{name}: baseline",
+                              attachment_type=allure.attachment_type.PNG)
+            allure.attach(png, name=f"{name}: actual", attachment_type=allure.attachment_type.PNG)
+            if result.diff_png:
+                allure.attach(result.diff_png, name=f"{name}: diff", attachment_type=allure.attachment_type.PNG)
+        assert result.passed, f"Visual baseline '{name}' does not match: {result.message}"
+
     @allure.step("Verify that element has expected text: {expected_text}")
     def should_have_element_text(
             self,
@@ -470,7 +512,7 @@ class BasePage:
         logger.debug("Screenshot saved: %s", filename)
         return filename
 
-    @allure.step("Get current page URL")
+    @helper_step("Get current page URL")
     def get_current_url(self) -> str:
         """Get current page URL."""
         return self.browser.current_url
@@ -490,27 +532,28 @@ class BasePage:
     # ====== COMPATIBILITY METHODS ======
 
     # Legacy method names for backward compatibility
-    @allure.step("Check if element has disappeared: {locator}")
+    @helper_step("Check if element has disappeared: {locator}")
     def is_element_disappeared(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> bool:
         """Legacy alias for is_element_invisible."""
         return self.is_element_invisible(locator, timeout)
 
-    @allure.step("Check if element is not present: {locator}")
+    @helper_step("Check if element is not present: {locator}")
     def is_not_element_present(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> bool:
         """Legacy alias for is_element_absent."""
         return self.is_element_absent(locator, timeout)
 
-    @allure.step("Wait for element to be clickable: {locator}")
+    @traced
+    @helper_step("Wait for element to be clickable: {locator}")
     def wait_for_element_to_be_clickable(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> None:
         """Legacy method - use wait_for_clickable instead."""
         self.wait_for_clickable(locator, timeout)
 
-    @allure.step("Click on element (legacy): {locator}")
+    @helper_step("Click on element (legacy): {locator}")
     def click_element(self, locator: Tuple[By, str], timeout: Optional[int] = None) -> None:
         """Legacy alias for click."""
         self.click(locator, timeout)
 
-    @allure.step("Type text to element (legacy): {locator}")
+    @helper_step("Type text to element (legacy): {locator}")
     def type_text(self, locator: Tuple[By, str], text: str, timeout: Optional[int] = None) -> None:
         """Legacy alias for send_keys."""
         self.send_keys(locator, text, timeout)
@@ -1,5 +1,7 @@
 """Module description"""
 
+import allure
+
 from pages.base_page import BasePage
 from pages.locators import BasketPageLocators
 import logging
@@ -13,3 +15,10 @@ class BasketPage(BasePage):
             f"Product '{test_product_name}' not found in basket. Current products: {product_names_in_basket}"
         )
         logging.info(f"Product '{test_product_name}' is present in the basket.")
+
+    @allure.step("Proceed to checkout")
+    def proceed_to_checkout(self):
+        """Click 'Proceed to checkout' and wait for the checkout page."""
+        self.click(BasketPageLocators.PROCEED_TO_CHECKOUT)
+        assert self._wait_for_url_contains("/checkout"), "Failed to navigate to checkout"
+        logging.info("Proceeded to checkout")
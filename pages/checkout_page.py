@@ -1,7 +1,60 @@
 """Module description"""
 
+import logging
+from typing import Dict
+
+import allure
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import Select
+
 from .base_page import BasePage
+from .locators import CheckoutPageLocators
+
+logger = logging.getLogger(__name__)
+
 
 class CheckoutPage(BasePage):
-    pass
+    """Checkout steps: guest gateway, shipping address, payment details, preview and thank-you page."""
+
+    @allure.step("Continue checkout as guest: {email}")
+    def continue_as_guest(self, email: str) -> None:
+        """Fill the gateway form with the guest email and choose guest checkout."""
+        self.send_keys(CheckoutPageLocators.GUEST_EMAIL_FIELD, email)
+        self.click(CheckoutPageLocators.GUEST_OPTION)
+        self.click(CheckoutPageLocators.GATEWAY_CONTINUE)
+        assert self._wait_for_url_contains("/checkout/shipping-address"), "Guest checkout did not reach shipping address"
+        logger.info("Continuing checkout as guest %s", email)
+
+    @allure.step("Fill shipping address")
+    def fill_shipping_address(self, address: Dict[str, str]) -> None:
+        """Fill the new shipping address form (field name -> value) and submit it."""
+        self.wait_for_visibility(CheckoutPageLocators.SHIPPING_ADDRESS_FORM)
+        for name, value in address.items():
+            locator = (By.ID, f"id_{name}")
+            if name == "country":
+                Select(self.wait_for_visibility(locator)).select_by_value(value)
+            else:
+                self.send_keys(locator, value)
+        current_url = self.get_current_url()
+        self.click(CheckoutPageLocators.SHIPPING_ADDRESS_CONTINUE)
+        assert self._wait_for_url_change(current_url), "Shipping address form was not accepted"
+        logger.info("Shipping address submitted")
+
+    @allure.step("Continue from payment details to preview")
+    def continue_to_preview(self) -> None:
+        self.click(CheckoutPageLocators.PAYMENT_CONTINUE)
+        assert self._wait_for_url_contains("/checkout/preview"), "Failed to reach order preview"
+
+    @allure.step("Place order")
+    def place_order(self) -> None:
+        self.click(CheckoutPageLocators.PLACE_ORDER_BUTTON)
+        assert self._wait_for_url_contains("/checkout/thank-you"), "Order was not placed"
+        logger.info("Order placed")
 
+    @allure.step("Verify order confirmation")
+    def should_display_confirmation(self) -> str:
+        """Check the thank-you page and return the order number."""
+        order_number = self.get_text(CheckoutPageLocators.ORDER_NUMBER)
+        assert order_number.isdigit(), f"No order number on confirmation page, got '{order_number}'"
+        logger.info("Order %s confirmed", order_number)
+        return order_number
@@ -18,6 +18,26 @@ class BasketPageLocators:
     """Locators for basket/cart page"""
     ALL_BASKET_ITEMS = (By.CSS_SELECTOR, '[id="basket_formset"]')
     BASKET_ITEM_NAME = (By.CSS_SELECTOR, 'div[class="basket-items"] h3 a')
+    PROCEED_TO_CHECKOUT = (By.CSS_SELECTOR, '#content_inner a.btn-lg[href*="checkout"]')
+
+
+class CheckoutPageLocators:
+    """Locators for checkout pages (gateway, shipping address, payment, preview, thank you)"""
+    # Gateway: guest email + "checkout as a guest" option
+    GUEST_EMAIL_FIELD = (By.ID, 'id_username')
+    GUEST_OPTION = (By.ID, 'id_options_0')
+    GATEWAY_CONTINUE = (By.CSS_SELECTOR, 'form#login_form button[type="submit"]')
+
+    # Shipping address form; fields are found by id_<name>
+    SHIPPING_ADDRESS_FORM = (By.CSS_SELECTOR, 'form#new_shipping_address')
+    SHIPPING_ADDRESS_CONTINUE = (By.CSS_SELECTOR, 'form#new_shipping_address button[type="submit"]')
+
+    # Payment details (sandbox has no payment form) and preview
+    PAYMENT_CONTINUE = (By.ID, 'view_preview')
+    PLACE_ORDER_BUTTON = (By.ID, 'place-order')
+
+    # Thank you page
+    ORDER_NUMBER = (By.CSS_SELECTOR, 'p.lead strong')
 
 
 class MainPageLocators:
@@ -72,6 +92,8 @@ class ProductPageLocators:
     # Product info (same before/after adding to basket)
     PRODUCT_NAME = (By.CSS_SELECTOR, '[class*=product_main] h1')
     PRODUCT_PRICE = (By.CSS_SELECTOR, '[class*=price_color]')
+    PRODUCT_MAIN = (By.CSS_SELECTOR, '[class*=product_main]')
+    PRODUCT_AVAILABILITY = (By.CSS_SELECTOR, '[class*=product_main] .availability')
 
     # Messages and notifications
     BASKET_MESSAGE_BOX = (By.CSS_SELECTOR, '[id="messages"]')
@@ -1,8 +1,8 @@
-import time
 from typing import Tuple, Optional
 
 import allure
 import logging
+from data.unique_id import unique_ids
 from .base_page import BasePage
 from .locators import LoginPageLocators, BasePageLocators
 
@@ -222,4 +222,4 @@ class LoginPage(BasePage):
     @allure.step("Generate unique email for testing")
     def generate_unique_email() -> str:
         """Generate unique email for testing."""
-        return f"test_{time.time()}@example.com"
+        return unique_ids.email()
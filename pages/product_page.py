@@ -50,6 +50,14 @@ class ProductPage(BasePage):
         )
         logger.info("Product price element presence verified")
 
+    @allure.step("Verify product price: {expected_price}")
+    def should_have_price(self, expected_price: str):
+        """Check that the displayed product price matches the expected price text."""
+        actual_price = self.get_text(ProductPageLocators.PRODUCT_PRICE)
+        assert actual_price == expected_price, (
+            f"Product price mismatch: expected '{expected_price}', got '{actual_price}'"
+        )
+
     @allure.step("Add product to basket")
     def add_to_basket(self):
         """Click the 'Add to Basket' button to add the product to the shopping basket."""
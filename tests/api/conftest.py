@@ -1,7 +1,6 @@
 # tests/api/conftest.py
 import pytest
-import requests
-from data.data_manager import data_manager
+from utils.api_cache import cached_session
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,8 +8,8 @@ logger = logging.getLogger(__name__)
 
 @pytest.fixture
 def api_session():
-    """Session for API tests with common headers"""
-    session = requests.Session()
+    """Session for API tests with common headers; requests are timed, reference data is cached"""
+    session = cached_session()
     session.headers.update({
         'Content-Type': 'application/json',
         'User-Agent': 'QA-Tests/1.0'
@@ -22,15 +21,13 @@ def api_session():
 
 
 @pytest.fixture
-def authenticated_session(api_session, login_api_url):
+def authenticated_session(api_session, login_api_url, pooled_user):
     """This API uses session-based authentication (not tokens)"""
 
-    # 🔴 ПРОБЛЕМА: используем email, но API ожидает username
-    # 🟢 РЕШЕНИЕ: используем username или создаем его в test_data
-
+    # API expects username; pooled accounts use the email as username
     login_data = {
-        "username": data_manager.valid_user["email"],  # 🎉 НАЙДЕНО!
-        "password": data_manager.valid_user["password"]          # 🎉 НАЙДЕНО!
+        "username": pooled_user["username"],
+        "password": pooled_user["password"]
     }
     logger.info(f"Attempting login with username: {login_data['username']}")
 
@@ -58,11 +55,11 @@ def unauthenticated_session(api_session):
 
 
 @pytest.fixture
-def login_payload():
+def login_payload(pooled_user):
     """Provide correct login payload structure"""
     return {
-        "username": data_manager.valid_user["username"],  # ← put real username
-        "password": data_manager.valid_user["password"]  # ← put real password
+        "username": pooled_user["username"],
+        "password": pooled_user["password"]
     }
 
 
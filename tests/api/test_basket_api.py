@@ -1,6 +1,8 @@
 # Tests for accessing basket with and without authentication
 import allure
 
+from utils.schema import assert_matches_schema
+
 @allure.epic("Basket API")
 class TestBasketAPI:
 
@@ -11,6 +13,7 @@ class TestBasketAPI:
 
         assert response.status_code == 200
         # Может возвращать пустую корзину или данные корзины
+        assert_matches_schema(response, "basket")
 
     @allure.title("Access basket without authentication")
     def test_get_basket_unauthenticated(self, unauthenticated_session, basket_api_url):
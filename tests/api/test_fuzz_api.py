@@ -0,0 +1,40 @@
+# Fuzzing of login and basket endpoints (opt-in: pytest tests/api/test_fuzz_api.py --fuzz)
+import json
+
+import allure
+import pytest
+
+from config import settings
+from utils.fuzzer import TARGETS, Fuzzer, corpus_payloads
+from utils.run_context import run_dir, worker_id
+
+CORPUS_KINDS = ["injection_strings", "invalid_emails", "unicode_edge_cases", "boundary_passwords"]
+
+
+@pytest.mark.fuzz
+@allure.epic("Security API")
+@allure.feature("Fuzzing")
+class TestApiFuzzing:
+
+    @allure.title("Fuzz {target_name} with generated payload corpora")
+    @pytest.mark.parametrize("target_name", sorted(TARGETS))
+    def test_endpoint_survives_fuzzing(self, target_name):
+        """Endpoint never answers with 5xx or leaks a stack trace for any payload"""
+        findings_path = run_dir() / "fuzz" / f"{target_name}_{worker_id()}.jsonl"
+        fuzzer = Fuzzer(TARGETS[target_name], findings_path)
+
+        with allure.step(f"Send corpora to {TARGETS[target_name].url}"):
+            summary = fuzzer.run(corpus_payloads(CORPUS_KINDS, settings.FUZZ_CASES_PER_KIND))
+            allure.attach(json.dumps(summary, indent=2), name="Fuzz Summary",
+                          attachment_type=allure.attachment_type.JSON)
+
+        failures = summary["findings"].get("server_error", 0) + summary["findings"].get("stack_trace", 0)
+        if failures:
+            with allure.step("Minimize failing inputs"):
+                allure.attach.file(str(fuzzer.minimize_findings()), name="Minimized Findings",
+                                   attachment_type=allure.attachment_type.TEXT)
+
+        assert failures == 0, (
+            f"{failures} of {summary['requests']} payloads caused server errors or stack traces. "
+            f"Findings: {summary['findings_file']}"
+        )
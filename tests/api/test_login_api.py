@@ -4,6 +4,11 @@ import pytest
 import json
 from data.api_endpoints import API_ENDPOINTS
 from data.data_manager import data_manager as test_data
+from utils.schema import assert_matches_schema
+from utils.step_reporting import attach_detail
+
+# Deterministic in every xdist worker: derived from the case names only
+LOGIN_VALIDATION_SHARDS = test_data.case_shard_count("login_validation")
 
 
 # Tests for session-based login API
@@ -18,79 +23,95 @@ class TestLoginAPI:
 
         with allure.step("Verify session is active by accessing protected endpoint"):
             basket_response = authenticated_session.get(API_ENDPOINTS['basket'])
-            allure.attach(f"Status: {basket_response.status_code}", name="Basket Access",
-                          attachment_type=allure.attachment_type.TEXT)
+            attach_detail(f"Status: {basket_response.status_code}", name="Basket Access")
             assert basket_response.status_code == 200
 
     @allure.title("Login with valid credentials returns 200")
-    def test_login_returns_200(self, api_session, login_api_url):
+    def test_login_returns_200(self, api_session, login_api_url, login_payload):
         """Test login endpoint returns 200 on success"""
-        payload = {
-            "username": test_data.valid_user["username"],
-            "password": test_data.valid_user["password"]
-        }
+        payload = login_payload
 
         with allure.step("Send login request"):
             response = api_session.post(login_api_url, json=payload)
-            allure.attach(str(payload), name="Request Payload", attachment_type=allure.attachment_type.JSON)
-            allure.attach(f"Status: {response.status_code}", name="Response Status",
-                          attachment_type=allure.attachment_type.TEXT)
+            attach_detail(str(payload), name="Request Payload", attachment_type=allure.attachment_type.JSON)
+            attach_detail(f"Status: {response.status_code}", name="Response Status")
 
         with allure.step("Verify successful response"):
             assert response.status_code == 200
             assert 'sessionid' in api_session.cookies
 
     @allure.title("Login with invalid credentials validation")
-    @pytest.mark.parametrize("test_case", test_data.login_validation_cases)
-    def test_login_validation(self, api_session, login_api_url, test_case):
-        """Test login validation with various invalid credential scenarios"""
-
-        with allure.step(f"Test: {test_case['name']}"):
-            allure.dynamic.title(f"Login validation: {test_case['name']}")
-
-
-            test_data = {
-                "username": test_case["username"],
-                "password": test_case["password"]
-            }
-
-            # Attach test case info
-            allure.attach(
-                json.dumps(test_case, indent=2),
-                name="Test Case Details",
-                attachment_type=allure.attachment_type.JSON
-            )
-
-            # Send login request
-            response = api_session.post(login_api_url, json=test_data)
-
-            # Attach request/response
-            allure.attach(
-                json.dumps(test_data, indent=2),
-                name="Request Data",
-                attachment_type=allure.attachment_type.JSON
-            )
-            allure.attach(
-                f"Status: {response.status_code}\nResponse: {response.text}",
-                name="Response Info",
-                attachment_type=allure.attachment_type.TEXT
-            )
-
-            # Check response status and cookies
-            assert response.status_code == 401, (
-                f"Expected 401 for {test_case['name']}, got {response.status_code}"
-            )
-            assert 'sessionid' not in api_session.cookies
-
-            # Additional checks based on expected error type
-            response_text = response.text.lower()
+    @pytest.mark.parametrize("shard", range(LOGIN_VALIDATION_SHARDS),
+                             ids=lambda shard: f"shard{shard}of{LOGIN_VALIDATION_SHARDS}")
+    def test_login_validation(self, api_session, login_api_url, shard):
+        """
+        Test login validation with various invalid credential scenarios.
+
+        Cases are streamed from data/cases/login_validation.jsonl; each
+        parametrized shard checks only the cases hashed into it, each in
+        its own Allure step, and the failure lists the cases that broke.
+        """
+        allure.dynamic.title(f"Login validation: shard {shard} of {LOGIN_VALIDATION_SHARDS}")
+        failures = []
+        checked = []
+
+        for test_case in test_data.case_shard("login_validation", shard, LOGIN_VALIDATION_SHARDS):
+            checked.append(test_case["name"])
+            with allure.step(f"Case: {test_case['name']}"):
+                api_session.cookies.clear()
+                try:
+                    self._check_login_rejected(api_session, login_api_url, test_case)
+                except AssertionError as e:
+                    failures.append(f"{test_case['name']}: {e}")
+
+        allure.dynamic.description(f"Cases: {', '.join(checked)}")
+        assert not failures, f"{len(failures)}/{len(checked)} cases failed:\n" + "\n".join(failures)
+
+    @staticmethod
+    def _check_login_rejected(api_session, login_api_url, test_case):
+        """Send one invalid login and verify it is rejected with the expected error"""
+        test_data = {
+            "username": test_case["username"],
+            "password": test_case["password"]
+        }
 
-            if test_case["expected_error"] == "blank_email":
-                assert "blank" in response_text or "empty" in response_text
-            elif test_case["expected_error"] == "invalid_email":
-                assert "invalid" in response_text or "valid" in response_text
-            elif test_case["expected_error"] == "invalid_credentials":
-                assert "invalid login" in response_text or "credentials" in response_text
+        # Attach test case info (kept for the report only if the test fails)
+        attach_detail(
+            json.dumps(test_case, indent=2),
+            name="Test Case Details",
+            attachment_type=allure.attachment_type.JSON
+        )
+
+        # Send login request
+        response = api_session.post(login_api_url, json=test_data)
+
+        # Attach request/response
+        attach_detail(
+            json.dumps(test_data, indent=2),
+            name="Request Data",
+            attachment_type=allure.attachment_type.JSON
+        )
+        attach_detail(
+            f"Status: {response.status_code}\nResponse: {response.text}",
+            name="Response Info",
+            attachment_type=allure.attachment_type.TEXT
+        )
+
+        # Check response status and cookies
+        assert response.status_code == 401, (
+            f"Expected 401 for {test_case['name']}, got {response.status_code}"
+        )
+        assert 'sessionid' not in api_session.cookies
+
+        # Additional checks based on expected error type
+        response_text = response.text.lower()
+
+        if test_case["expected_error"] == "blank_email":
+            assert "blank" in response_text or "empty" in response_text
+        elif test_case["expected_error"] == "invalid_email":
+            assert "invalid" in response_text or "valid" in response_text
+        elif test_case["expected_error"] == "invalid_credentials":
+            assert "invalid login" in response_text or "credentials" in response_text
 
     @allure.title("Login with SQL injection protection")
     def test_sql_injection_protection(self, api_session, login_api_url):
@@ -117,7 +138,7 @@ class TestLoginAPI:
         response = api_session.post(login_api_url, json=empty_payload)
 
         assert response.status_code == 401
-        response_data = response.json()
+        response_data = assert_matches_schema(response, "login_error")
         assert "blank" in str(response_data).lower()
 
     @allure.title("Logout functionality - Strict verification")
@@ -126,7 +147,7 @@ class TestLoginAPI:
 
         with allure.step("Get authenticated basket"):
             basket_before = authenticated_session.get(API_ENDPOINTS['basket'])
-            basket_data_before = basket_before.json()
+            basket_data_before = assert_matches_schema(basket_before, "basket")
             basket_id_before = basket_data_before.get('id')
 
         with allure.step("Perform logout"):
@@ -139,7 +160,7 @@ class TestLoginAPI:
 
         with allure.step("Verify anonymous basket properties"):
             basket_after = authenticated_session.get(API_ENDPOINTS['basket'])
-            basket_data_after = basket_after.json()
+            basket_data_after = assert_matches_schema(basket_after, "basket")
 
             # Check that we have a different basket now
             assert basket_data_after.get('id') != basket_id_before
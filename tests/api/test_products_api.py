@@ -0,0 +1,29 @@
+# Schema checks for catalogue API responses
+import allure
+
+from utils.schema import assert_matches_schema, assert_stream_matches_schema
+
+
+@allure.epic("Catalogue API")
+@allure.feature("Products")
+class TestProductsAPI:
+
+    @allure.title("Product list matches schema (validated while streaming)")
+    def test_product_list_schema(self, api_session, products_api_url):
+        """Every product in /api/products/ has id, url and title; the list is never held in memory"""
+        response = api_session.get(products_api_url, stream=True)
+        assert response.status_code == 200
+
+        count = assert_stream_matches_schema(response, "product_list")
+        allure.attach(f"Products validated: {count}", name="Product Count",
+                      attachment_type=allure.attachment_type.TEXT)
+        assert count > 0
+
+    @allure.title("Product detail matches schema")
+    def test_product_detail_schema(self, api_session, products_api_url):
+        """Product detail of a known book matches the product schema"""
+        response = api_session.get(f"{products_api_url}207/")
+        assert response.status_code == 200
+
+        product = assert_matches_schema(response, "product")
+        assert product["id"] == 207
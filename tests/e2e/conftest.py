@@ -0,0 +1,24 @@
+# tests/e2e/conftest.py
+import re
+
+import pytest
+
+from utils.flow import Flow, FlowRunner
+from utils.run_context import run_dir
+
+
+@pytest.fixture
+def run_flow(browser, request):
+    """
+    Run a declared flow in this test's browser.
+
+    Checkpoints are keyed by test node id, so a rerun of a failed test
+    resumes after the last completed step.
+    """
+    checkpoint_name = re.sub(r"[^\w.-]+", "_", request.node.nodeid)
+    checkpoint_path = run_dir() / "flows" / f"{checkpoint_name}.json"
+
+    def run(flow: Flow, data: dict, prefer_api: bool = True, user: dict = None):
+        return FlowRunner(flow, browser, checkpoint_path, prefer_api, user).run(data)
+
+    return run
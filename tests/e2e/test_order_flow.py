@@ -1,90 +1,75 @@
-"""Module description"""
-# TODO screenshots on failure!!!
-
+"""End-to-end order journeys, declared as flows in utils/order_flows.py"""
 
+import allure
 import pytest
 
-from conftest import catalog_url
-from pages.main_page import MainPage
-from pages.catalog_page import CatalogPage
-from pages.product_page import ProductPage
+from config import settings
+from data.data_manager import data_manager
 from pages.basket_page import BasketPage
 from pages.checkout_page import CheckoutPage
+from pages.product_page import ProductPage
 from utils.api_client import ApiClient
-from config.settings import CATALOG_URL
+from utils.basket_seeder import product_id_from_url
+from utils.order_flows import GUEST_ORDER, LOGGED_IN_ORDER
+
+
+def product_data(product_key: str) -> dict:
+    """Flow inputs for one of the known products in settings"""
+    url = settings.PRODUCT_URLS[product_key]
+    return {
+        "product_id": product_id_from_url(url),
+        "product_slug": url.rstrip("/").rsplit("/", 1)[-1].rsplit("_", 1)[0],
+        "product_title": settings.PRODUCTS[product_key]["title"],
+    }
 
 
-@pytest.mark.skip(reason="🚧 E2E TESTS UNDER DEVELOPMENT - Page Objects not implemented")
 @pytest.mark.e2e
+@allure.epic("E2E")
+@allure.feature("Order Flow")
 class TestE2EOrderFlow:
     """
     End-to-End tests for main user scenarios:
     - Guest completes an order
-    - Logged-in user uses a saved address
+    - Logged-in user completes an order
     - Order fails when product is out of stock
     """
 
-    @pytest.mark.skip(reason="Page Objects not implemented yet - E2E development in progress")
     @pytest.mark.critical
-    @pytest.mark.parametrize("test_product_name", ["The shellcoder's handbook", "Coders at Work"])
-    def test_guest_order_flow(self, browser, main_page_url, test_product_name):
+    @pytest.mark.flaky
+    @pytest.mark.parametrize("prefer_api", [False, True], ids=["ui", "api-shortcuts"])
+    @pytest.mark.parametrize("product_key", ["shellcoders_handbook", "coders_at_work"])
+    def test_guest_order_flow(self, run_flow, product_key, prefer_api):
         """
         E2E: Guest user can add a product to basket and complete checkout.
-        Steps:
-            1. Open main page
-            2. Navigate to catalog
-            3. Select a product
-            4. Add the product to the basket
-            5. Verify product and total price in basket
-            6. Proceed to checkout
-            7. Verify successful order confirmation
+        Steps (utils.order_flows.GUEST_ORDER):
+            1. Add the product to the basket (UI or API)
+            2. Verify the product is in the basket
+            3. Check out as guest (UI or form post)
+            4. Enter the shipping address (UI or form post)
+            5. Place the order and verify the confirmation
         """
-        main_page = MainPage(browser, main_page_url)
-        catalog_page = CatalogPage(browser, catalog_url)
-        product_page = ProductPage(browser)
-        basket_page = BasketPage(browser)
-        checkout_page = CheckoutPage(browser)
+        data = dict(product_data(product_key), email=data_manager.generate_unique_email(prefix="guest"))
+        context = run_flow(GUEST_ORDER, data, prefer_api=prefer_api)
 
-        main_page.open()
-        main_page.go_to_catalog()
-        catalog_page.select_product(test_product_name)
-        product_page.add_to_basket()  # click Add to basket
-        product_page.go_to_basket_from_header()  # navigate to basket page
-        basket_page.should_contain_product(test_product_name)  # TODO: verify product is in basket
-        basket_page.should_match_price("Test Product")  # TODO: verify correct price
-        basket_page.proceed_to_checkout()  # TODO: click "Proceed to checkout"
-        checkout_page.should_display_confirmation()  # TODO: verify confirmation page is shown
+        assert context.data.get("order_number"), "Flow finished without an order number"
 
-    @pytest.mark.skip(reason="Page Objects not implemented yet - E2E development in progress")
     @pytest.mark.critical
-    def test_logged_in_checkout_with_saved_address(self, browser, user):
+    @pytest.mark.flaky
+    def test_logged_in_order_flow(self, run_flow, pooled_user):
         """
-        E2E: Logged-in user can place an order using a saved address.
-        Steps:
-            1. Log in to account
-            2. Ensure saved shipping address exists
-            3. Add product to basket
-            4. Proceed to checkout
-            5. Verify saved address is pre-filled
-            6. Complete the order
+        E2E: Logged-in user can place an order.
+        Steps (utils.order_flows.LOGGED_IN_ORDER):
+            1. Log in (API)
+            2. Add product to basket (API)
+            3. Verify the product is in the basket
+            4. Enter the shipping address
+            5. Place the order and verify the confirmation
         """
-        account_page = user.account_page
-        catalog_page = CatalogPage(browser)
-        product_page = ProductPage(browser)
-        basket_page = BasketPage(browser)
-        checkout_page = CheckoutPage(browser)
-
-        account_page.login("test_user", "secure_password")  # TODO: implement login()
-        account_page.ensure_saved_address_exists()  # TODO: verify or create address
-        catalog_page.select_product("Test Product")  # TODO: select product
-        product_page.add_to_basket()  # TODO: add to basket
-        basket_page.proceed_to_checkout()  # TODO: proceed to checkout
-        checkout_page.should_display_saved_address()  # TODO: verify saved address is shown
-        checkout_page.place_order()  # TODO: place the order
-        checkout_page.should_display_confirmation()  # TODO: verify confirmation page
+        context = run_flow(LOGGED_IN_ORDER, product_data("city_and_stars"), user=pooled_user)
 
+        assert context.data.get("order_number"), "Flow finished without an order number"
 
-    @pytest.mark.skip(reason="Page Objects not implemented yet - E2E development in progress")
+    @pytest.mark.skip(reason="Needs an API to change stock, which the shop does not expose")
     @pytest.mark.negative
     def test_out_of_stock_prevents_order(self, browser):
         """
@@ -29,17 +29,16 @@ class TestLoginFunctional:
     @allure.title("Successful login with valid credentials")
     @allure.severity(allure.severity_level.CRITICAL)
     @allure.tag("positive", "authentication")
-    def test_login_with_valid_credentials(self, browser, login_url):
+    def test_login_with_valid_credentials(self, browser, login_url, pooled_user):
         """Verify successful login with correct credentials."""
 
-        # TODO: make_new_user with valid user_credentials creation before every test to avoid error 500!!!
         login_page = LoginPage(browser, login_url)
 
         with allure.step("Open login page"):
             login_page.open()
 
         with allure.step("Enter valid email and password"):
-            user_credentials = data_manager.valid_user
+            user_credentials = pooled_user
             email = user_credentials["email"]
             password = user_credentials["password"]
             login_page.login_user(email, password)
@@ -98,7 +97,7 @@ class TestLoginFunctional:
     @allure.title("Login with incorrect password")
     @allure.severity(allure.severity_level.NORMAL)
     @allure.tag("negative", "security")
-    def test_login_with_incorrect_password(self, browser, login_url):
+    def test_login_with_incorrect_password(self, browser, login_url, pooled_user):
         """Verify system rejects incorrect passwords."""
         login_page = LoginPage(browser, login_url)
 
@@ -107,7 +106,7 @@ class TestLoginFunctional:
 
         with allure.step("Attempt login with correct email but wrong password"):
             # Use valid email with wrong password
-            user_credentials = data_manager.valid_user
+            user_credentials = pooled_user
             valid_email = user_credentials["email"]
             wrong_password = "Wrong" + user_credentials["password"]
             login_page.login_user(valid_email, wrong_password)
@@ -176,10 +175,10 @@ class TestLoginFunctional:
     @allure.title("Security: SQL injection attempt with payload: {sql_payload}")
     @allure.severity(allure.severity_level.CRITICAL)
     @allure.tag("security", "negative")
-    def test_login_with_sql_injection_attempt(self, browser, login_url, sql_payload):
+    def test_login_with_sql_injection_attempt(self, browser, login_url, sql_payload, pooled_user):
         """Verify system is protected against SQL injection."""
         login_page = LoginPage(browser, login_url)
-        user_credentials = data_manager.valid_user
+        user_credentials = pooled_user
         email = user_credentials["email"]
         password = user_credentials["password"]
 
@@ -208,7 +207,7 @@ class TestLoginFunctional:
     @allure.title("Login with very long password")
     @allure.severity(allure.severity_level.MINOR)
     @allure.tag("negative", "validation")
-    def test_login_with_very_long_password(self, browser, login_url):
+    def test_login_with_very_long_password(self, browser, login_url, pooled_user):
         """Verify system handles extremely long passwords correctly."""
         login_page = LoginPage(browser, login_url)
 
@@ -216,7 +215,7 @@ class TestLoginFunctional:
             login_page.open()
 
         with allure.step("Attempt login with very long password"):
-            email = data_manager.valid_user["email"]
+            email = pooled_user["email"]
             long_password = "A" * 1000  # Example of a very long password
             login_page.login_user(email, long_password)
 
@@ -161,7 +161,7 @@ class TestRegistrationFunctional:
     @allure.title("Registration with existing email")
     @allure.severity(allure.severity_level.NORMAL)
     @allure.tag("negative", "validation")
-    def test_registration_with_existing_email(self, browser, login_url):
+    def test_registration_with_existing_email(self, browser, login_url, pooled_user):
         """Verify system prevents duplicate email registration."""
         login_page = LoginPage(browser, login_url)
 
@@ -169,7 +169,7 @@ class TestRegistrationFunctional:
             login_page.open()
 
         with allure.step("Attempt registration with existing email"):
-            email = data_manager.valid_user["email"]
+            email = pooled_user["email"]
             password = data_manager.strong_passwords[0]
             login_page.register_new_user(email, password)
 
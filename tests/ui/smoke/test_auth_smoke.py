@@ -29,7 +29,7 @@ class TestAuthSmoke:
     4. Verify user is logged in
     """)
     @allure.tag("smoke", "login", "ui", "authentication")
-    def test_login_with_valid_user(self, browser, login_url, valid_user):
+    def test_login_with_valid_user(self, browser, login_url, pooled_user):
         """Test login functionality with valid credentials."""
         login_page = LoginPage(browser, login_url)
 
@@ -37,9 +37,9 @@ class TestAuthSmoke:
             login_page.open()
             logger.info("Opened login page for login test")
 
-        with allure.step(f"Login with user: {valid_user['email']}"):
-            login_page.login_user(valid_user["email"], valid_user["password"])
-            logger.info(f"Attempted login for user: {valid_user['email']}")
+        with allure.step(f"Login with user: {pooled_user['email']}"):
+            login_page.login_user(pooled_user["email"], pooled_user["password"])
+            logger.info(f"Attempted login for user: {pooled_user['email']}")
 
         with allure.step("Verify user is logged in"):
             login_page.should_be_logged_in()
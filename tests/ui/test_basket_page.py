@@ -1,7 +1,8 @@
 from conftest import basket_url
+from config import settings
 from pages.basket_page import BasketPage
-from pages.product_page import ProductPage
 from pages.locators import BasketPageLocators
+from utils.basket_seeder import BasketSeeder
 import pytest
 import allure
 import logging
@@ -12,9 +13,8 @@ logger = logging.getLogger(__name__)
 
 class TestBasketPage:
     @pytest.mark.parametrize("test_product_name, product_url", [
-        ("The shellcoder's handbook",
-         "http://selenium1py.pythonanywhere.com/en-gb/catalogue/the-shellcoders-handbook_209/"),
-        ("Coders at Work", "http://selenium1py.pythonanywhere.com/fi/catalogue/coders-at-work_207/"),
+        ("The shellcoder's handbook", settings.PRODUCT_URLS["shellcoders_handbook"]),
+        ("Coders at Work", settings.PRODUCT_URLS["coders_at_work"]),
     ])
     @allure.title("Verify that basket contains added product: {test_product_name}")
     @allure.feature("Basket Functionality")
@@ -23,6 +23,7 @@ class TestBasketPage:
     def test_basket_should_contain_product(
             self,
             browser: object,
+            basket_seeder: BasketSeeder,
             basket_url: str,
             product_url: str,
             test_product_name: str
@@ -31,15 +32,16 @@ class TestBasketPage:
         Test that verifies a product added to the basket is actually present in the basket.
 
         This test performs the following steps:
-        1. Opens the product page
-        2. Adds the product to the basket
+        1. Adds the product to the basket via the basket API
+        2. Syncs the API session cookies into the browser
         3. Opens the basket page
         4. Verifies the product is present in the basket
 
         Args:
             browser: Selenium WebDriver instance
+            basket_seeder: API basket seeding service
             basket_url: URL of the basket page
-            product_url: URL of the product page to test
+            product_url: URL of the product to put into the basket
             test_product_name: Expected name of the product to verify in basket
 
         Raises:
@@ -50,13 +52,10 @@ class TestBasketPage:
         logger.info(f"Product URL: {product_url}")
         logger.info(f"Basket URL: {basket_url}")
 
-        with allure.step("Open product page and add product to basket"):
-            logger.info(f"Opening product page: {product_url}")
-            product_page = ProductPage(browser, product_url)
-            product_page.open()
-
-            logger.info(f"Adding product '{test_product_name}' to basket")
-            product_page.add_to_basket()
+        with allure.step("Seed basket with product via API"):
+            logger.info(f"Adding product '{test_product_name}' to basket via API")
+            basket_seeder.add_product(product_url)
+            basket_seeder.sync_to_browser(browser)
             logger.info("Product successfully added to basket")
 
         with allure.step("Open basket page and verify product presence"):
@@ -69,4 +68,4 @@ class TestBasketPage:
             basket_page.should_contain_product(test_product_name)
             logger.info(f"Product '{test_product_name}' successfully verified in basket")
 
-        logger.info("Test test_basket_should_contain_product completed successfully")
\ No newline at end of file
+        logger.info("Test test_basket_should_contain_product completed successfully")
@@ -0,0 +1,23 @@
+"""Product page checks driven by the crawled product index"""
+import allure
+
+from pages.product_page import ProductPage
+
+
+@allure.feature("Product Page")
+class TestProductPage:
+
+    @allure.title("Product page shows name, price and add button: {catalogue_product}")
+    def test_product_page_matches_catalogue(self, browser, catalogue_product):
+        """
+        Open the product page directly by its catalogue URL and compare it with the catalogue card.
+
+        Runs for the known products by default and for the whole crawled catalogue with --catalogue.
+        """
+        product_page = ProductPage(browser, catalogue_product["url"])
+        product_page.open()
+
+        product_page.should_be_product_name(catalogue_product["title"])
+        product_page.should_have_price(catalogue_product["price"])
+        if catalogue_product["in_stock"]:
+            product_page.should_be_add_to_basket_button()
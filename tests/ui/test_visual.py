@@ -0,0 +1,38 @@
+"""Visual baselines of the catalogue, product and basket pages (opt-in: --visual or --update-baselines)"""
+import allure
+import pytest
+
+from config import settings
+from pages.basket_page import BasketPage
+from pages.catalog_page import CatalogPage
+from pages.locators import ProductPageLocators
+from pages.product_page import ProductPage
+
+# Regions that differ between runs: basket total in the header and flash messages
+DYNAMIC_REGIONS = [ProductPageLocators.BASKET_TOTAL_NAVBAR, ProductPageLocators.BASKET_MESSAGE_BOX]
+
+
+@pytest.mark.visual
+@allure.feature("Visual Regression")
+class TestVisualBaselines:
+
+    @allure.title("Catalogue page matches its visual baseline")
+    def test_catalogue_page_visual(self, browser, catalog_url):
+        catalog_page = CatalogPage(browser, catalog_url)
+        catalog_page.open()
+        catalog_page.should_match_visual_baseline("catalogue", mask=DYNAMIC_REGIONS)
+
+    @allure.title("Product details match their visual baseline")
+    def test_product_page_visual(self, browser):
+        product_page = ProductPage(browser, settings.PRODUCT_URLS["coders_at_work"])
+        product_page.open()
+        product_page.should_match_visual_baseline("product_coders_at_work", locator=ProductPageLocators.PRODUCT_MAIN,
+                                                  mask=[ProductPageLocators.PRODUCT_AVAILABILITY])
+
+    @allure.title("Basket with one product matches its visual baseline")
+    def test_basket_page_visual(self, browser, basket_seeder, basket_url):
+        basket_seeder.add_product(settings.PRODUCT_URLS["coders_at_work"])
+        basket_seeder.sync_to_browser(browser)
+        basket_page = BasketPage(browser, basket_url)
+        basket_page.open()
+        basket_page.should_match_visual_baseline("basket_one_product", mask=DYNAMIC_REGIONS)
@@ -0,0 +1,60 @@
+"""iter_json_array on bodies split at every possible chunk boundary (no network needed)"""
+import json
+
+import allure
+import pytest
+
+from utils.schema import iter_json_array
+
+
+class ChunkedResponse:
+    """Stands in for a streamed requests.Response that delivers the body in the given chunks"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.encoding = "utf-8"
+
+    def iter_content(self, chunk_size=None, decode_unicode=False):
+        return iter(self.chunks)
+
+
+def splits(body):
+    """The body as one chunk, and cut into two chunks at every position"""
+    yield [body]
+    for cut in range(1, len(body)):
+        yield [body[:cut], body[cut:]]
+
+
+@pytest.mark.unit
+@allure.feature("Schema Validation")
+class TestIterJsonArray:
+
+    @pytest.mark.parametrize("items", [
+        [5.5, 12, -3e2, 0],
+        [True, False, None, "a, b ] c"],
+        [{"id": 1, "price": 51.77, "tags": ["x", "y"]}, [1, [2, 3]], {}],
+        [],
+    ], ids=["numbers", "literals-and-strings", "objects-and-arrays", "empty"])
+    def test_items_split_across_chunks(self, items):
+        body = json.dumps(items)
+        for chunks in splits(body):
+            assert list(iter_json_array(ChunkedResponse(chunks))) == items, f"chunks {chunks!r}"
+
+    def test_number_cut_at_decimal_point(self):
+        assert list(iter_json_array(ChunkedResponse(["[5.", "5]"]))) == [5.5]
+
+    def test_number_cut_at_exponent(self):
+        assert list(iter_json_array(ChunkedResponse(["[1e", "3, 2]"]))) == [1000.0, 2]
+
+    def test_paginated_object_yields_results(self):
+        body = json.dumps({"count": 2, "results": [{"id": 1}, {"id": 2}]})
+        assert list(iter_json_array(ChunkedResponse([body[:7], body[7:]]))) == [{"id": 1}, {"id": 2}]
+
+    @pytest.mark.parametrize("chunks", [["[1, 2"], ["[5."], ['[{"id": 1}']], ids=["unclosed", "cut-number", "cut-object"])
+    def test_truncated_body_raises(self, chunks):
+        with pytest.raises(ValueError, match="ended unexpectedly"):
+            list(iter_json_array(ChunkedResponse(chunks)))
+
+    def test_not_an_array_raises(self):
+        with pytest.raises(ValueError, match="Expected a JSON array"):
+            list(iter_json_array(ChunkedResponse(['"text"'])))
@@ -0,0 +1,259 @@
+"""
+Conditional-GET cache for read-only API resources
+
+Reference data (products, countries, options) is the same for every test,
+so GETs to those endpoints are answered from a cache instead of the shop:
+
+1. In-memory LRU per worker process
+2. Shared on-disk store under .run/api_cache/, one directory per endpoint
+   group, reused by all workers and by later runs
+
+An entry younger than API_CACHE_TTL is served as is. An older entry is
+revalidated with If-None-Match / If-Modified-Since; a 304 refreshes it
+without downloading the body again. POST/PUT/PATCH/DELETE to an endpoint
+group (and checkout, which changes stock) invalidate that group for all
+workers by bumping a generation file next to the stored entries.
+
+Usage:
+    session = cached_session()
+    session.get(API_ENDPOINTS["countries"])   # miss, stored
+    session.get(API_ENDPOINTS["countries"])   # hit, no request sent
+    api_cache.invalidate("products")
+"""
+
+import hashlib
+import logging
+import pickle
+import shutil
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from config import settings
+from data.api_endpoints import API_ENDPOINTS
+from utils.api_timing import TimedHTTPAdapter
+from utils.run_context import artifacts_dir
+
+logger = logging.getLogger(__name__)
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Extra groups a mutating call to an endpoint invalidates (placing an order changes stock)
+_INVALIDATES = {"checkout": ("products",)}
+
+# Response headers kept with an entry
+_STORED_HEADERS = ("Content-Type", "Content-Language", "ETag", "Last-Modified", "Vary", "Allow")
+
+
+def endpoint_group(url: str) -> Optional[str]:
+    """Name of the API_ENDPOINTS entry whose URL is the longest prefix of url."""
+    matches = [(len(prefix), name) for name, prefix in API_ENDPOINTS.items() if url.startswith(prefix)]
+    return max(matches)[1] if matches else None
+
+
+class ResponseCache:
+    """
+    Two-level cache of GET responses for the endpoint groups in settings.API_CACHEABLE_ENDPOINTS.
+
+    Attributes:
+        root (Path): On-disk store shared by all workers
+        ttl (float): Seconds an entry is served without revalidation
+        stats (Counter): hit, revalidated, miss, store and invalidate counts of this process
+    """
+
+    def __init__(self, root: Optional[Path] = None, ttl: float = settings.API_CACHE_TTL,
+                 max_entries: int = settings.API_CACHE_MAX_ENTRIES):
+        self._root = root
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._generations: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    @property
+    def root(self) -> Path:
+        # Resolved lazily so importing this module does not touch the filesystem
+        if self._root is None:
+            self._root = artifacts_dir() / "api_cache"
+        return self._root
+
+    @staticmethod
+    def cacheable(url: str) -> bool:
+        return endpoint_group(url) in settings.API_CACHEABLE_ENDPOINTS
+
+    @staticmethod
+    def key(request: requests.PreparedRequest) -> str:
+        vary = "|".join(request.headers.get(h, "") for h in ("Accept", "Accept-Language"))
+        return hashlib.sha1(f"{request.url}|{vary}".encode()).hexdigest()
+
+    # ---- generations (cross-worker invalidation) ----
+    def _generation(self, group: str) -> str:
+        path = self.root / group / ".generation"
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return ""
+        cached = self._generations.get(group)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        generation = path.read_text(encoding="utf-8")
+        self._generations[group] = (mtime, generation)
+        return generation
+
+    def invalidate(self, group: str) -> None:
+        """Drop every entry of an endpoint group, in this process and on disk for all workers."""
+        with self._lock:
+            for key in [k for k, entry in self._memory.items() if entry["group"] == group]:
+                del self._memory[key]
+        directory = self.root / group
+        shutil.rmtree(directory, ignore_errors=True)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / ".generation").write_text(uuid.uuid4().hex, encoding="utf-8")
+        self.stats["invalidate"] += 1
+        logger.debug(f"API cache invalidated: {group}")
+
+    # ---- entries ----
+    def get(self, key: str, group: str) -> Optional[Dict]:
+        generation = self._generation(group)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry["generation"] == generation:
+                    self._memory.move_to_end(key)
+                    return entry
+                del self._memory[key]
+
+        path = self.root / group / f"{key}.pickle"
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if entry.get("generation") != generation:
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, group: str, response: requests.Response) -> Dict:
+        entry = {
+            "group": group,
+            "generation": self._generation(group),
+            "url": response.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {h: response.headers[h] for h in _STORED_HEADERS if h in response.headers},
+            "content": response.content,
+            "stored_at": time.time(),
+        }
+        self.save(key, entry)
+        self.stats["store"] += 1
+        return entry
+
+    def save(self, key: str, entry: Dict) -> None:
+        self._remember(key, entry)
+        directory = self.root / entry["group"]
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f"{key}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(directory / f"{key}.pickle")
+
+    def _remember(self, key: str, entry: Dict) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def fresh(self, entry: Dict) -> bool:
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def hit_rate(self, stats: Optional[Counter] = None) -> Optional[float]:
+        """Share of cacheable GETs answered without downloading the body (hits and 304s)."""
+        stats = self.stats if stats is None else stats
+        served = stats["hit"] + stats["revalidated"]
+        total = served + stats["miss"]
+        return served / total if total else None
+
+
+api_cache = ResponseCache()
+
+
+def _response_from_entry(entry: Dict, request: requests.PreparedRequest, adapter, source: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.reason = entry["reason"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.headers["X-Cache"] = source
+    response._content = entry["content"]
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = entry["url"]
+    response.request = request
+    response.connection = adapter
+    response.elapsed = timedelta(0)
+    return response
+
+
+class CachingHTTPAdapter(TimedHTTPAdapter):
+    """TimedHTTPAdapter that answers cacheable GETs from api_cache and invalidates on writes."""
+
+    def __init__(self, cache: ResponseCache = api_cache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, stream=False, **kwargs):
+        method = request.method.upper()
+        group = endpoint_group(request.url)
+
+        if method in MUTATING_METHODS:
+            response = super().send(request, stream=stream, **kwargs)
+            for invalidated in (group,) + _INVALIDATES.get(group, ()):
+                if invalidated in settings.API_CACHEABLE_ENDPOINTS:
+                    self.cache.invalidate(invalidated)
+            return response
+
+        if method != "GET" or stream or group not in settings.API_CACHEABLE_ENDPOINTS:
+            return super().send(request, stream=stream, **kwargs)
+
+        key = self.cache.key(request)
+        entry = self.cache.get(key, group)
+        if entry is not None and self.cache.fresh(entry):
+            self.cache.stats["hit"] += 1
+            return _response_from_entry(entry, request, self, "HIT")
+
+        if entry is not None:
+            if entry["headers"].get("ETag"):
+                request.headers["If-None-Match"] = entry["headers"]["ETag"]
+            if entry["headers"].get("Last-Modified"):
+                request.headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        response = super().send(request, stream=stream, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.stats["revalidated"] += 1
+            entry = dict(entry, stored_at=time.time())
+            self.cache.save(key, entry)
+            return _response_from_entry(entry, request, self, "REVALIDATED")
+
+        self.cache.stats["miss"] += 1
+        if response.status_code == 200 and "no-store" not in response.headers.get("Cache-Control", ""):
+            self.cache.put(key, group, response)
+        return response
+
+
+def cached_session(session: Optional[requests.Session] = None) -> requests.Session:
+    """Mount CachingHTTPAdapter (timing included) on a (new) session for http and https."""
+    session = session or requests.Session()
+    adapter = CachingHTTPAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
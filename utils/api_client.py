@@ -1,9 +1,15 @@
+import json
+
+from config import settings
+from utils.api_cache import cached_session
 
 
 class ApiClient:
-    def __init__(self, base_url, auth_token=None):
+    def __init__(self, base_url=settings.BASE_URL, auth_token=None):
         self.base_url = base_url
         self.auth_token = auth_token
+        # One keep-alive session for all calls; requests are timed, reference data is cached
+        self.session = cached_session()
 
     def _get_headers(self):
         headers = {
@@ -14,39 +20,32 @@ class ApiClient:
         return headers
 
     def get(self, endpoint, params=None):
-        import requests
-
         url = f"{self.base_url}{endpoint}"
-        response = requests.get(url, headers=self._get_headers(), params=params)
+        response = self.session.get(url, headers=self._get_headers(), params=params)
         response.raise_for_status()
         return response.json()
 
     def post(self, endpoint, data=None):
-        import requests
-        import json
-
         url = f"{self.base_url}{endpoint}"
-        response = requests.post(
+        response = self.session.post(
             url, headers=self._get_headers(), data=json.dumps(data)
         )
         response.raise_for_status()
         return response.json()
 
     def put(self, endpoint, data=None):
-        import requests
-        import json
-
         url = f"{self.base_url}{endpoint}"
-        response = requests.put(
+        response = self.session.put(
             url, headers=self._get_headers(), data=json.dumps(data)
         )
         response.raise_for_status()
         return response.json()
 
     def delete(self, endpoint):
-        import requests
-
         url = f"{self.base_url}{endpoint}"
-        response = requests.delete(url, headers=self._get_headers())
+        response = self.session.delete(url, headers=self._get_headers())
         response.raise_for_status()
-        return response.status_code == 204
\ No newline at end of file
+        return response.status_code == 204
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,246 @@
+"""
+API request timing
+
+Every request sent through a session from timed_session() is split into
+DNS lookup, TCP/TLS connect, time to first byte and total time, and
+recorded per endpoint ("GET /api/products/{id}/") in HDR-style histograms.
+DNS and connect are only non-zero when the request opened a new
+connection; keep-alive reuse shows up as 0.
+
+At the end of a run the per-endpoint p50/p95/p99 are stored in
+.run/results.db (utils/results_db.py). An endpoint regresses when its p95
+is more than API_LATENCY_TOLERANCE above the median p95 of earlier runs
+(and at least API_LATENCY_MIN_DELTA_MS slower), which catches backend
+slowdowns that functional asserts don't.
+
+Usage:
+    session = timed_session()
+    session.get(API_ENDPOINTS["basket"])
+    api_timings.summary()
+"""
+
+import logging
+import re
+import socket
+import statistics
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config import settings
+from utils.histogram import LatencyHistogram
+from utils.results_db import ResultsDB
+from utils.run_context import run_id
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("dns", "connect", "ttfb", "total")
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{32}|[0-9a-f-]{36})$", re.IGNORECASE)
+
+# Connection phases of the request currently being sent on this thread
+_phases = threading.local()
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """Group URLs by endpoint: numeric and uuid path segments become {id}, query is dropped."""
+    path = urlparse(url).path
+    segments = ["{id}" if _ID_SEGMENT.match(s) else s for s in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+class _TimedConnectionMixin:
+    """Splits connection setup into DNS resolution and connect (TCP + TLS)."""
+
+    def _new_conn(self):
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            resolved = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except OSError:
+            resolved = host  # let urllib3 raise its usual NameResolutionError
+        _phases.dns = time.perf_counter() - start
+
+        # Connect to the resolved address; TLS still uses self.host for SNI and certificate checks
+        self._dns_host = resolved
+        try:
+            return super()._new_conn()
+        finally:
+            self._dns_host = host
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _phases.connect = time.perf_counter() - start - getattr(_phases, "dns", 0.0)
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class ApiTimings:
+    """
+    Per-endpoint phase histograms for this process, plus the samples of the current test.
+
+    Attributes:
+        endpoints (Dict[str, Dict[str, LatencyHistogram]]): endpoint -> phase -> histogram
+        test_samples (List[Dict]): Requests made since the last reset_test()
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self.test_samples: List[Dict] = []
+        self.regressions: List[Dict] = []
+
+    def record(self, endpoint: str, phases: Dict[str, float], status: Optional[int]) -> None:
+        with self._lock:
+            histograms = self.endpoints.setdefault(endpoint, {p: LatencyHistogram() for p in PHASES})
+            for phase in PHASES:
+                histograms[phase].record(phases[phase])
+            self.test_samples.append({"endpoint": endpoint, "status": status,
+                                      **{f"{p}_ms": round(phases[p] * 1000, 1) for p in PHASES}})
+
+    def reset_test(self) -> None:
+        with self._lock:
+            self.test_samples = []
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per endpoint: request count, total p50/p95/p99 and p95 of every phase, in ms."""
+        result = {}
+        for endpoint, histograms in sorted(self.endpoints.items()):
+            total = histograms["total"]
+            row = {"count": total.count, "p50_ms": total.percentile_ms(50),
+                   "p95_ms": total.percentile_ms(95), "p99_ms": total.percentile_ms(99)}
+            for phase in ("dns", "connect", "ttfb"):
+                row[f"{phase}_p95_ms"] = histograms[phase].percentile_ms(95)
+            result[endpoint] = row
+        return result
+
+    def to_dict(self) -> Dict:
+        return {endpoint: {phase: h.to_dict() for phase, h in histograms.items()}
+                for endpoint, histograms in self.endpoints.items()}
+
+    def merge_dict(self, data: Dict) -> None:
+        """Add histograms serialized by another process (xdist worker)."""
+        with self._lock:
+            for endpoint, phases in data.items():
+                histograms = self.endpoints.setdefault(endpoint, {p: LatencyHistogram() for p in PHASES})
+                for phase, histogram in phases.items():
+                    histograms[phase].merge(LatencyHistogram.from_dict(histogram))
+
+
+api_timings = ApiTimings()
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that records DNS, connect, TTFB and total time of every request into api_timings."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, stream=False, **kwargs):
+        _phases.dns = _phases.connect = 0.0
+        start = time.perf_counter()
+        try:
+            response = super().send(request, stream=stream, **kwargs)
+        except requests.RequestException:
+            self._record(request, start, time.perf_counter(), None)
+            raise
+
+        headers_at = time.perf_counter()
+        if not stream:
+            response.content  # noqa: B018 - read the body here so total includes the download
+        self._record(request, start, headers_at, response.status_code)
+        return response
+
+    @staticmethod
+    def _record(request, start: float, headers_at: float, status: Optional[int]) -> None:
+        dns, connect = _phases.dns, _phases.connect
+        phases = {
+            "dns": dns,
+            "connect": connect,
+            "ttfb": max(headers_at - start - dns - connect, 0.0),
+            "total": time.perf_counter() - start,
+        }
+        api_timings.record(endpoint_key(request.method, request.url), phases, status)
+
+
+def timed_session(session: Optional[requests.Session] = None) -> requests.Session:
+    """Mount TimedHTTPAdapter on a (new) session for http and https."""
+    session = session or requests.Session()
+    adapter = TimedHTTPAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class LatencyHistory:
+    """
+    Per-endpoint p95 of the last API_LATENCY_HISTORY_RUNS runs in the results database.
+
+    The current run is left out, so the baseline is the same before and after the run is stored.
+
+    Attributes:
+        runs (Dict[str, List[float]]): endpoint -> p95 ms of earlier runs
+    """
+
+    def __init__(self, db: ResultsDB):
+        self.runs = db.api_p95_history(settings.API_LATENCY_HISTORY_RUNS, settings.API_LATENCY_MIN_SAMPLES,
+                                       exclude_run=run_id())
+
+    def baseline_p95(self, endpoint: str) -> Optional[float]:
+        """Median p95 of earlier runs, None until API_LATENCY_MIN_HISTORY runs are stored."""
+        history = self.runs.get(endpoint, [])
+        if len(history) < settings.API_LATENCY_MIN_HISTORY:
+            return None
+        return statistics.median(history)
+
+    def is_regression(self, endpoint: str, p95_ms: Optional[float]) -> Optional[float]:
+        """Return the baseline p95 if p95_ms regresses against it, else None."""
+        baseline = self.baseline_p95(endpoint)
+        if baseline is None or p95_ms is None:
+            return None
+        if (p95_ms > baseline * (1 + settings.API_LATENCY_TOLERANCE)
+                and p95_ms - baseline > settings.API_LATENCY_MIN_DELTA_MS):
+            return baseline
+        return None
+
+    def regressions(self, summary: Dict[str, Dict]) -> List[Dict]:
+        """Endpoints of a run summary whose p95 regressed against history."""
+        found = []
+        for endpoint, row in summary.items():
+            if row["count"] < settings.API_LATENCY_MIN_SAMPLES:
+                continue
+            baseline = self.is_regression(endpoint, row["p95_ms"])
+            if baseline is not None:
+                found.append({"endpoint": endpoint, "p95_ms": row["p95_ms"], "baseline_p95_ms": baseline,
+                              "count": row["count"]})
+        return found
+
+
+def slow_test_requests(history: LatencyHistory, samples: List[Dict]) -> List[Dict]:
+    """Requests of one test whose total time exceeds the regression threshold of their endpoint."""
+    return [sample for sample in samples if history.is_regression(sample["endpoint"], sample["total_ms"]) is not None]
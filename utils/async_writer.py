@@ -0,0 +1,313 @@
+"""
+Background writer for logs and Allure files
+
+Logging, screenshots and Allure attachments used to be written in the test
+thread, so a slow terminal or disk stalled WebDriver interaction. Now:
+
+- the root logger has a single queue handler; one writer thread formats
+  the records and writes them to the run log (.run/runs/<id>/logs/<worker>.log)
+  and, outside xdist workers, to the terminal
+- Allure results, containers and attachment bodies (screenshots, JSON,
+  helper step dumps) are serialized in the test thread and written to disk
+  by the writer thread
+- the writer takes everything queued at once and writes it with one write
+  and one flush per sink
+
+Backpressure: the queue holds ASYNC_WRITER_QUEUE_SIZE items. When it is
+full, INFO/DEBUG records are dropped, WARNING and above wait up to
+ASYNC_WRITER_BLOCK_SECONDS for room. Files are never dropped: once more
+than ASYNC_WRITER_MAX_PENDING_BYTES are waiting they are written in the
+calling thread. The counters are printed in the run summary.
+
+Usage (conftest.py):
+    writer = AsyncWriter()
+    writer.install(run_dir() / "logs" / f"{worker_id()}.log", console=True)
+    config.pluginmanager.register(AsyncWriterPlugin(writer), "async_writer")
+"""
+
+import copy
+import io
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import uuid
+from functools import partial
+from logging.handlers import QueueHandler
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, TextIO
+
+import allure_commons
+import pytest
+from allure_commons.logger import AllureFileLogger
+from attr import asdict
+
+from config import settings
+
+_STOP = object()
+# Size counted for a queued Allure result or container, whose JSON is not measured
+_RESULT_SIZE_ESTIMATE = 4096
+
+
+class _Sink:
+    """A stream the writer thread appends formatted records to."""
+
+    def __init__(self, stream: TextIO, formatter: logging.Formatter, level: int, owned: bool):
+        self.stream = stream
+        self.formatter = formatter
+        self.level = level
+        self.owned = owned
+        self.lines: List[str] = []
+
+
+class AsyncQueueHandler(QueueHandler):
+    """Root handler that hands records to the writer thread."""
+
+    def __init__(self, writer: "AsyncWriter"):
+        super().__init__(None)
+        self.writer = writer
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the arguments and traceback in the calling thread; the sinks format the rest."""
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.writer.enqueue_record(record)
+
+
+class AsyncWriter:
+    """
+    One background thread writing log records and artifact files.
+
+    Attributes:
+        counters (Dict[str, int]): log_records, dropped_records, artifacts (written in the
+            background), inline_artifacts (written by the caller), batches, max_depth
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, int] = dict.fromkeys(
+            ("log_records", "dropped_records", "artifacts", "inline_artifacts", "batches", "max_depth"), 0)
+        self._queue: queue.Queue = queue.Queue(maxsize=settings.ASYNC_WRITER_QUEUE_SIZE)
+        self._sinks: List[_Sink] = []
+        self._handler: Optional[AsyncQueueHandler] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._pending_bytes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+            self.counters["max_depth"] = max(self.counters["max_depth"], self._queue.qsize())
+
+    def add_sink(self, stream: TextIO, formatter: logging.Formatter, level: int = logging.NOTSET,
+                 owned: bool = False) -> None:
+        """Write records of at least `level` to the stream; owned streams are closed on stop()."""
+        self._sinks.append(_Sink(stream, formatter, level, owned))
+
+    def install(self, log_file: Path, console: bool) -> None:
+        """Start the writer thread and route the root logger through it."""
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        self.add_sink(open(log_file, "a", encoding="utf-8"), logging.Formatter(settings.LOG_FORMAT), owned=True)
+        if console:
+            self.add_sink(sys.stderr, logging.Formatter(settings.LOG_CONSOLE_FORMAT, settings.LOG_CONSOLE_DATE_FORMAT),
+                          getattr(logging, settings.LOG_LEVEL))
+        self._thread = threading.Thread(target=self._run, name="async-writer", daemon=True)
+        self._thread.start()
+        self._handler = AsyncQueueHandler(self)
+        root = logging.getLogger()
+        root.addHandler(self._handler)
+        root.setLevel(getattr(logging, settings.LOG_LEVEL))
+
+    def enqueue_record(self, record: logging.LogRecord) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            try:
+                if record.levelno < logging.WARNING:
+                    raise
+                self._queue.put(record, timeout=settings.ASYNC_WRITER_BLOCK_SECONDS)
+            except queue.Full:
+                self._count("dropped_records")
+                return
+        self._count("log_records")
+
+    def submit(self, job: Callable[[], None], size: int) -> None:
+        """Run a file write on the writer thread, or right here when the writer is stopped or over budget."""
+        with self._lock:
+            queued = self.running and self._pending_bytes + size <= settings.ASYNC_WRITER_MAX_PENDING_BYTES
+            if queued:
+                self._pending_bytes += size
+        if queued:
+            try:
+                self._queue.put_nowait((job, size))
+                self._count("artifacts")
+                return
+            except queue.Full:
+                with self._lock:
+                    self._pending_bytes -= size
+        self._count("inline_artifacts")
+        job()
+
+    def flush(self) -> None:
+        """Wait until everything queued so far is written."""
+        if self.running:
+            self._queue.join()
+
+    def stop(self) -> None:
+        """Write what is queued, stop the thread and detach from the root logger."""
+        if self._handler is not None:
+            logging.getLogger().removeHandler(self._handler)
+            self._handler = None
+        if self.running:
+            self._queue.put(_STOP)
+            self._thread.join(timeout=60)
+        for sink in self._sinks:
+            if sink.owned:
+                sink.stream.close()
+        self._sinks.clear()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < settings.ASYNC_WRITER_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for item in batch:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, logging.LogRecord):
+                    for sink in self._sinks:
+                        if item.levelno >= sink.level:
+                            sink.lines.append(sink.formatter.format(item) + "\n")
+                else:
+                    self._write_artifact(*item)
+            self._flush_sinks()
+            self._count("batches")
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_artifact(self, job: Callable[[], None], size: int) -> None:
+        try:
+            job()
+        except Exception as e:
+            print(f"async writer: failed to write artifact: {type(e).__name__}: {e}", file=sys.__stderr__)
+        finally:
+            with self._lock:
+                self._pending_bytes -= size
+
+    def _flush_sinks(self) -> None:
+        for sink in self._sinks:
+            if not sink.lines:
+                continue
+            try:
+                sink.stream.write("".join(sink.lines))
+                sink.stream.flush()
+            except (OSError, ValueError) as e:
+                print(f"async writer: failed to write log: {e}", file=sys.__stderr__)
+            sink.lines.clear()
+
+
+def _write_json(path: Path, data: Dict) -> None:
+    indent = 4 if os.environ.get("ALLURE_INDENT_OUTPUT") else None
+    with io.open(path, "w", encoding="utf8") as json_file:
+        json.dump(data, json_file, indent=indent, ensure_ascii=False)
+
+
+def _write_bytes(path: Path, body) -> None:
+    with open(path, "wb") as attached_file:
+        attached_file.write(body.encode("utf-8") if isinstance(body, str) else body)
+
+
+class AsyncAllureFileLogger(AllureFileLogger):
+    """
+    AllureFileLogger that leaves the file writes to the async writer.
+
+    Results are serialized in the calling thread, since allure keeps
+    changing its objects after reporting them. Attached files are still
+    copied right away: the caller may delete the source afterwards.
+    """
+
+    def __init__(self, report_dir: Path, writer: AsyncWriter):
+        super().__init__(report_dir, clean=False)
+        self._writer = writer
+
+    def _report_item(self, item) -> None:
+        filename = item.file_pattern.format(prefix=uuid.uuid4())
+        data = asdict(item, filter=lambda _, v: v or v is False)
+        self._writer.submit(partial(_write_json, self._report_dir / filename, data), _RESULT_SIZE_ESTIMATE)
+
+    @allure_commons.hookimpl
+    def report_attached_data(self, body, file_name):
+        self._writer.submit(partial(_write_bytes, self._report_dir / file_name, body), len(body))
+
+
+class AsyncWriterPlugin:
+    """Pytest plugin that routes Allure files through the writer and reports its counters."""
+
+    def __init__(self, writer: AsyncWriter):
+        self.writer = writer
+        self._allure_logger = None
+        self._allure_name = None
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        """Swap allure-pytest's file logger (registered in its pytest_configure) for the async one"""
+        plugins = allure_commons.plugin_manager
+        original = next((plugin for plugin in plugins.get_plugins() if type(plugin) is AllureFileLogger), None)
+        if original is None:
+            return
+        self._allure_logger, self._allure_name = original, plugins.get_name(original)
+        plugins.unregister(original)
+        plugins.register(AsyncAllureFileLogger(original._report_dir, self.writer), self._allure_name)
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Workers hand their counters to the controller for the summary"""
+        self.writer.flush()
+        if hasattr(session.config, "workerinput"):
+            session.config.workeroutput["async_writer"] = dict(self.writer.counters)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error) -> None:
+        """Add up the counters of a finished xdist worker"""
+        for name, value in getattr(node, "workeroutput", {}).get("async_writer", {}).items():
+            if name == "max_depth":
+                self.writer.counters[name] = max(self.writer.counters[name], value)
+            else:
+                self.writer.counters[name] += value
+
+    def pytest_terminal_summary(self, terminalreporter, config) -> None:
+        if hasattr(config, "workerinput"):
+            return
+        counters = self.writer.counters
+        if not (counters["log_records"] or counters["artifacts"] or counters["inline_artifacts"]):
+            return
+        terminalreporter.write_sep("=", "Async writer")
+        terminalreporter.write_line(
+            f"{counters['log_records']} log records and {counters['artifacts']} files written in the background "
+            f"({counters['batches']} batches, max queue depth {counters['max_depth']}); "
+            f"{counters['dropped_records']} records dropped, {counters['inline_artifacts']} files written inline",
+            yellow=bool(counters["dropped_records"] or counters["inline_artifacts"])
+        )
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_unconfigure(self, config) -> None:
+        """Write the rest and give allure-pytest its own file logger back for its cleanup"""
+        self.writer.stop()
+        if self._allure_logger is not None:
+            plugins = allure_commons.plugin_manager
+            plugins.unregister(name=self._allure_name)
+            plugins.register(self._allure_logger, self._allure_name)
@@ -0,0 +1,135 @@
+"""
+Basket seeding over the API
+
+Puts products into a basket through API_ENDPOINTS['basket_add_product'] and
+copies the resulting session cookies into the browser, so basket tests can
+start directly at BASKET_URL instead of clicking through product pages.
+
+Usage:
+    seeder = BasketSeeder()
+    seeder.add_product(settings.PRODUCT_URLS["coders_at_work"])
+    seeder.add_product(209, quantity=2)
+    seeder.sync_to_browser(browser)
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional, Union
+
+import allure
+import requests
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from config import settings
+from data.api_endpoints import API_ENDPOINTS
+from utils.api_cache import cached_session
+
+logger = logging.getLogger(__name__)
+
+# Catalogue URLs end with "<slug>_<id>/", e.g. /catalogue/coders-at-work_207/
+_PRODUCT_ID_PATTERN = re.compile(r"_(\d+)/?$")
+
+
+def product_id_from_url(product_url: str) -> int:
+    """
+    Extract the numeric product id from a catalogue URL.
+
+    Args:
+        product_url: Product page URL such as settings.PRODUCT_URLS values
+
+    Returns:
+        Product id
+
+    Raises:
+        ValueError: If the URL does not end with a product id
+    """
+    match = _PRODUCT_ID_PATTERN.search(product_url.split("?")[0])
+    if not match:
+        raise ValueError(f"Cannot extract product id from URL: {product_url}")
+    return int(match.group(1))
+
+
+class BasketSeeder:
+    """
+    Adds products to a basket over the API and hands the basket to a browser.
+
+    Attributes:
+        session (requests.Session): Session that owns the basket cookies
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        self._owns_session = session is None
+        self.session = session or cached_session()
+        self.session.headers.setdefault('User-Agent', 'QA-Tests/1.0')
+
+    @staticmethod
+    def product_api_url(product: Union[int, str]) -> str:
+        """Resolve a product id or catalogue URL to its API product URL."""
+        product_id = product if isinstance(product, int) else product_id_from_url(product)
+        return f"{API_ENDPOINTS['products']}{product_id}/"
+
+    def _csrf_headers(self) -> Dict[str, str]:
+        token = self.session.cookies.get('csrftoken')
+        return {'X-CSRFToken': token, 'Referer': settings.BASE_URL} if token else {}
+
+    @allure.step("Seed basket via API with product: {product}")
+    def add_product(self, product: Union[int, str], quantity: int = 1) -> Dict[str, Any]:
+        """
+        Add a product to the basket.
+
+        Args:
+            product: Product id or catalogue URL
+            quantity: Number of items to add
+
+        Returns:
+            Basket JSON returned by the API
+        """
+        payload = {"url": self.product_api_url(product), "quantity": quantity}
+        response = self.session.post(
+            API_ENDPOINTS['basket_add_product'],
+            json=payload,
+            headers=self._csrf_headers(),
+            timeout=settings.PAGE_LOAD_TIMEOUT
+        )
+        assert response.status_code in (200, 201), (
+            f"Seeding basket failed with status {response.status_code}. Response: {response.text}"
+        )
+        logger.info("Seeded basket with %s x %s", quantity, payload["url"])
+        return response.json()
+
+    def add_products(self, products: List[Union[int, str]]) -> Dict[str, Any]:
+        """Add several products (one of each) and return the final basket JSON."""
+        basket = {}
+        for product in products:
+            basket = self.add_product(product)
+        return basket
+
+    @allure.step("Sync API session cookies into browser")
+    def sync_to_browser(self, browser: WebDriver) -> None:
+        """
+        Copy the seeded session cookies into the browser.
+
+        Chromium drivers receive cookies through CDP without a navigation;
+        other browsers must first be on the shop domain to accept them.
+        """
+        cookies = list(self.session.cookies)
+
+        if hasattr(browser, "execute_cdp_cmd"):
+            for cookie in cookies:
+                browser.execute_cdp_cmd("Network.setCookie", {
+                    "name": cookie.name,
+                    "value": cookie.value,
+                    "url": settings.BASE_URL,
+                    "path": cookie.path or "/",
+                })
+        else:
+            browser.get(settings.BASE_URL)
+            for cookie in cookies:
+                browser.add_cookie({"name": cookie.name, "value": cookie.value, "path": cookie.path or "/"})
+
+        logger.info("Synced %d cookies into browser: %s", len(cookies), [c.name for c in cookies])
+
+    def close(self) -> None:
+        """Close the underlying session if the seeder created it."""
+        if self._owns_session:
+            self.session.close()
@@ -0,0 +1,222 @@
+"""
+Pre-warmed Chrome profile template
+
+A fresh Chrome profile pays first-run costs on every launch: profile
+creation, preference migration and a cold disk cache. In template mode one
+warmed user-data-dir is built at session start and every driver gets a cheap
+copy of it (reflink where the filesystem supports it, plain copy otherwise).
+
+Usage:
+    pytest tests/ui --profile-template
+
+    # Compare launch-to-first-paint with and without the template
+    python -m utils.browser_profile --runs 3
+"""
+
+import argparse
+import logging
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service as ChromeService
+from webdriver_manager.chrome import ChromeDriverManager
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Files Chrome keeps open while running - never copied into a clone
+_PROFILE_LOCK_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile")
+
+
+def build_chrome_options(headless: bool, language: str, user_data_dir: Optional[Path] = None) -> ChromeOptions:
+    """
+    Build Chrome options shared by the browser fixture and the profile template.
+
+    Args:
+        headless: Run Chrome without a window
+        language: Value for intl.accept_languages
+        user_data_dir: Profile directory to launch with (fresh profile if None)
+
+    Returns:
+        Configured ChromeOptions instance
+    """
+    options = ChromeOptions()
+    options.add_experimental_option('prefs', {'intl.accept_languages': language})
+
+    if headless:
+        options.add_argument('--headless=new')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+
+    options.add_argument(f'--window-size={settings.WINDOW_WIDTH},{settings.WINDOW_HEIGHT}')
+
+    if user_data_dir is not None:
+        options.add_argument(f'--user-data-dir={user_data_dir}')
+        options.add_argument('--no-first-run')
+        options.add_argument('--no-default-browser-check')
+
+    return options
+
+
+def _copy_tree(source: Path, destination: Path) -> None:
+    """Copy a profile directory, using copy-on-write clones when available."""
+    system = platform.system()
+    if system == "Linux":
+        command = ["cp", "-a", "--reflink=auto", f"{source}/.", str(destination)]
+    elif system == "Darwin":
+        command = ["cp", "-c", "-R", f"{source}/.", str(destination)]
+    else:
+        command = None
+
+    if command is not None:
+        destination.mkdir(parents=True, exist_ok=True)
+        try:
+            subprocess.run(command, check=True, capture_output=True)
+            return
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.debug("Copy-on-write clone failed, falling back to plain copy: %s", e)
+            shutil.rmtree(destination, ignore_errors=True)
+
+    shutil.copytree(source, destination, ignore=shutil.ignore_patterns(*_PROFILE_LOCK_FILES))
+
+
+class ProfileTemplate:
+    """
+    Warmed Chrome user-data-dir that is cloned for every new driver.
+
+    Attributes:
+        root (Path): Directory holding the template and all clones
+        template_dir (Path): The warmed profile itself
+    """
+
+    def __init__(self, root: Path, headless: bool, language: str):
+        self.root = Path(root)
+        self.template_dir = self.root / "template"
+        self.headless = headless
+        self.language = language
+        self._clone_count = 0
+
+    def build(self, warmup_urls: Optional[List[str]] = None) -> "ProfileTemplate":
+        """
+        Launch Chrome once on the template directory and visit warm-up pages.
+
+        Args:
+            warmup_urls: Pages to load into the disk cache (default: settings.PROFILE_WARMUP_URLS)
+
+        Returns:
+            self, for chaining
+        """
+        urls = warmup_urls if warmup_urls is not None else settings.PROFILE_WARMUP_URLS
+        self.template_dir.mkdir(parents=True, exist_ok=True)
+
+        start = time.perf_counter()
+        driver = webdriver.Chrome(
+            service=ChromeService(ChromeDriverManager().install()),
+            options=build_chrome_options(self.headless, self.language, self.template_dir)
+        )
+        try:
+            driver.set_page_load_timeout(settings.PAGE_LOAD_TIMEOUT)
+            for url in urls:
+                try:
+                    driver.get(url)
+                except Exception as e:
+                    logger.warning("Profile warm-up could not load %s: %s", url, e)
+        finally:
+            driver.quit()
+
+        for name in _PROFILE_LOCK_FILES:
+            (self.template_dir / name).unlink(missing_ok=True)
+
+        logger.info("Built Chrome profile template in %.2fs: %s", time.perf_counter() - start, self.template_dir)
+        return self
+
+    def clone(self) -> Path:
+        """Create a private copy of the template for one driver and return its path."""
+        self._clone_count += 1
+        destination = self.root / f"clone_{self._clone_count}"
+        start = time.perf_counter()
+        _copy_tree(self.template_dir, destination)
+        logger.debug("Cloned profile template to %s in %.3fs", destination, time.perf_counter() - start)
+        return destination
+
+    @staticmethod
+    def discard(clone_dir: Path) -> None:
+        """Remove a clone after its driver has quit."""
+        shutil.rmtree(clone_dir, ignore_errors=True)
+
+
+def measure_launch_to_first_paint(driver_factory: Callable[[], webdriver.Chrome], url: str) -> Dict[str, float]:
+    """
+    Measure driver launch time and the time from launch start to first contentful paint.
+
+    Args:
+        driver_factory: Callable returning a freshly launched driver
+        url: Page to load after launch
+
+    Returns:
+        Dict with launch_ms and first_paint_ms (None if the browser did not report a paint)
+    """
+    start = time.perf_counter()
+    driver = driver_factory()
+    launched = time.perf_counter()
+    try:
+        driver.get(url)
+        paint = driver.execute_script(
+            "const p = performance.getEntriesByName('first-contentful-paint')[0];"
+            "return p ? p.startTime : null;"
+        )
+    finally:
+        driver.quit()
+
+    launch_ms = (launched - start) * 1000
+    first_paint_ms = launch_ms + paint if paint is not None else None
+    return {"launch_ms": launch_ms, "first_paint_ms": first_paint_ms}
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Compare Chrome startup with and without a profile template")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--url", default=settings.MAIN_PAGE_URL)
+    parser.add_argument("--language", default=settings.DEFAULT_LANGUAGE)
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    headless = not args.headed
+    driver_path = ChromeDriverManager().install()
+
+    def launch(user_data_dir=None):
+        return webdriver.Chrome(
+            service=ChromeService(driver_path),
+            options=build_chrome_options(headless, args.language, user_data_dir)
+        )
+
+    with tempfile.TemporaryDirectory(prefix="profile_template_") as root:
+        template = ProfileTemplate(Path(root), headless, args.language).build()
+
+        for mode in ("cold", "template"):
+            results = []
+            for _ in range(args.runs):
+                clone = template.clone() if mode == "template" else None
+                try:
+                    results.append(measure_launch_to_first_paint(lambda: launch(clone), args.url))
+                finally:
+                    if clone is not None:
+                        template.discard(clone)
+
+            launch_avg = sum(r["launch_ms"] for r in results) / len(results)
+            paints = [r["first_paint_ms"] for r in results if r["first_paint_ms"] is not None]
+            paint_avg = f"{sum(paints) / len(paints):.0f} ms" if paints else "n/a"
+            print(f"{mode:>8}: launch {launch_avg:.0f} ms, launch-to-first-paint {paint_avg} ({args.runs} runs)")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+    _main()
@@ -0,0 +1,295 @@
+"""
+Browser memory/CPU telemetry, limit breaches and a quit watchdog
+
+Every worker runs one sampler thread. Every TELEMETRY_INTERVAL seconds it
+adds up the RSS and CPU of the running test's driver process (chromedriver /
+geckodriver) and all its children (the browser, renderers, GPU process),
+and writes one line to .run/runs/<id>/telemetry/<worker>.jsonl:
+
+    {"t": ..., "test": "...", "rss_mb": 812.4, "cpu": 37.5, "js_heap_mb": 48.1, "processes": 9}
+
+The JS heap comes from CDP Performance.getMetrics (Chrome only). WebDriver
+sessions are not thread-safe, so it is read from the test thread after the
+test's own WebDriver commands (utils/driver_commands.py), at most once per
+interval, and is not counted as a test command.
+
+Browsers live for one test here, so every browser is replaced at the end
+of its test anyway. One that went above TELEMETRY_MAX_RSS_MB or
+TELEMETRY_MAX_JS_HEAP_MB is reported (warning, run summary) and quit like
+any other, so chromedriver still removes its temporary profile and ends
+the session. Every driver.quit runs under a watchdog: when it has not
+returned after TELEMETRY_QUIT_TIMEOUT the driver's process tree is killed.
+Processes of the tree still alive TELEMETRY_EXIT_GRACE seconds after quit
+are killed too, so leaked browsers do not pile up over a run.
+
+Peaks per test, limit breaches and watchdog kills are printed in the run summary.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+import psutil
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from config import settings
+from utils.driver_commands import command_hooks
+from utils.run_context import run_dir, worker_id
+from utils.step_reporting import attach_detail
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+
+def driver_process(driver: WebDriver) -> Optional[psutil.Process]:
+    """The driver server process (chromedriver/geckodriver) the browser runs under."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    try:
+        return psutil.Process(process.pid) if process is not None else None
+    except psutil.NoSuchProcess:
+        return None
+
+
+def process_tree(root: Optional[psutil.Process]) -> List[psutil.Process]:
+    if root is None:
+        return []
+    try:
+        return [root] + root.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return []
+
+
+def kill_tree(processes: List[psutil.Process]) -> int:
+    """Kill the processes; returns how many were still alive."""
+    killed = 0
+    for process in processes:
+        try:
+            process.kill()
+            killed += 1
+        except psutil.NoSuchProcess:
+            pass
+    psutil.wait_procs(processes, timeout=settings.TELEMETRY_EXIT_GRACE)
+    return killed
+
+
+class _Watched:
+    """The driver of the running test and its peaks."""
+
+    def __init__(self, driver: WebDriver, nodeid: str):
+        self.driver = driver
+        self.nodeid = nodeid
+        self.root = driver_process(driver)
+        self.processes: Dict[int, psutil.Process] = {}
+        self.js_heap_mb: Optional[float] = None
+        self.peak_rss_mb = 0.0
+        self.peak_cpu = 0.0
+        self.peak_js_heap_mb = 0.0
+        self.samples = 0
+        self.over_threshold: Optional[str] = None
+
+    def summary(self) -> Dict:
+        return {"samples": self.samples, "peak_rss_mb": round(self.peak_rss_mb, 1),
+                "peak_cpu": round(self.peak_cpu, 1), "peak_js_heap_mb": round(self.peak_js_heap_mb, 1),
+                "over_threshold": self.over_threshold}
+
+
+class BrowserMonitor:
+    """
+    Per-worker sampler of the running test's browser.
+
+    Attributes:
+        enabled (bool): Sample RSS/CPU/JS heap (--no-browser-telemetry turns it off; the quit watchdog stays)
+        stats (Dict): samples, over_limit, watchdog_kills, leftovers_killed and the per-test peaks of this process
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.stats: Dict = {"samples": 0, "over_limit": 0, "watchdog_kills": 0, "leftovers_killed": 0, "tests": []}
+        self._current: Optional[_Watched] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._series = None
+        self._last_heap = 0.0
+
+    def _start_thread(self) -> None:
+        path = run_dir() / "telemetry" / f"{worker_id()}.jsonl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._series = open(path, "a", encoding="utf-8", buffering=1)
+        self._thread = threading.Thread(target=self._run, name="browser-telemetry", daemon=True)
+        self._thread.start()
+
+    def attach(self, driver: WebDriver, nodeid: str) -> None:
+        """Sample this driver's process tree until quit(); Chrome drivers also report their JS heap."""
+        if not self.enabled:
+            return
+        if self._thread is None:
+            self._start_thread()
+        watched = _Watched(driver, nodeid)
+        with self._lock:
+            self._current = watched
+        if not hasattr(driver, "execute_cdp_cmd"):
+            return
+        hooks = command_hooks(driver)
+        try:
+            with hooks.internal():
+                driver.execute_cdp_cmd("Performance.enable", {})
+        except WebDriverException as e:
+            logger.debug(f"CDP performance metrics unavailable: {e.msg}")
+            return
+
+        def after_command(driver_command: str) -> None:
+            if time.monotonic() - self._last_heap >= settings.TELEMETRY_INTERVAL:
+                self._read_js_heap(watched)
+
+        hooks.subscribe(after_command)
+
+    def _read_js_heap(self, watched: _Watched) -> None:
+        """Runs as a command hook subscriber, so the CDP call is not counted as a test command."""
+        try:
+            metrics = watched.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+            used = next((metric["value"] for metric in metrics if metric["name"] == "JSHeapUsedSize"), None)
+            if used is not None:
+                watched.js_heap_mb = used / _MB
+                watched.peak_js_heap_mb = max(watched.peak_js_heap_mb, watched.js_heap_mb)
+                if watched.js_heap_mb > settings.TELEMETRY_MAX_JS_HEAP_MB and watched.over_threshold is None:
+                    watched.over_threshold = f"JS heap {watched.js_heap_mb:.0f} MB"
+        except (WebDriverException, KeyError):
+            pass
+        finally:
+            self._last_heap = time.monotonic()
+
+    def _run(self) -> None:
+        while not self._stop.wait(settings.TELEMETRY_INTERVAL):
+            with self._lock:
+                watched = self._current
+            if watched is not None:
+                self._sample(watched)
+
+    def _sample(self, watched: _Watched) -> None:
+        """One sample of RSS and CPU over the driver's process tree; CPU needs the same Process objects each time."""
+        rss = cpu = 0.0
+        tree = process_tree(watched.root)
+        for process in tree:
+            process = watched.processes.setdefault(process.pid, process)
+            try:
+                rss += process.memory_info().rss
+                cpu += process.cpu_percent()
+            except psutil.Error:
+                continue
+        if not tree:
+            return
+        rss_mb = rss / _MB
+        watched.samples += 1
+        watched.peak_rss_mb = max(watched.peak_rss_mb, rss_mb)
+        watched.peak_cpu = max(watched.peak_cpu, cpu)
+        if rss_mb > settings.TELEMETRY_MAX_RSS_MB and watched.over_threshold is None:
+            watched.over_threshold = f"RSS {rss_mb:.0f} MB"
+        self.stats["samples"] += 1
+        line = {"t": round(time.time(), 3), "test": watched.nodeid, "rss_mb": round(rss_mb, 1), "cpu": round(cpu, 1),
+                "js_heap_mb": round(watched.js_heap_mb, 1) if watched.js_heap_mb is not None else None,
+                "processes": len(tree)}
+        try:
+            self._series.write(json.dumps(line) + "\n")
+        except (OSError, ValueError):
+            pass
+
+    def quit(self, driver: WebDriver) -> Optional[Dict]:
+        """
+        Quit the driver under the watchdog; its process tree is killed only when quit hangs
+        or leaves processes behind.
+
+        Returns the test's telemetry summary, None when it was not sampled.
+        """
+        with self._lock:
+            watched, self._current = self._current, None
+        if watched is not None and watched.driver is not driver:
+            watched = None
+        tree = process_tree(driver_process(driver))
+
+        if watched is not None and watched.over_threshold:
+            logger.warning(f"📈 Browser of {watched.nodeid} went over its limit ({watched.over_threshold})")
+            self.stats["over_limit"] += 1
+
+        quitter = threading.Thread(target=self._quietly_quit, args=(driver,), name="driver-quit", daemon=True)
+        quitter.start()
+        quitter.join(settings.TELEMETRY_QUIT_TIMEOUT)
+        if quitter.is_alive():
+            logger.warning(f"⏱️ driver.quit did not return in {settings.TELEMETRY_QUIT_TIMEOUT}s, "
+                           f"killing {len(tree)} driver and browser processes")
+            kill_tree(tree)
+            self.stats["watchdog_kills"] += 1
+        else:
+            _, alive = psutil.wait_procs(tree, timeout=settings.TELEMETRY_EXIT_GRACE)
+            if alive:
+                self.stats["leftovers_killed"] += kill_tree(alive)
+
+        if watched is None:
+            return None
+        summary = watched.summary()
+        self.stats["tests"].append((summary["peak_rss_mb"], summary["peak_js_heap_mb"], watched.nodeid,
+                                    watched.over_threshold or ""))
+        self.stats["tests"] = sorted(self.stats["tests"], reverse=True)[:settings.TELEMETRY_TOP_TESTS]
+        attach_detail(json.dumps(summary, indent=2), name="Browser telemetry")
+        return summary
+
+    @staticmethod
+    def _quietly_quit(driver: WebDriver) -> None:
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"driver.quit failed: {e}")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=settings.TELEMETRY_INTERVAL * 2)
+            self._series.close()
+            self._thread = None
+
+
+browser_monitor = BrowserMonitor()
+
+
+class BrowserTelemetryPlugin:
+    """Pytest plugin that stops the sampler and prints peaks, limit breaches and watchdog kills of all workers."""
+
+    def __init__(self, enabled: bool):
+        browser_monitor.enabled = enabled
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Workers hand their counters to the controller for the summary"""
+        browser_monitor.stop()
+        if hasattr(session.config, "workerinput"):
+            session.config.workeroutput["browser_telemetry"] = browser_monitor.stats
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error) -> None:
+        """Add up the counters and keep the heaviest tests of a finished xdist worker"""
+        stats = browser_monitor.stats
+        worker = getattr(node, "workeroutput", {}).get("browser_telemetry", {})
+        for name in ("samples", "over_limit", "watchdog_kills", "leftovers_killed"):
+            stats[name] += worker.get(name, 0)
+        tests = stats["tests"] + [tuple(test) for test in worker.get("tests", [])]
+        stats["tests"] = sorted(tests, reverse=True)[:settings.TELEMETRY_TOP_TESTS]
+
+    def pytest_terminal_summary(self, terminalreporter, config) -> None:
+        if hasattr(config, "workerinput"):
+            return
+        stats = browser_monitor.stats
+        if not (stats["samples"] or stats["over_limit"] or stats["watchdog_kills"] or stats["leftovers_killed"]):
+            return
+        terminalreporter.write_sep("=", "Browser telemetry")
+        terminalreporter.write_line(
+            f"{stats['samples']} samples in {run_dir() / 'telemetry'}; {stats['over_limit']} browsers over their limit, "
+            f"{stats['watchdog_kills']} hung quits killed, {stats['leftovers_killed']} leftover processes killed",
+            yellow=bool(stats["over_limit"] or stats["watchdog_kills"] or stats["leftovers_killed"])
+        )
+        for peak_rss_mb, peak_js_heap_mb, nodeid, over_threshold in stats["tests"]:
+            line = f"  {peak_rss_mb:8.0f} MB RSS  {peak_js_heap_mb:6.0f} MB JS heap  {nodeid}"
+            terminalreporter.write_line(f"{line}  over limit: {over_threshold}" if over_threshold else line)
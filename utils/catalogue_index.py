@@ -0,0 +1,271 @@
+"""
+Catalogue crawler and cached product index
+
+Walks every catalogue page (/catalogue/?page=N) concurrently, reads the
+product cards and enriches them with stock from the products API. The
+result is a product index (title -> catalogue URL, slug, id, price, stock)
+stored in .run/product_index.json and reused until PRODUCT_INDEX_TTL
+expires. The first worker that finds the index missing or stale rebuilds
+it under a file lock; the others wait and read the same file, so all xdist
+workers collect the same parametrization.
+
+Usage:
+    index = load_product_index()
+    index.by_title("Coders at Work")["url"]
+    index.by_id(209)["price"]
+
+    python -m utils.catalogue_index --refresh
+"""
+
+import argparse
+import html
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urljoin
+
+import requests
+
+from config import settings
+from data.api_endpoints import API_ENDPOINTS
+from utils.api_cache import cached_session
+from utils.basket_seeder import product_id_from_url
+from utils.file_lock import FileLock
+from utils.run_context import artifacts_dir
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+_ARTICLE_PATTERN = re.compile(r'<article class="product_pod">(.*?)</article>', re.DOTALL)
+_TITLE_LINK_PATTERN = re.compile(r'<h3>\s*<a href="([^"]+)" title="([^"]*)"')
+_PRICE_PATTERN = re.compile(r'<p class="price_color">\s*([^<]+?)\s*</p>')
+_AVAILABILITY_PATTERN = re.compile(r'<p class="[^"]*availability[^"]*">(.*?)</p>', re.DOTALL)
+_PAGE_COUNT_PATTERN = re.compile(r'Page\s+\d+\s+of\s+(\d+)')
+_NEXT_PAGE_PATTERN = re.compile(r'<li class="next">\s*<a href="([^"]+)"')
+_SLUG_PATTERN = re.compile(r"/catalogue/([^/]+)_\d+/?$")
+
+
+def parse_catalogue_page(page_html: str, page_url: str) -> List[Dict]:
+    """Product cards of one catalogue page."""
+    products = []
+    for article in _ARTICLE_PATTERN.findall(page_html):
+        link = _TITLE_LINK_PATTERN.search(article)
+        if not link:
+            continue
+        url = urljoin(page_url, html.unescape(link.group(1)))
+        price = _PRICE_PATTERN.search(article)
+        availability = _AVAILABILITY_PATTERN.search(article)
+        availability_text = re.sub(r"<[^>]+>", "", availability.group(1)).strip() if availability else ""
+        slug = _SLUG_PATTERN.search(url)
+        products.append({
+            "id": product_id_from_url(url),
+            "title": html.unescape(link.group(2)),
+            "slug": slug.group(1) if slug else None,
+            "url": url,
+            "price": html.unescape(price.group(1)) if price else None,
+            "in_stock": availability_text.lower().startswith("in stock"),
+            "num_in_stock": None,
+        })
+    return products
+
+
+class CatalogueCrawler:
+    """
+    Concurrent catalogue walker.
+
+    Attributes:
+        catalogue_url (str): First catalogue page
+        products_api_url (str): API products root used for stock lookups
+        workers (int): Concurrent requests
+    """
+
+    def __init__(self, catalogue_url: str = settings.CATALOG_URL,
+                 products_api_url: str = API_ENDPOINTS["products"],
+                 workers: int = settings.CRAWLER_WORKERS):
+        self.catalogue_url = catalogue_url
+        self.products_api_url = products_api_url
+        self.workers = workers
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = cached_session()
+            session.headers.update({'User-Agent': 'QA-Tests/1.0 (crawler)'})
+            self._local.session = session
+        return session
+
+    def _get(self, url: str) -> requests.Response:
+        response = self._session().get(url, timeout=settings.PAGE_LOAD_TIMEOUT)
+        response.raise_for_status()
+        return response
+
+    def _page(self, url: str) -> List[Dict]:
+        response = self._get(url)
+        return parse_catalogue_page(response.text, response.url)
+
+    def _stock(self, product: Dict) -> Dict:
+        try:
+            data = self._get(f"{self.products_api_url}{product['id']}/availability/").json()
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"No availability for product {product['id']}: {e}")
+            return product
+        product["in_stock"] = bool(data.get("is_available_to_buy", product["in_stock"]))
+        product["num_in_stock"] = data.get("num_available")
+        return product
+
+    def crawl(self) -> List[Dict]:
+        """
+        Fetch all catalogue pages and the stock of every product.
+
+        Raises:
+            requests.RequestException: If the first catalogue page cannot be loaded
+        """
+        first = self._get(self.catalogue_url)
+        products = parse_catalogue_page(first.text, first.url)
+        page_count = _PAGE_COUNT_PATTERN.search(first.text)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            if page_count:
+                urls = [urljoin(first.url, f"?page={n}") for n in range(2, int(page_count.group(1)) + 1)]
+                for page in executor.map(self._page, urls):
+                    products.extend(page)
+            else:
+                # No "Page x of N" label: follow next links one by one
+                next_link = _NEXT_PAGE_PATTERN.search(first.text)
+                page_url = first.url
+                while next_link:
+                    response = self._get(urljoin(page_url, html.unescape(next_link.group(1))))
+                    products.extend(parse_catalogue_page(response.text, response.url))
+                    page_url, next_link = response.url, _NEXT_PAGE_PATTERN.search(response.text)
+
+            unique = list({p["id"]: p for p in products}.values())
+            return list(executor.map(self._stock, unique))
+
+
+class ProductIndex:
+    """
+    Products by id and by title.
+
+    Attributes:
+        built_at (float): Unix time the index was crawled
+        source (str): "crawl" or "settings" (fallback when the shop is unreachable)
+    """
+
+    def __init__(self, products: List[Dict], built_at: float, source: str):
+        self.built_at = built_at
+        self.source = source
+        self._by_id = {p["id"]: p for p in products}
+        self._by_title = {p["title"].casefold(): p for p in products}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(sorted(self._by_id.values(), key=lambda p: p["id"]))
+
+    def by_id(self, product_id: int) -> Dict:
+        """Raises KeyError if the product is not in the catalogue."""
+        return self._by_id[int(product_id)]
+
+    def by_title(self, title: str) -> Dict:
+        """Case-insensitive exact title lookup; raises KeyError if missing."""
+        return self._by_title[title.casefold()]
+
+    def find(self, name_or_id) -> Dict:
+        """Look up by id (int or digit string) or by title."""
+        if isinstance(name_or_id, int) or str(name_or_id).isdigit():
+            return self.by_id(int(name_or_id))
+        return self.by_title(name_or_id)
+
+    def to_dict(self) -> Dict:
+        return {"version": INDEX_VERSION, "base_url": settings.BASE_URL, "built_at": self.built_at,
+                "source": self.source, "products": list(self)}
+
+
+def known_products() -> List[Dict]:
+    """Products described in both settings.PRODUCT_URLS and settings.PRODUCTS; no network needed."""
+    products = []
+    for key, url in settings.PRODUCT_URLS.items():
+        if key not in settings.PRODUCTS:
+            continue
+        slug = _SLUG_PATTERN.search(url)
+        products.append({
+            "id": product_id_from_url(url),
+            "title": settings.PRODUCTS[key]["title"],
+            "slug": slug.group(1) if slug else None,
+            "url": url,
+            "price": settings.PRODUCTS[key]["price"],
+            "in_stock": settings.PRODUCTS[key]["stock"],
+            "num_in_stock": None,
+        })
+    return products
+
+
+def _read_index(path: Path) -> Optional[Dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != INDEX_VERSION or data.get("base_url") != settings.BASE_URL:
+        return None
+    return data
+
+
+def _write_index(path: Path, index: ProductIndex) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(index.to_dict(), indent=1, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+def load_product_index(refresh: bool = False, path: Optional[Path] = None,
+                       ttl: float = settings.PRODUCT_INDEX_TTL) -> ProductIndex:
+    """
+    Cached product index, crawled again when missing, older than ttl or refresh is set.
+
+    Falls back to the products in settings if the shop cannot be reached. The fallback is
+    cached as well (for PRODUCT_INDEX_FALLBACK_TTL), so every xdist worker parametrizes
+    from the same index.
+    """
+    path = path or artifacts_dir() / "product_index.json"
+
+    def fresh(data: Optional[Dict]) -> bool:
+        max_age = settings.PRODUCT_INDEX_FALLBACK_TTL if data and data["source"] == "settings" else ttl
+        return data is not None and not refresh and time.time() - data["built_at"] < max_age
+
+    data = _read_index(path)
+    if not fresh(data):
+        with FileLock(path.with_suffix(".lock"), timeout=settings.PAGE_LOAD_TIMEOUT * 10):
+            # Another worker may have rebuilt it while we waited
+            data = _read_index(path)
+            if not fresh(data):
+                started = time.perf_counter()
+                try:
+                    index = ProductIndex(CatalogueCrawler().crawl(), time.time(), "crawl")
+                    logger.info(f"Crawled {len(index)} products in {time.perf_counter() - started:.1f}s")
+                except requests.RequestException as e:
+                    logger.warning(f"Catalogue crawl failed ({e}); using products from settings")
+                    index = ProductIndex(known_products(), time.time(), "settings")
+                _write_index(path, index)
+                return index
+
+    return ProductIndex(data["products"], data["built_at"], data["source"])
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+    parser = argparse.ArgumentParser(description="Crawl the catalogue into the product index")
+    parser.add_argument("--refresh", action="store_true", help="Crawl even if the cached index is fresh")
+    args = parser.parse_args()
+
+    product_index = load_product_index(refresh=args.refresh)
+    for product in product_index:
+        print(f"{product['id']:>5}  {product['price'] or '-':>8}  "
+              f"{product['num_in_stock'] if product['num_in_stock'] is not None else '?':>4}  {product['title']}")
+    print(f"{len(product_index)} products ({product_index.source})")
@@ -0,0 +1,228 @@
+"""
+Run-wide circuit breaker for an unreachable target site
+
+Before the run the controller probes the shop; if it stays down through
+the backoff schedule the run is aborted at once instead of every test
+waiting out PAGE_LOAD_TIMEOUT.
+
+During the run all xdist workers share one breaker state file in the run
+directory. Connectivity failures (connection refused/reset, DNS, HTTP
+timeouts, browser net::ERR_* and renderer timeouts) are counted across
+workers and any passing test resets the count. After
+CIRCUIT_BREAKER_THRESHOLD consecutive connectivity failures the breaker
+opens:
+
+- the worker that tripped it re-probes with the CIRCUIT_BREAKER_BACKOFF
+  delays and closes the breaker as soon as a probe succeeds
+- the other workers pause before their next test until it closes
+- if every re-probe fails the breaker is aborted: remaining tests are
+  skipped as an environment failure and the run exits with
+  ENVIRONMENT_FAILURE_EXIT_CODE
+
+States: "closed" -> "open" -> "closed" | "aborted"
+"""
+
+import json
+import logging
+import socket
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import pytest
+import requests
+from selenium.common.exceptions import WebDriverException
+
+from config import settings
+from utils.file_lock import FileLock
+from utils.run_context import worker_id
+
+logger = logging.getLogger(__name__)
+
+# Browser error texts that mean the page never arrived
+_BROWSER_CONNECTIVITY_MARKERS = ("net::ERR_", "Timed out receiving message from renderer")
+
+
+def probe(url: Optional[str] = None) -> Optional[str]:
+    """Check that the shop answers in time; returns why it is unhealthy, None when healthy."""
+    url = url or settings.HEALTH_CHECK_URL
+    try:
+        response = requests.get(url, timeout=settings.HEALTH_CHECK_TIMEOUT,
+                                headers={'User-Agent': 'QA-Tests/1.0 (health check)'})
+    except requests.RequestException as e:
+        return f"{type(e).__name__}: {e}"
+    if response.status_code >= 500:
+        return f"HTTP {response.status_code} from {url}"
+    return None
+
+
+def probe_with_backoff(url: Optional[str] = None) -> Optional[str]:
+    """Probe now and after every CIRCUIT_BREAKER_BACKOFF delay; None once a probe succeeds, else the last reason."""
+    url = url or settings.HEALTH_CHECK_URL
+    reason = probe(url)
+    for delay in settings.CIRCUIT_BREAKER_BACKOFF:
+        if reason is None:
+            break
+        logger.warning(f"⚡ {url} is unhealthy ({reason}), re-probing in {delay}s")
+        time.sleep(delay)
+        reason = probe(url)
+    return reason
+
+
+def preflight() -> None:
+    """
+    Abort the run before any test starts if the shop stays unreachable.
+
+    Raises:
+        pytest.exit: With ENVIRONMENT_FAILURE_EXIT_CODE when every probe failed
+    """
+    reason = probe_with_backoff()
+    if reason is not None:
+        pytest.exit(f"Environment failure: {settings.HEALTH_CHECK_URL} unreachable ({reason})",
+                    returncode=settings.ENVIRONMENT_FAILURE_EXIT_CODE)
+    logger.info(f"Preflight: {settings.HEALTH_CHECK_URL} is reachable")
+
+
+def is_connectivity_error(exc: BaseException) -> bool:
+    """True if the exception (or one it was raised from) means the site could not be reached."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (requests.ConnectionError, requests.Timeout, ConnectionError, socket.timeout)):
+            return True
+        if isinstance(exc, WebDriverException) and any(marker in (exc.msg or "")
+                                                       for marker in _BROWSER_CONNECTIVITY_MARKERS):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+class CircuitBreaker:
+    """
+    Breaker state shared by all processes of a run through a JSON file.
+
+    File format: {"state": "closed|open|aborted", "failures": n, "reason": str, "changed_at": epoch}
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = FileLock(self.path.with_suffix(".lock"), timeout=30)
+        # a prober that died mid-recovery leaves its lock behind; others take over after a full recovery
+        self._prober = FileLock(self.path.with_suffix(".probe"), stale_after=self.recovery_budget())
+
+    @staticmethod
+    def recovery_budget() -> float:
+        """Longest time a recovery can take: every backoff delay plus every probe timing out."""
+        probes = len(settings.CIRCUIT_BREAKER_BACKOFF) + 1
+        return sum(settings.CIRCUIT_BREAKER_BACKOFF) + probes * settings.HEALTH_CHECK_TIMEOUT
+
+    def read(self) -> Dict:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"state": "closed", "failures": 0, "reason": None, "changed_at": None}
+
+    def _write(self, state: Dict) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def _set_state(self, name: str, reason: Optional[str] = None) -> None:
+        with self._lock:
+            state = self.read()
+            self._write({**state, "state": name, "failures": 0 if name == "closed" else state["failures"],
+                         "reason": reason or state.get("reason"), "changed_at": time.time()})
+
+    def record_success(self) -> None:
+        if self.read()["failures"] == 0:
+            return
+        with self._lock:
+            state = self.read()
+            if state["state"] == "closed":
+                self._write({**state, "failures": 0})
+
+    def record_failure(self, reason: str) -> bool:
+        """Count a connectivity failure; True if this call opened the breaker."""
+        with self._lock:
+            state = self.read()
+            if state["state"] != "closed":
+                return False
+            state["failures"] += 1
+            state["reason"] = reason
+            tripped = state["failures"] >= settings.CIRCUIT_BREAKER_THRESHOLD
+            if tripped:
+                state.update(state="open", changed_at=time.time())
+            self._write(state)
+        if tripped:
+            logger.error(f"⚡ Circuit breaker opened by {worker_id()} after {state['failures']} consecutive "
+                         f"connectivity failures: {reason}")
+        return tripped
+
+    def recover(self) -> str:
+        """Re-probe with backoff while the breaker is open; close or abort it. Returns the new state."""
+        if not self._prober.try_acquire():
+            return self.wait_while_open()
+        try:
+            reason = probe_with_backoff()
+            if reason is None:
+                self._set_state("closed")
+                logger.info("⚡ Site is reachable again, circuit breaker closed")
+                return "closed"
+            self._set_state("aborted", reason)
+            logger.error(f"⚡ Site still unreachable ({reason}), aborting the rest of the run")
+            return "aborted"
+        finally:
+            self._prober.release()
+
+    def wait_while_open(self) -> str:
+        """Pause until the breaker is closed or aborted; take over probing if the prober went away."""
+        deadline = time.monotonic() + 2 * self.recovery_budget()
+        state = self.read()["state"]
+        if state == "open":
+            logger.warning(f"⚡ Circuit breaker open, {worker_id()} paused until the site is back")
+        while state == "open":
+            if time.monotonic() > deadline:
+                return self.recover()
+            time.sleep(1)
+            state = self.read()["state"]
+        return state
+
+
+class CircuitBreakerPlugin:
+    """Pytest plugin that feeds test outcomes into the breaker and pauses or skips tests while it is not closed."""
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item: pytest.Item) -> None:
+        if self.breaker.read()["state"] == "closed":
+            return
+        if self.breaker.wait_while_open() == "aborted":
+            pytest.skip(f"Environment failure, {settings.HEALTH_CHECK_URL} unreachable: {self.breaker.read()['reason']}")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item: pytest.Item, call: pytest.CallInfo):
+        yield
+        if call.when not in ("setup", "call"):
+            return
+        if call.excinfo is not None and is_connectivity_error(call.excinfo.value):
+            if self.breaker.record_failure(f"{item.nodeid}: {call.excinfo.typename}"):
+                self.breaker.recover()
+        elif call.when == "call" and call.excinfo is None:
+            self.breaker.record_success()
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        if not hasattr(session.config, "workerinput") and self.breaker.read()["state"] == "aborted":
+            session.exitstatus = settings.ENVIRONMENT_FAILURE_EXIT_CODE
+
+    def pytest_terminal_summary(self, terminalreporter, config) -> None:
+        state = self.breaker.read()
+        if hasattr(config, "workerinput") or state["state"] != "aborted":
+            return
+        terminalreporter.write_sep("=", "ENVIRONMENT FAILURE", red=True, bold=True)
+        terminalreporter.write_line(
+            f"{settings.HEALTH_CHECK_URL} stayed unreachable after {len(settings.CIRCUIT_BREAKER_BACKOFF)} re-probes "
+            f"({state['reason']}); remaining tests were skipped. Exit status {settings.ENVIRONMENT_FAILURE_EXIT_CODE}.",
+            red=True
+        )
@@ -0,0 +1,71 @@
+"""
+One hook on WebDriver.execute for everything that follows the test's commands
+
+Command counting (results warehouse), network capture and browser
+telemetry all need to run something after the test's WebDriver commands.
+Instead of each wrapping driver.execute, they subscribe to the driver's
+CommandHooks, which wraps it once.
+
+Commands the subscribers send themselves (reading the performance log,
+CDP metrics) run inside hooks.internal(): they do not notify subscribers
+again and are not counted as test commands.
+
+Usage:
+    hooks = command_hooks(driver)
+    hooks.subscribe(lambda command: ...)
+    with hooks.internal():
+        driver.get_log("performance")
+"""
+
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+Subscriber = Callable[[str], None]
+
+
+class CommandHooks:
+    """
+    Calls subscribers after every command the test sends through the driver.
+
+    Attributes:
+        subscribers (List[Subscriber]): Called with the command name (find_element, click, get, ...)
+    """
+
+    def __init__(self, driver: WebDriver):
+        self.subscribers: List[Subscriber] = []
+        self._internal = False
+        execute = driver.execute
+
+        def hooked_execute(driver_command: str, params: Optional[dict] = None):
+            if self._internal:
+                return execute(driver_command, params)
+            try:
+                return execute(driver_command, params)
+            finally:
+                with self.internal():
+                    for subscriber in self.subscribers:
+                        subscriber(driver_command)
+
+        driver.execute = hooked_execute
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.append(subscriber)
+
+    @contextmanager
+    def internal(self) -> Iterator[None]:
+        """Commands sent inside the block are the framework's own: no subscriber sees them."""
+        outer, self._internal = self._internal, True
+        try:
+            yield
+        finally:
+            self._internal = outer
+
+
+def command_hooks(driver: WebDriver) -> CommandHooks:
+    """The driver's CommandHooks, installed on first use."""
+    hooks = getattr(driver, "_command_hooks", None)
+    if hooks is None:
+        hooks = driver._command_hooks = CommandHooks(driver)
+    return hooks
@@ -0,0 +1,86 @@
+"""
+Cross-process file lock
+
+Lock files are created with O_CREAT | O_EXCL, which is atomic on every
+platform the suite runs on (Linux CI, Docker, Windows workstations), so
+xdist workers can coordinate without extra dependencies.
+"""
+
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class FileLockTimeout(TimeoutError):
+    """Raised when a lock cannot be acquired within the timeout."""
+
+
+class FileLock:
+    """
+    Exclusive lock backed by a lock file.
+
+    A lock file older than stale_after seconds is treated as left behind by
+    a crashed process and removed.
+
+    Usage:
+        with FileLock(run_dir / "pool.lock"):
+            ...
+    """
+
+    def __init__(self, path: Union[str, Path], timeout: float = 60.0,
+                 stale_after: Optional[float] = 600.0, poll_interval: float = 0.05):
+        self.path = Path(path)
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+
+    def try_acquire(self) -> bool:
+        """Try to take the lock once without waiting."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            self._remove_if_stale()
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(f"{os.getpid()} {os.environ.get('PYTEST_XDIST_WORKER', 'master')}")
+        return True
+
+    def acquire(self) -> None:
+        """
+        Wait until the lock is taken.
+
+        Raises:
+            FileLockTimeout: If the lock is still held after timeout seconds
+        """
+        deadline = time.monotonic() + self.timeout
+        while not self.try_acquire():
+            if time.monotonic() >= deadline:
+                raise FileLockTimeout(f"Could not acquire lock {self.path} within {self.timeout}s")
+            time.sleep(self.poll_interval)
+
+    def release(self) -> None:
+        """Release the lock."""
+        self.path.unlink(missing_ok=True)
+
+    def _remove_if_stale(self) -> None:
+        if self.stale_after is None:
+            return
+        try:
+            age = time.time() - self.path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if age > self.stale_after:
+            logger.warning("Removing stale lock %s (%.0fs old)", self.path, age)
+            self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
@@ -0,0 +1,189 @@
+"""
+Declarative e2e flows with API shortcuts and step checkpoints
+
+A flow is a list of named steps. Every step has a UI implementation and
+may have an API shortcut (HTTP call with the browser's cookies) that
+reaches the same state faster. The browser cookie jar is the single
+source of truth: an API step copies the browser cookies into a requests
+session, runs, and copies the resulting cookies back.
+
+After every step the runner writes a checkpoint (completed steps,
+cookies, basket id, URL and flow data) into the run directory. When the
+test is rerun after a failure, the runner restores the last checkpoint
+into the new browser and continues with the first unfinished step instead
+of replaying the whole journey. The checkpoint is removed when the flow
+completes.
+
+Usage:
+    flow = Flow("guest_order", [Step("add_product", add_product_ui, add_product_api), ...])
+    context = FlowRunner(flow, browser, checkpoint_path, prefer_api=True).run({"product_id": 209})
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import allure
+import requests
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from config import settings
+from data.api_endpoints import API_ENDPOINTS
+from utils.api_cache import cached_session
+from utils.basket_seeder import BasketSeeder
+
+logger = logging.getLogger(__name__)
+
+# Keys WebDriver accepts back in add_cookie()
+_COOKIE_KEYS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry")
+
+
+class FlowContext:
+    """
+    State shared by the steps of one flow run.
+
+    Attributes:
+        browser (WebDriver): Browser driving the UI steps
+        session (requests.Session): Session used by API steps, synced with the browser cookies
+        data (Dict[str, Any]): Inputs and results of steps (product, email, order number, ...)
+        user (Optional[Dict[str, str]]): Account for logged-in flows
+    """
+
+    def __init__(self, browser: WebDriver, data: Dict[str, Any], user: Optional[Dict[str, str]] = None):
+        self.browser = browser
+        self.session = cached_session()
+        self.session.headers.update({'User-Agent': 'QA-Tests/1.0'})
+        self.data = data
+        self.user = user
+
+    def sync_from_browser(self) -> None:
+        """Replace the session cookies with the browser's."""
+        self.session.cookies.clear()
+        for cookie in self.browser.get_cookies():
+            self.session.cookies.set(cookie["name"], cookie["value"], path=cookie.get("path", "/"))
+
+    def sync_to_browser(self) -> None:
+        """Copy the session cookies into the browser."""
+        BasketSeeder(self.session).sync_to_browser(self.browser)
+
+    def csrf_headers(self) -> Dict[str, str]:
+        token = self.session.cookies.get('csrftoken')
+        return {'X-CSRFToken': token, 'Referer': settings.BASE_URL} if token else {}
+
+    def basket_id(self) -> Optional[int]:
+        """Id of the basket that belongs to the browser's session, None if it cannot be read."""
+        self.sync_from_browser()
+        try:
+            return self.session.get(API_ENDPOINTS["basket"], timeout=settings.PAGE_LOAD_TIMEOUT).json().get("id")
+        except (requests.RequestException, ValueError):
+            return None
+
+    def close(self) -> None:
+        self.session.close()
+
+
+@dataclass(frozen=True)
+class Step:
+    """One flow step: ui always works, api is an optional faster shortcut to the same state."""
+    name: str
+    ui: Callable[[FlowContext], None]
+    api: Optional[Callable[[FlowContext], None]] = None
+
+
+@dataclass(frozen=True)
+class Flow:
+    name: str
+    steps: List[Step] = field(default_factory=list)
+
+
+class FlowRunner:
+    """
+    Runs a flow step by step and checkpoints after each one.
+
+    Attributes:
+        flow (Flow): Steps to run
+        checkpoint_path (Path): JSON checkpoint for this test in the run directory
+        prefer_api (bool): Use API shortcuts where a step has one
+    """
+
+    def __init__(self, flow: Flow, browser: WebDriver, checkpoint_path: Path,
+                 prefer_api: bool = True, user: Optional[Dict[str, str]] = None):
+        self.flow = flow
+        self.browser = browser
+        self.checkpoint_path = Path(checkpoint_path)
+        self.prefer_api = prefer_api
+        self.user = user
+
+    def _load_checkpoint(self) -> Optional[Dict]:
+        try:
+            checkpoint = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return checkpoint if checkpoint.get("flow") == self.flow.name else None
+
+    def _restore(self, checkpoint: Dict) -> None:
+        """Put the browser back into the checkpointed state."""
+        self.browser.get(settings.BASE_URL)
+        self.browser.delete_all_cookies()
+        for cookie in checkpoint["cookies"]:
+            self.browser.add_cookie({k: v for k, v in cookie.items() if k in _COOKIE_KEYS})
+        if checkpoint.get("url"):
+            self.browser.get(checkpoint["url"])
+
+    def _write_checkpoint(self, context: FlowContext, completed: List[str]) -> None:
+        checkpoint = {
+            "flow": self.flow.name,
+            "completed": completed,
+            "cookies": self.browser.get_cookies(),
+            "basket_id": context.basket_id(),
+            "url": self.browser.current_url if self.browser.current_url.startswith("http") else None,
+            "data": context.data,
+        }
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(checkpoint, indent=1, default=str), encoding="utf-8")
+        tmp.replace(self.checkpoint_path)
+
+    def run(self, data: Optional[Dict[str, Any]] = None) -> FlowContext:
+        """
+        Run every step not yet completed in an earlier attempt.
+
+        Args:
+            data: Initial flow data; ignored when resuming (the checkpointed data is used)
+
+        Returns:
+            Context with the final flow data
+        """
+        checkpoint = self._load_checkpoint()
+        completed: List[str] = []
+        context = FlowContext(self.browser, dict(data or {}), self.user)
+
+        if checkpoint:
+            completed = checkpoint["completed"]
+            context.data = checkpoint["data"]
+            with allure.step(f"Resume {self.flow.name} after '{completed[-1]}' (basket {checkpoint['basket_id']})"):
+                self._restore(checkpoint)
+            logger.info(f"Resuming flow {self.flow.name} after steps {completed}")
+
+        try:
+            for step in self.flow.steps:
+                if step.name in completed:
+                    continue
+                use_api = self.prefer_api and step.api is not None
+                with allure.step(f"{step.name} ({'api' if use_api else 'ui'})"):
+                    if use_api:
+                        context.sync_from_browser()
+                        step.api(context)
+                        context.sync_to_browser()
+                    else:
+                        step.ui(context)
+                completed.append(step.name)
+                self._write_checkpoint(context, completed)
+                logger.info(f"Flow {self.flow.name}: step '{step.name}' done via {'api' if use_api else 'ui'}")
+        finally:
+            context.close()
+
+        self.checkpoint_path.unlink(missing_ok=True)
+        return context
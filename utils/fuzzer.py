@@ -0,0 +1,295 @@
+"""
+High-throughput API fuzzing
+
+Sends large payload corpora concurrently to API endpoints while keeping at
+most `max_in_flight` requests outstanding. Every response is classified as
+it arrives and written to a JSONL findings file, so memory stays bounded
+no matter how many payloads are sent. After the run, failing inputs are
+minimized (delta debugging on characters) against the live endpoint.
+
+Classifications:
+- server_error: 5xx status
+- stack_trace: response leaks a traceback or framework debug page
+- timing_anomaly: latency far above the running median
+- transport_error: connection reset, timeout and similar
+
+Usage:
+    python -m utils.fuzzer --target login_username --kind injection_strings --count 5000
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+import requests
+
+from config import settings
+from data.api_endpoints import API_ENDPOINTS
+from data.data_manager import data_manager
+
+logger = logging.getLogger(__name__)
+
+STACK_TRACE_MARKERS = [
+    "traceback (most recent call last)",
+    "exception value:",
+    "exception location:",
+    "django.db",
+    "django.core",
+    "file \"/",
+    "stack trace",
+    "nullpointerexception",
+    "sqlstate",
+    "syntax error at or near",
+]
+
+
+@dataclass(frozen=True)
+class FuzzTarget:
+    """One fuzzable request: the payload is placed into the body by build_body."""
+    name: str
+    method: str
+    url: str
+    build_body: Callable[[str], Dict]
+
+
+TARGETS: Dict[str, FuzzTarget] = {
+    "login_username": FuzzTarget(
+        "login_username", "POST", API_ENDPOINTS["login"],
+        lambda value: {"username": value, "password": "SecurePass123!"}
+    ),
+    "login_password": FuzzTarget(
+        "login_password", "POST", API_ENDPOINTS["login"],
+        lambda value: {"username": "test_user_x@example.com", "password": value}
+    ),
+    "basket_voucher": FuzzTarget(
+        "basket_voucher", "POST", API_ENDPOINTS["basket_add_voucher"],
+        lambda value: {"vouchercode": value}
+    ),
+    "basket_product_url": FuzzTarget(
+        "basket_product_url", "POST", API_ENDPOINTS["basket_add_product"],
+        lambda value: {"url": value, "quantity": 1}
+    ),
+}
+
+
+def classify(status: Optional[int], body: str, elapsed: float, median: Optional[float]) -> Optional[str]:
+    """
+    Classify one response; None means nothing suspicious.
+
+    Args:
+        status: HTTP status, None if the request failed at transport level
+        body: Response text (first FUZZ_BODY_SCAN_BYTES characters are enough)
+        elapsed: Latency in seconds
+        median: Running median latency of earlier responses
+    """
+    if status is None:
+        return "transport_error"
+    if status >= 500:
+        return "server_error"
+    lowered = body.lower()
+    if any(marker in lowered for marker in STACK_TRACE_MARKERS):
+        return "stack_trace"
+    if (median is not None and elapsed > settings.FUZZ_TIMING_MIN_SECONDS
+            and elapsed > median * settings.FUZZ_TIMING_FACTOR):
+        return "timing_anomaly"
+    return None
+
+
+def minimize(payload: str, still_fails: Callable[[str], bool], max_attempts: int = 64) -> str:
+    """
+    Shrink a failing payload with delta debugging on characters.
+
+    Args:
+        payload: Input that triggers the failure
+        still_fails: Re-sends a candidate and tells whether it still fails the same way
+        max_attempts: Upper bound on re-sent requests
+    """
+    attempts = 0
+    chunks = 2
+    while len(payload) > 1 and attempts < max_attempts:
+        size = max(len(payload) // chunks, 1)
+        reduced = False
+        for start in range(0, len(payload), size):
+            candidate = payload[:start] + payload[start + size:]
+            attempts += 1
+            if candidate and still_fails(candidate):
+                payload = candidate
+                chunks = max(chunks - 1, 2)
+                reduced = True
+                break
+            if attempts >= max_attempts:
+                break
+        if not reduced:
+            if size == 1:
+                break
+            chunks = min(chunks * 2, len(payload))
+    return payload
+
+
+class Fuzzer:
+    """
+    Concurrent fuzz runner with a bounded in-flight window.
+
+    Attributes:
+        target (FuzzTarget): Endpoint being fuzzed
+        findings_path (Path): JSONL file receiving one line per suspicious response
+        max_in_flight (int): Maximum concurrent requests
+    """
+
+    def __init__(self, target: FuzzTarget, findings_path: Path,
+                 max_in_flight: int = settings.FUZZ_MAX_IN_FLIGHT,
+                 timeout: float = settings.FUZZ_REQUEST_TIMEOUT):
+        self.target = target
+        self.findings_path = Path(findings_path)
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self._local = threading.local()
+        self._latencies = deque(maxlen=500)
+        self.counts = Counter()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({'User-Agent': 'QA-Tests/1.0 (fuzz)'})
+            self._local.session = session
+        return session
+
+    def send(self, value: str) -> Dict:
+        """Send one payload and return a compact result record."""
+        session = self._session()
+        session.cookies.clear()
+        start = time.perf_counter()
+        try:
+            response = session.request(self.target.method, self.target.url,
+                                       json=self.target.build_body(value), timeout=self.timeout)
+            status, body = response.status_code, response.text[:settings.FUZZ_BODY_SCAN_BYTES]
+        except requests.RequestException as e:
+            status, body = None, repr(e)
+        return {"value": value, "status": status, "body": body, "elapsed": time.perf_counter() - start}
+
+    def _median(self) -> Optional[float]:
+        return statistics.median(self._latencies) if len(self._latencies) >= 20 else None
+
+    def run(self, payloads: Iterable[str]) -> Dict:
+        """
+        Fuzz the target with every payload.
+
+        Returns:
+            Summary with request count, throughput and counts per classification
+        """
+        self.findings_path.parent.mkdir(parents=True, exist_ok=True)
+        payload_iter: Iterator[str] = iter(payloads)
+        start = time.perf_counter()
+
+        with open(self.findings_path, 'w', encoding='utf-8') as findings, \
+                ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            pending = set()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < self.max_in_flight:
+                    try:
+                        pending.add(executor.submit(self.send, next(payload_iter)))
+                    except StopIteration:
+                        exhausted = True
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._record(future.result(), findings)
+
+        elapsed = time.perf_counter() - start
+        summary = {
+            "target": self.target.name,
+            "requests": self.counts["requests"],
+            "requests_per_minute": round(self.counts["requests"] / elapsed * 60) if elapsed else 0,
+            "findings": {k: v for k, v in self.counts.items() if k != "requests"},
+            "findings_file": str(self.findings_path),
+        }
+        logger.info("Fuzzing %s finished: %s", self.target.name, summary)
+        return summary
+
+    def _record(self, result: Dict, findings) -> None:
+        self.counts["requests"] += 1
+        category = classify(result["status"], result["body"], result["elapsed"], self._median())
+        if result["status"] is not None:
+            self._latencies.append(result["elapsed"])
+        if category:
+            self.counts[category] += 1
+            findings.write(json.dumps({
+                "target": self.target.name,
+                "category": category,
+                "status": result["status"],
+                "elapsed": round(result["elapsed"], 4),
+                "value": result["value"],
+                "body": result["body"][:500],
+            }) + "\n")
+
+    def minimize_findings(self, categories=("server_error", "stack_trace"),
+                          limit: int = settings.FUZZ_MINIMIZE_LIMIT) -> Path:
+        """
+        Minimize up to `limit` findings of the given categories.
+
+        Returns:
+            Path of the JSONL file with {"category", "value", "minimized"} records
+        """
+        minimized_path = self.findings_path.with_name(self.findings_path.stem + "_minimized.jsonl")
+        median = self._median()
+        done = 0
+        with open(self.findings_path, 'r', encoding='utf-8') as findings, \
+                open(minimized_path, 'w', encoding='utf-8') as out:
+            for line in findings:
+                if done >= limit:
+                    break
+                finding = json.loads(line)
+                if finding["category"] not in categories:
+                    continue
+
+                def still_fails(candidate: str, category=finding["category"]) -> bool:
+                    result = self.send(candidate)
+                    return classify(result["status"], result["body"], result["elapsed"], median) == category
+
+                smallest = minimize(finding["value"], still_fails)
+                out.write(json.dumps({"category": finding["category"], "value": finding["value"],
+                                      "minimized": smallest}) + "\n")
+                done += 1
+        return minimized_path
+
+
+def corpus_payloads(kinds: Iterable[str], count: int, seed: int = settings.CORPUS_SEED) -> Iterator[str]:
+    """Stream the built-in security payloads followed by generated corpora."""
+    yield from data_manager.security_payloads
+    for kind in kinds:
+        for case in data_manager.generated_cases(kind, count, seed):
+            yield case["value"]
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Fuzz API endpoints with generated payload corpora")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="login_username")
+    parser.add_argument("--kind", action="append", dest="kinds",
+                        help="Corpus kind (repeatable, default: all kinds)")
+    parser.add_argument("--count", type=int, default=settings.FUZZ_CASES_PER_KIND)
+    parser.add_argument("--max-in-flight", type=int, default=settings.FUZZ_MAX_IN_FLIGHT)
+    parser.add_argument("--out", type=Path, default=Path("fuzz-results"))
+    parser.add_argument("--no-minimize", action="store_true")
+    args = parser.parse_args()
+
+    kinds = args.kinds or ["injection_strings", "invalid_emails", "unicode_edge_cases", "boundary_passwords"]
+    fuzzer = Fuzzer(TARGETS[args.target], args.out / f"{args.target}.jsonl", args.max_in_flight)
+    print(json.dumps(fuzzer.run(corpus_payloads(kinds, args.count)), indent=2))
+    if not args.no_minimize:
+        print(f"Minimized findings: {fuzzer.minimize_findings()}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+    _main()
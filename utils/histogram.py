@@ -0,0 +1,116 @@
+"""
+HDR-style latency histogram
+
+Values are recorded in microseconds into log-linear buckets: every power of
+two is split into 2**SUB_BUCKET_BITS equal sub-buckets, so each recorded
+value is kept with a relative error below 1% whatever its magnitude, and
+memory depends on the value range, not on the number of samples.
+Histograms from different workers or runs merge by adding bucket counts.
+"""
+
+from typing import Dict, Iterable, Optional
+
+SUB_BUCKET_BITS = 7  # 128 sub-buckets per power of two -> < 0.8% error
+
+
+def _bucket_floor(value: int) -> int:
+    shift = max(value.bit_length() - SUB_BUCKET_BITS - 1, 0)
+    return (value >> shift) << shift
+
+
+def _bucket_mid(floor: int) -> int:
+    shift = max(floor.bit_length() - SUB_BUCKET_BITS - 1, 0)
+    return floor + ((1 << shift) >> 1)
+
+
+class LatencyHistogram:
+    """
+    Mergeable latency histogram with percentile queries.
+
+    Attributes:
+        count (int): Number of recorded values
+        min_us (Optional[int]): Smallest recorded value
+        max_us (Optional[int]): Largest recorded value
+    """
+
+    def __init__(self):
+        self._buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us: Optional[int] = None
+
+    def record(self, seconds: float) -> None:
+        """Record one latency given in seconds."""
+        self.record_us(int(seconds * 1_000_000))
+
+    def record_us(self, value_us: int) -> None:
+        """Record one latency given in microseconds."""
+        value_us = max(int(value_us), 0)
+        floor = _bucket_floor(value_us)
+        self._buckets[floor] = self._buckets.get(floor, 0) + 1
+        self.count += 1
+        self.total_us += value_us
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = value_us if self.max_us is None else max(self.max_us, value_us)
+
+    def percentile_us(self, percentile: float) -> Optional[int]:
+        """
+        Value at the given percentile (0-100) in microseconds.
+
+        Returns:
+            None if nothing was recorded
+        """
+        if not self.count:
+            return None
+        rank = max(1, int(round(percentile / 100 * self.count)))
+        seen = 0
+        for floor in sorted(self._buckets):
+            seen += self._buckets[floor]
+            if seen >= rank:
+                return min(_bucket_mid(floor), self.max_us)
+        return self.max_us
+
+    def percentile_ms(self, percentile: float) -> Optional[float]:
+        """Value at the given percentile in milliseconds."""
+        value = self.percentile_us(percentile)
+        return None if value is None else value / 1000
+
+    @property
+    def mean_ms(self) -> Optional[float]:
+        return self.total_us / self.count / 1000 if self.count else None
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add another histogram's samples into this one."""
+        for floor, count in other._buckets.items():
+            self._buckets[floor] = self._buckets.get(floor, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        for value in (other.min_us, other.max_us):
+            if value is not None:
+                self.min_us = value if self.min_us is None else min(self.min_us, value)
+                self.max_us = value if self.max_us is None else max(self.max_us, value)
+        return self
+
+    def summary(self, percentiles: Iterable[float] = (50, 95, 99)) -> Dict[str, Optional[float]]:
+        """Count, mean, max and requested percentiles in milliseconds."""
+        result = {"count": self.count, "mean_ms": self.mean_ms,
+                  "max_ms": None if self.max_us is None else self.max_us / 1000}
+        for p in percentiles:
+            result[f"p{p:g}_ms"] = self.percentile_ms(p)
+        return result
+
+    def to_dict(self) -> Dict:
+        """Serializable form (JSON keys must be strings)."""
+        return {"buckets": {str(k): v for k, v in self._buckets.items()}, "count": self.count,
+                "total_us": self.total_us, "min_us": self.min_us, "max_us": self.max_us}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        histogram = cls()
+        histogram._buckets = {int(k): v for k, v in data["buckets"].items()}
+        histogram.count = data["count"]
+        histogram.total_us = data["total_us"]
+        histogram.min_us = data["min_us"]
+        histogram.max_us = data["max_us"]
+        return histogram
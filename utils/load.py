@@ -0,0 +1,265 @@
+"""
+Load generation over the shop API
+
+Replays the journeys the suite covers - login, browse catalogue, add to
+basket, checkout - with N concurrent virtual users on one asyncio loop.
+Every virtual user has its own cookie jar, picks journeys by weight and
+pauses for a random think time between them. Users start according to a
+ramp-up profile. Latencies go into per-endpoint HDR-style histograms and
+the run ends with a p50/p95/p99 and error-rate report.
+
+Usage:
+    # Against the local stand-in server (CI)
+    python -m utils.load --stub --users 20 --duration 30 --ramp-up 5
+
+    # Against the real shop
+    python -m utils.load --users 10 --duration 120 --profile step --think 1:3
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+from config import settings
+from data.api_endpoints import API_ENDPOINTS
+from data.data_manager import data_manager
+from utils.histogram import LatencyHistogram
+from utils.stub_server import StubServer
+
+logger = logging.getLogger(__name__)
+
+JOURNEY_WEIGHTS = {"browse_catalogue": 5, "add_to_basket": 3, "login": 1, "checkout": 1}
+
+RAMP_PROFILES = ("constant", "linear", "step")
+
+
+def rebase_endpoints(base_url: str) -> Dict[str, str]:
+    """API_ENDPOINTS pointed at another host (stand-in server, staging)."""
+    return {name: url.replace(settings.BASE_URL, base_url.rstrip("/"), 1) for name, url in API_ENDPOINTS.items()}
+
+
+def start_offsets(profile: str, users: int, ramp_up: float, steps: int = 4) -> List[float]:
+    """
+    Seconds after the run start at which each virtual user begins.
+
+    Args:
+        profile: constant (all at once), linear (evenly spread) or step (in equal batches)
+        users: Number of virtual users
+        ramp_up: Length of the ramp-up period in seconds
+        steps: Number of batches for the step profile
+    """
+    if profile == "constant" or ramp_up <= 0 or users <= 1:
+        return [0.0] * users
+    if profile == "linear":
+        return [ramp_up * i / users for i in range(users)]
+    if profile == "step":
+        batch = max(users // steps, 1)
+        return [ramp_up * min(i // batch, steps - 1) / steps for i in range(users)]
+    raise ValueError(f"Unknown ramp profile '{profile}', expected one of {RAMP_PROFILES}")
+
+
+@dataclass
+class LoadStats:
+    """Per-endpoint latency histograms and error counters for one run."""
+    histograms: Dict[str, LatencyHistogram] = field(default_factory=lambda: defaultdict(LatencyHistogram))
+    errors: Counter = field(default_factory=Counter)
+    journeys: Counter = field(default_factory=Counter)
+
+    def report(self) -> Dict[str, Dict]:
+        result = {}
+        for endpoint in sorted(self.histograms):
+            histogram = self.histograms[endpoint]
+            summary = histogram.summary()
+            summary["errors"] = self.errors[endpoint]
+            summary["error_rate"] = self.errors[endpoint] / histogram.count if histogram.count else 0.0
+            result[endpoint] = summary
+        return result
+
+
+class VirtualUser:
+    """One simulated shopper with its own cookie jar."""
+
+    def __init__(self, number: int, endpoints: Dict[str, str], stats: LoadStats,
+                 think_time: tuple, credentials: Dict[str, str]):
+        self.number = number
+        self.endpoints = endpoints
+        self.stats = stats
+        self.think_time = think_time
+        self.credentials = credentials
+        self.random = random.Random(number)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def request(self, name: str, method: str, url: str, ok=(200, 201, 204), **kwargs):
+        """Send one request, recording latency under `name` and counting unexpected statuses."""
+        headers = kwargs.pop("headers", {})
+        csrf = self._cookie("csrftoken")
+        if csrf and method != "GET":
+            headers.update({"X-CSRFToken": csrf, "Referer": self.endpoints["login"]})
+
+        start = time.perf_counter()
+        try:
+            async with self.session.request(method, url, headers=headers, **kwargs) as response:
+                body = await response.read()
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug("VU %d %s failed: %s", self.number, name, e)
+            self.stats.histograms[name].record(time.perf_counter() - start)
+            self.stats.errors[name] += 1
+            return None
+
+        self.stats.histograms[name].record(time.perf_counter() - start)
+        if status not in ok:
+            self.stats.errors[name] += 1
+        try:
+            return json.loads(body) if body else None
+        except ValueError:
+            return None
+
+    def _cookie(self, name: str) -> Optional[str]:
+        for cookie in self.session.cookie_jar:
+            if cookie.key == name:
+                return cookie.value
+        return None
+
+    # ---- journeys ----
+    async def login(self):
+        await self.request("POST login", "POST", self.endpoints["login"], json=self.credentials)
+        await self.request("GET basket", "GET", self.endpoints["basket"])
+        await self.request("DELETE login", "DELETE", self.endpoints["login"])
+
+    async def browse_catalogue(self):
+        products = await self.request("GET products", "GET", self.endpoints["products"])
+        if isinstance(products, dict):
+            products = products.get("results", [])
+        for product in self.random.sample(products or [], min(2, len(products or []))):
+            await self.request("GET product", "GET", product["url"])
+            if product.get("price"):
+                await self.request("GET product price", "GET", product["price"])
+
+    async def add_to_basket(self):
+        products = await self.request("GET products", "GET", self.endpoints["products"])
+        if isinstance(products, dict):
+            products = products.get("results", [])
+        if not products:
+            return None
+        product = self.random.choice(products)
+        await self.request("POST basket add-product", "POST", self.endpoints["basket_add_product"],
+                           json={"url": product["url"], "quantity": 1})
+        return await self.request("GET basket", "GET", self.endpoints["basket"])
+
+    async def checkout(self):
+        basket = await self.add_to_basket()
+        if not basket:
+            return
+        await self.request("GET basket shipping-methods", "GET", self.endpoints["basket_shipping_methods"])
+        countries = await self.request("GET countries", "GET", self.endpoints["countries"]) or [{}]
+        await self.request("POST checkout", "POST", self.endpoints["checkout"], json={
+            "basket": basket.get("url"),
+            "guest_email": data_manager.generate_unique_email(prefix="load"),
+            "shipping_address": {
+                "first_name": "Load", "last_name": "Test", "line1": "1 Test Street",
+                "line4": "London", "postcode": "SW1A 1AA", "country": countries[0].get("url"),
+            },
+        })
+
+    async def run(self, start_delay: float, stop_at: float) -> None:
+        journeys: Dict[str, Callable[[], Awaitable]] = {
+            "login": self.login, "browse_catalogue": self.browse_catalogue,
+            "add_to_basket": self.add_to_basket, "checkout": self.checkout,
+        }
+        names = list(JOURNEY_WEIGHTS)
+        weights = [JOURNEY_WEIGHTS[n] for n in names]
+
+        await asyncio.sleep(start_delay)
+        timeout = aiohttp.ClientTimeout(total=settings.PAGE_LOAD_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout, cookie_jar=aiohttp.CookieJar(unsafe=True)) as session:
+            self.session = session
+            while time.monotonic() < stop_at:
+                journey = self.random.choices(names, weights)[0]
+                await journeys[journey]()
+                self.stats.journeys[journey] += 1
+                await asyncio.sleep(self.random.uniform(*self.think_time))
+
+
+async def run_load(base_url: str, users: int, duration: float, ramp_up: float = 0.0,
+                   profile: str = "linear", think_time: tuple = (0.5, 2.0)) -> LoadStats:
+    """
+    Run virtual users against base_url for `duration` seconds (ramp-up included).
+
+    Returns:
+        Collected statistics
+    """
+    endpoints = rebase_endpoints(base_url)
+    stats = LoadStats()
+    credentials = {"username": data_manager.valid_user["username"], "password": data_manager.valid_user["password"]}
+    stop_at = time.monotonic() + duration
+
+    virtual_users = [VirtualUser(n, endpoints, stats, think_time, credentials) for n in range(users)]
+    offsets = start_offsets(profile, users, ramp_up)
+    await asyncio.gather(*(vu.run(offset, stop_at) for vu, offset in zip(virtual_users, offsets)))
+    return stats
+
+
+def format_report(stats: LoadStats, elapsed: float) -> str:
+    """Render the per-endpoint report as a text table."""
+    lines = [f"{'endpoint':<30} {'count':>7} {'err%':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+    total = errors = 0
+    for endpoint, row in stats.report().items():
+        total += row["count"]
+        errors += row["errors"]
+        lines.append(f"{endpoint:<30} {row['count']:>7} {row['error_rate'] * 100:>5.1f}% "
+                     f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+    lines.append(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), "
+                 f"{errors} errors, journeys: {dict(stats.journeys)}")
+    return "\n".join(lines)
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Replay shop journeys with concurrent virtual users")
+    parser.add_argument("--base-url", default=settings.BASE_URL)
+    parser.add_argument("--stub", action="store_true", help="Start the local stand-in server and target it")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60, help="Total run time in seconds")
+    parser.add_argument("--ramp-up", type=float, default=10)
+    parser.add_argument("--profile", choices=RAMP_PROFILES, default="linear")
+    parser.add_argument("--think", default="0.5:2", help="Think time range in seconds, min:max")
+    parser.add_argument("--max-error-rate", type=float, default=None,
+                        help="Exit with status 1 if the overall error rate is above this fraction")
+    parser.add_argument("--json", dest="json_out", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    think_time = tuple(float(v) for v in args.think.split(":"))
+    stub = StubServer(latency_ms=5).start() if args.stub else None
+    base_url = stub.base_url if stub else args.base_url
+
+    start = time.monotonic()
+    try:
+        stats = asyncio.run(run_load(base_url, args.users, args.duration, args.ramp_up, args.profile, think_time))
+    finally:
+        if stub:
+            stub.stop()
+    elapsed = time.monotonic() - start
+
+    print(format_report(stats, elapsed))
+    report = stats.report()
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    total = sum(row["count"] for row in report.values())
+    error_rate = sum(row["errors"] for row in report.values()) / total if total else 1.0
+    if args.max_error_rate is not None and error_rate > args.max_error_rate:
+        raise SystemExit(f"Error rate {error_rate:.1%} above limit {args.max_error_rate:.1%}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+    _main()
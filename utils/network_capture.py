@@ -0,0 +1,274 @@
+"""
+Per-test network capture from Chrome's performance log
+
+With --network-capture Chrome records Network.* DevTools events in its
+performance log. While the test runs, the log is drained every
+NETWORK_DRAIN_INTERVAL seconds (after the test's own WebDriver commands,
+see utils/driver_commands.py, so no second thread talks to the driver) and
+at the end of the test. Every finished or failed request is written as one HAR entry to
+.run/runs/<id>/network/<test>.jsonl.gz as soon as it completes.
+
+Memory stays bounded: only requests still in flight are held (at most
+NETWORK_MAX_INFLIGHT, oldest dropped first), and after NETWORK_MAX_ENTRIES
+entries a test's file stops growing and only the statistics are counted.
+With --network-bodies the bodies of XHR/fetch responses (the shop's API
+calls) are added, cut at NETWORK_MAX_BODY_BYTES.
+
+The file is kept only when the test failed or took longer than
+SLOW_TEST_THRESHOLD. Every test gets a summary (requests, failures, bytes,
+slowest requests) in Allure.
+
+Convert a capture to a regular HAR for browser dev tools:
+    python -m utils.network_capture .run/runs/<id>/network/<test>.jsonl.gz > test.har
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import re
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import allure
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from config import settings
+from utils.driver_commands import command_hooks
+from utils.run_context import run_dir
+
+logger = logging.getLogger(__name__)
+
+_BODY_RESOURCE_TYPES = ("XHR", "Fetch")
+_CREATOR = {"name": "ecom-qa network capture", "version": "1.0"}
+
+
+def enable_network_log(options: ChromeOptions) -> None:
+    """Ask Chrome to record Network.* events in the performance log."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+
+def capture_path(nodeid: str, attempt: int) -> Path:
+    """Capture file of one attempt of a test under the run directory."""
+    safe_name = re.sub(r"[^\w.-]+", "_", nodeid)
+    return run_dir() / "network" / f"{safe_name}-{attempt}.jsonl.gz"
+
+
+class NetworkCapture:
+    """
+    Network capture of the running test in this process.
+
+    Attributes:
+        path (Optional[Path]): Capture file of the running test, None when not capturing
+        stats (Dict): requests, failed, bytes, dropped_inflight, truncated and slowest entries
+    """
+
+    def __init__(self):
+        self.path: Optional[Path] = None
+        self.stats: Dict = {}
+        self._driver: Optional[WebDriver] = None
+        self._file = None
+        self._inflight: "OrderedDict[str, Dict]" = OrderedDict()
+        self._bodies = False
+        self._last_drain = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self._driver is not None
+
+    def start(self, driver: WebDriver, path: Path, bodies: bool = False) -> None:
+        """Start capturing the driver's traffic; drains run after the test's own WebDriver commands."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._driver = driver
+        self._bodies = bodies
+        self._inflight.clear()
+        self.stats = {"requests": 0, "failed": 0, "bytes": 0, "dropped_inflight": 0, "truncated": False,
+                      "slowest": []}
+        self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=5)
+        self._file.write(json.dumps({"creator": _CREATOR, "started": _iso(time.time())}) + "\n")
+        self._last_drain = time.monotonic()
+        command_hooks(driver).subscribe(self._after_command)
+
+    def _after_command(self, driver_command: str) -> None:
+        if self._driver is not None and time.monotonic() - self._last_drain >= settings.NETWORK_DRAIN_INTERVAL:
+            self.drain()
+
+    def drain(self) -> None:
+        """Fetch the buffered performance log and write the requests that completed."""
+        if self._driver is None:
+            return
+        try:
+            with command_hooks(self._driver).internal():
+                for entry in self._driver.get_log("performance"):
+                    self._handle(json.loads(entry["message"])["message"])
+        except WebDriverException as e:
+            logger.debug(f"Could not read the performance log: {e.msg}")
+        finally:
+            self._last_drain = time.monotonic()
+
+    def _handle(self, event: Dict) -> None:
+        method, params = event.get("method", ""), event.get("params", {})
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            if "redirectResponse" in params and request_id in self._inflight:
+                self._inflight[request_id]["response"] = params["redirectResponse"]
+                self._finish(request_id, params["timestamp"], params["redirectResponse"].get("encodedDataLength", 0))
+            self._inflight[request_id] = {"request": params["request"], "wall": params.get("wallTime", time.time()),
+                                          "start": params["timestamp"], "type": params.get("type", "Other")}
+            if len(self._inflight) > settings.NETWORK_MAX_INFLIGHT:
+                self._inflight.popitem(last=False)
+                self.stats["dropped_inflight"] += 1
+        elif request_id not in self._inflight:
+            return
+        elif method == "Network.responseReceived":
+            self._inflight[request_id]["response"] = params["response"]
+            self._inflight[request_id]["type"] = params.get("type", self._inflight[request_id]["type"])
+        elif method == "Network.loadingFinished":
+            self._finish(request_id, params["timestamp"], params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed":
+            self._inflight[request_id]["error"] = params.get("errorText", "failed")
+            self._finish(request_id, params["timestamp"], 0)
+
+    def _finish(self, request_id: str, timestamp: float, size: int) -> None:
+        pending = self._inflight.pop(request_id)
+        request, response = pending["request"], pending.get("response", {})
+        duration_ms = round((timestamp - pending["start"]) * 1000, 1)
+        failed = "error" in pending or response.get("status", 0) >= 400
+
+        self.stats["requests"] += 1
+        self.stats["failed"] += failed
+        self.stats["bytes"] += int(size)
+        slowest = self.stats["slowest"]
+        slowest.append({"url": request["url"], "method": request["method"], "status": response.get("status", 0),
+                        "time_ms": duration_ms})
+        slowest.sort(key=lambda entry: -entry["time_ms"])
+        del slowest[settings.NETWORK_SLOWEST_COUNT:]
+
+        if self.stats["requests"] > settings.NETWORK_MAX_ENTRIES:
+            self.stats["truncated"] = True
+            return
+        entry = {
+            "startedDateTime": _iso(pending["wall"]),
+            "time": duration_ms,
+            "request": {"method": request["method"], "url": request["url"], "httpVersion": response.get("protocol", ""),
+                        "headers": _headers(request.get("headers", {})), "bodySize": len(request.get("postData", ""))},
+            "response": {"status": response.get("status", 0), "statusText": response.get("statusText", ""),
+                         "httpVersion": response.get("protocol", ""), "headers": _headers(response.get("headers", {})),
+                         "content": {"size": int(size), "mimeType": response.get("mimeType", "")},
+                         "bodySize": int(size)},
+            "timings": _timings(response.get("timing"), duration_ms),
+            "_resourceType": pending["type"],
+        }
+        if "error" in pending:
+            entry["_error"] = pending["error"]
+        if self._bodies and pending["type"] in _BODY_RESOURCE_TYPES and "error" not in pending:
+            entry["response"]["content"]["text"] = self._body(request_id)
+        self._file.write(json.dumps(entry) + "\n")
+
+    def _body(self, request_id: str) -> str:
+        try:
+            body = self._driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except WebDriverException:
+            return ""
+        return body.get("body", "")[:settings.NETWORK_MAX_BODY_BYTES]
+
+    def finish(self) -> None:
+        """Final drain before the driver quits; requests still in flight are written as unfinished."""
+        if self._driver is None:
+            return
+        self.drain()
+        for request_id, pending in list(self._inflight.items()):
+            pending.setdefault("error", "unfinished when the test ended")
+            self._finish(request_id, pending["start"], 0)
+        self._file.close()
+        self._driver = None
+
+    def settle(self, keep: bool) -> Dict:
+        """Keep or delete the capture file of the finished test; returns the summary."""
+        summary = dict(self.stats, kept=str(self.path) if keep else None)
+        if self.path is not None and not keep:
+            self.path.unlink(missing_ok=True)
+        self.path = None
+        return summary
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
+def _headers(headers: Dict) -> List[Dict]:
+    return [{"name": name, "value": str(value)} for name, value in headers.items()]
+
+
+def _timings(timing: Optional[Dict], total_ms: float) -> Dict:
+    """HAR timings from the DevTools ResourceTiming (milliseconds relative to requestTime)."""
+    if not timing:
+        return {"send": 0, "wait": total_ms, "receive": 0}
+
+    def span(start: str, end: str) -> float:
+        return round(timing[end] - timing[start], 1) if timing.get(start, -1) >= 0 and timing.get(end, -1) >= 0 else -1
+
+    wait = span("sendEnd", "receiveHeadersEnd")
+    return {"blocked": -1, "dns": span("dnsStart", "dnsEnd"), "connect": span("connectStart", "connectEnd"),
+            "ssl": span("sslStart", "sslEnd"), "send": span("sendStart", "sendEnd"), "wait": wait,
+            "receive": round(max(total_ms - timing.get("receiveHeadersEnd", 0), 0), 1)}
+
+
+network_capture = NetworkCapture()
+
+
+class NetworkCapturePlugin:
+    """Pytest plugin that keeps a test's capture only when it failed or was slow and attaches the summary."""
+
+    def __init__(self):
+        self._failed = False
+        self._duration = 0.0
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item: pytest.Item) -> None:
+        self._failed = False
+        self._duration = 0.0
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item: pytest.Item, call: pytest.CallInfo):
+        outcome = yield
+        report = outcome.get_result()
+        self._failed = self._failed or report.outcome in ("failed", "rerun")
+        self._duration += report.duration
+        if report.when != "teardown" or network_capture.path is None:
+            return
+        summary = network_capture.settle(keep=self._failed or self._duration > settings.SLOW_TEST_THRESHOLD)
+        item.user_properties.append(("network", {key: summary[key] for key in ("requests", "failed", "bytes")}))
+        allure.attach(json.dumps(summary, indent=2), name="Network summary",
+                      attachment_type=allure.attachment_type.JSON)
+        if summary["failed"]:
+            logger.warning(f"🌐 {item.nodeid}: {summary['failed']} of {summary['requests']} browser requests failed")
+
+
+def to_har(path: Path) -> Dict:
+    """Read a capture file into a HAR 1.2 document."""
+    with gzip.open(path, "rt", encoding="utf-8") as capture:
+        header = json.loads(capture.readline())
+        entries = [json.loads(line) for line in capture]
+    return {"log": {"version": "1.2", "creator": header["creator"], "pages": [], "entries": entries}}
+
+
+def _main() -> int:
+    parser = argparse.ArgumentParser(description="Convert a network capture (.jsonl.gz) to a HAR file on stdout")
+    parser.add_argument("capture", type=Path)
+    args = parser.parse_args()
+    json.dump(to_har(args.capture), sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
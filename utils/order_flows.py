@@ -0,0 +1,130 @@
+"""
+Order journeys declared as flows
+
+Steps read their inputs from context.data:
+    product_id, product_title: product to buy
+    email: guest email (guest flow)
+and store results there (order_number).
+
+API shortcuts use the shop API where it has an endpoint (login, add
+product). Checkout state lives in the Django session and has no API, so
+the guest gateway and shipping address shortcuts post the same HTML forms
+the browser would, with the browser's cookies.
+"""
+
+import logging
+from typing import Dict
+
+import requests
+
+from config import settings
+from data.api_endpoints import API_ENDPOINTS
+from pages.basket_page import BasketPage
+from pages.checkout_page import CheckoutPage
+from pages.login_page import LoginPage
+from pages.product_page import ProductPage
+from utils.basket_seeder import BasketSeeder
+from utils.flow import Flow, FlowContext, Step
+from utils.user_pool import extract_csrf_token
+
+logger = logging.getLogger(__name__)
+
+
+def submit_form(context: FlowContext, url: str, fields: Dict[str, str]) -> requests.Response:
+    """
+    Post an HTML form the way the browser would (CSRF token from the page, Referer set).
+
+    Raises:
+        AssertionError: If the page has no form or the shop shows the form again instead of moving on
+    """
+    page = context.session.get(url, timeout=settings.PAGE_LOAD_TIMEOUT)
+    token = extract_csrf_token(page.text)
+    assert token, f"No form with CSRF token on {page.url}"
+
+    response = context.session.post(page.url, data={"csrfmiddlewaretoken": token, **fields},
+                                     headers={"Referer": page.url}, timeout=settings.PAGE_LOAD_TIMEOUT)
+    assert response.ok and response.url != page.url, (
+        f"Form on {page.url} was not accepted (status {response.status_code}, stayed on {response.url})"
+    )
+    return response
+
+
+# ---- login ----
+def login_ui(context: FlowContext) -> None:
+    login_page = LoginPage(context.browser, settings.LOGIN_URL)
+    login_page.open()
+    login_page.login_user(context.user["email"], context.user["password"])
+    login_page.should_be_logged_in()
+
+
+def login_api(context: FlowContext) -> None:
+    response = context.session.post(API_ENDPOINTS["login"], json={
+        "username": context.user["username"],
+        "password": context.user["password"],
+    }, headers=context.csrf_headers(), timeout=settings.PAGE_LOAD_TIMEOUT)
+    assert response.status_code == 200, f"API login failed with status {response.status_code}: {response.text}"
+
+
+# ---- basket ----
+def add_product_ui(context: FlowContext) -> None:
+    url = f"{settings.CATALOG_URL}{context.data['product_slug']}_{context.data['product_id']}/"
+    product_page = ProductPage(context.browser, url)
+    product_page.open()
+    product_page.add_to_basket()
+    product_page.go_to_basket_from_header()
+
+
+def add_product_api(context: FlowContext) -> None:
+    BasketSeeder(context.session).add_product(context.data["product_id"])
+
+
+def verify_basket_ui(context: FlowContext) -> None:
+    basket_page = BasketPage(context.browser, settings.BASKET_URL)
+    basket_page.open()
+    basket_page.should_contain_product(context.data["product_title"])
+
+
+# ---- checkout ----
+def guest_checkout_ui(context: FlowContext) -> None:
+    BasketPage(context.browser, settings.BASKET_URL).proceed_to_checkout()
+    CheckoutPage(context.browser, settings.CHECKOUT_URL).continue_as_guest(context.data["email"])
+
+
+def guest_checkout_api(context: FlowContext) -> None:
+    submit_form(context, settings.CHECKOUT_URL, {"username": context.data["email"], "options": "anonymous"})
+
+
+def shipping_address_ui(context: FlowContext) -> None:
+    checkout_page = CheckoutPage(context.browser, settings.SHIPPING_ADDRESS_URL)
+    if "/checkout/shipping-address" not in checkout_page.get_current_url():
+        checkout_page.open()
+    checkout_page.fill_shipping_address(settings.SHIPPING_ADDRESS)
+
+
+def shipping_address_api(context: FlowContext) -> None:
+    submit_form(context, settings.SHIPPING_ADDRESS_URL, settings.SHIPPING_ADDRESS)
+
+
+def place_order_ui(context: FlowContext) -> None:
+    checkout_page = CheckoutPage(context.browser, settings.PAYMENT_DETAILS_URL)
+    checkout_page.open()
+    checkout_page.continue_to_preview()
+    checkout_page.place_order()
+    context.data["order_number"] = checkout_page.should_display_confirmation()
+
+
+GUEST_ORDER = Flow("guest_order", [
+    Step("add_product", add_product_ui, add_product_api),
+    Step("verify_basket", verify_basket_ui),
+    Step("guest_checkout", guest_checkout_ui, guest_checkout_api),
+    Step("shipping_address", shipping_address_ui, shipping_address_api),
+    Step("place_order", place_order_ui),
+])
+
+LOGGED_IN_ORDER = Flow("logged_in_order", [
+    Step("login", login_ui, login_api),
+    Step("add_product", add_product_ui, add_product_api),
+    Step("verify_basket", verify_basket_ui),
+    Step("shipping_address", shipping_address_ui, shipping_address_api),
+    Step("place_order", place_order_ui),
+])
@@ -0,0 +1,216 @@
+"""
+Product page sweep across the whole catalogue
+
+Fans every product of the crawled index out to a pool of workers that run
+the product page checks (name, price, add-to-basket button) in batch:
+
+- HTTP workers fetch the page and check the same elements in the HTML;
+  cheap enough for dozens in parallel
+- Browser workers each keep one Chrome open and run
+  ProductPage.should_be_product_page / should_have_price per product
+
+Both kinds pull from one queue, so a product is verified once by whichever
+worker is free. Every result is appended to a JSONL report as soon as it
+is known; the last line is the summary with products/minute.
+
+Usage:
+    python -m utils.product_sweep --http-workers 16
+    python -m utils.product_sweep --http-workers 8 --browser-workers 2 --out sweep.jsonl
+"""
+
+import argparse
+import html
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import requests
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service as ChromeService
+from webdriver_manager.chrome import ChromeDriverManager
+
+from config import settings
+from pages.product_page import ProductPage
+from utils.api_timing import timed_session
+from utils.browser_profile import build_chrome_options
+from utils.catalogue_index import load_product_index
+from utils.run_context import run_dir
+
+logger = logging.getLogger(__name__)
+
+_PRODUCT_MAIN_PATTERN = re.compile(r'<div class="[^"]*product_main[^"]*">(.*?)</div>', re.DOTALL)
+_NAME_PATTERN = re.compile(r"<h1>\s*(.*?)\s*</h1>", re.DOTALL)
+_PRICE_PATTERN = re.compile(r'<p class="price_color">\s*([^<]+?)\s*</p>')
+_ADD_BUTTON_PATTERN = re.compile(r'class="[^"]*btn-add-to-basket[^"]*"')
+
+
+def check_product_html(page_html: str, product: Dict) -> List[str]:
+    """Product page checks on raw HTML; returns the failed checks (empty means OK)."""
+    errors = []
+    main = _PRODUCT_MAIN_PATTERN.search(page_html)
+    name = _NAME_PATTERN.search(main.group(1)) if main else None
+    price = _PRICE_PATTERN.search(main.group(1)) if main else None
+
+    if not name:
+        errors.append("product name is not present")
+    elif html.unescape(name.group(1)) != product["title"]:
+        errors.append(f"name mismatch: expected '{product['title']}', got '{html.unescape(name.group(1))}'")
+    if not price:
+        errors.append("product price is not present")
+    elif product.get("price") and html.unescape(price.group(1)) != product["price"]:
+        errors.append(f"price mismatch: expected '{product['price']}', got '{html.unescape(price.group(1))}'")
+    if product.get("in_stock", True) and not _ADD_BUTTON_PATTERN.search(page_html):
+        errors.append("'Add to Basket' button is not present")
+    return errors
+
+
+class SweepReport:
+    """Thread-safe JSONL writer with running counts."""
+
+    def __init__(self, path: Path, total: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.total = total
+        self.checked = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def add(self, product: Dict, worker: str, errors: List[str], elapsed: float) -> None:
+        record = {"id": product["id"], "title": product["title"], "url": product["url"], "worker": worker,
+                  "ok": not errors, "errors": errors, "ms": round(elapsed * 1000)}
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self.checked += 1
+            self.failed += bool(errors)
+            if self.checked % 50 == 0 or self.checked == self.total:
+                logger.info(f"Sweep progress: {self.checked}/{self.total} "
+                            f"({self.products_per_minute():.0f} products/min, {self.failed} failed)")
+
+    def products_per_minute(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.checked / elapsed * 60 if elapsed else 0.0
+
+    def close(self) -> Dict:
+        summary = {"summary": True, "products": self.checked, "failed": self.failed,
+                   "seconds": round(time.perf_counter() - self.started, 1),
+                   "products_per_minute": round(self.products_per_minute(), 1)}
+        with self._lock:
+            self._file.write(json.dumps(summary) + "\n")
+            self._file.close()
+        return summary
+
+
+def _http_worker(name: str, products: "queue.Queue", report: SweepReport) -> None:
+    session = timed_session()
+    session.headers.update({'User-Agent': 'QA-Tests/1.0 (sweep)'})
+    while True:
+        try:
+            product = products.get_nowait()
+        except queue.Empty:
+            break
+        start = time.perf_counter()
+        try:
+            response = session.get(product["url"], timeout=settings.PAGE_LOAD_TIMEOUT)
+            errors = [f"HTTP {response.status_code}"] if response.status_code != 200 \
+                else check_product_html(response.text, product)
+        except requests.RequestException as e:
+            errors = [f"request failed: {e}"]
+        report.add(product, name, errors, time.perf_counter() - start)
+    session.close()
+
+
+def _browser_worker(name: str, products: "queue.Queue", report: SweepReport, headless: bool) -> None:
+    try:
+        driver = webdriver.Chrome(
+            service=ChromeService(ChromeDriverManager().install()),
+            options=build_chrome_options(headless, settings.DEFAULT_LANGUAGE)
+        )
+    except WebDriverException as e:
+        logger.error(f"{name}: Chrome could not start, leaving products to other workers: {e}")
+        return
+    driver.set_page_load_timeout(settings.PAGE_LOAD_TIMEOUT)
+
+    try:
+        while True:
+            try:
+                product = products.get_nowait()
+            except queue.Empty:
+                break
+            start = time.perf_counter()
+            errors = []
+            try:
+                driver.get(product["url"])
+                page = ProductPage(driver, product["url"])
+                page.should_be_product_page(product["title"])
+                if product.get("price"):
+                    page.should_have_price(product["price"])
+            except (AssertionError, WebDriverException) as e:
+                errors = [str(e).splitlines()[0] if str(e) else type(e).__name__]
+            report.add(product, name, errors, time.perf_counter() - start)
+    finally:
+        driver.quit()
+
+
+def run_sweep(products: List[Dict], report_path: Path, http_workers: int = 16,
+              browser_workers: int = 0, headless: bool = True) -> Dict:
+    """
+    Verify every product page with the given worker pool.
+
+    Returns:
+        Summary with products checked, failures and products_per_minute
+    """
+    pending: "queue.Queue" = queue.Queue()
+    for product in products:
+        pending.put(product)
+
+    report = SweepReport(report_path, len(products))
+    threads = [threading.Thread(target=_http_worker, args=(f"http-{n}", pending, report), daemon=True)
+               for n in range(http_workers)]
+    threads += [threading.Thread(target=_browser_worker, args=(f"browser-{n}", pending, report, headless),
+                                 daemon=True)
+                for n in range(browser_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = report.close()
+    if report.checked < len(products):
+        logger.error(f"{len(products) - report.checked} products were not checked (no worker left)")
+    return summary
+
+
+def _main() -> int:
+    parser = argparse.ArgumentParser(description="Verify every catalogue product page")
+    parser.add_argument("--http-workers", type=int, default=16)
+    parser.add_argument("--browser-workers", type=int, default=0)
+    parser.add_argument("--limit", type=int, default=None, help="Only sweep the first N products")
+    parser.add_argument("--refresh-index", action="store_true", help="Crawl the catalogue even if cached")
+    parser.add_argument("--headed", action="store_true", help="Show browser windows")
+    parser.add_argument("--out", type=Path, default=None, help="JSONL report (default: run dir)")
+    args = parser.parse_args()
+
+    index = load_product_index(refresh=args.refresh_index)
+    products = list(index)[:args.limit]
+    report_path = args.out or run_dir() / "product_sweep.jsonl"
+    logger.info(f"Sweeping {len(products)} products ({index.source} index) with "
+                f"{args.http_workers} HTTP and {args.browser_workers} browser workers")
+
+    summary = run_sweep(products, report_path, args.http_workers, args.browser_workers, not args.headed)
+    print(f"{summary['products']} products in {summary['seconds']}s: "
+          f"{summary['products_per_minute']} products/min, {summary['failed']} failed. Report: {report_path}")
+    return 1 if summary["failed"] or summary["products"] < len(products) else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+    raise SystemExit(_main())
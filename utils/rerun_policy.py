@@ -0,0 +1,209 @@
+"""
+History-aware reruns for known-flaky tests
+
+Replaces the blanket `--reruns 3` of pytest-rerunfailures. A failed test is
+rerun only when it is known to be flaky:
+
+- it carries @pytest.mark.flaky (optionally flaky(reruns=N)), or
+- its flake rate in the results history is above FLAKY_RATE_THRESHOLD
+
+A rerun stops as soon as an attempt fails with the same error signature
+(exception type, normalized message, crash location) as the attempt before:
+that failure is deterministic and more attempts only cost time.
+
+Reruns are not run in place. The failed attempt is reported as "rerun" and
+the test goes to a queue that is drained after the regular test loop, so
+under xdist the retries run on a worker once the controller has nothing
+left to give it, and never delay first results.
+
+The flake rate comes from the last FLAKY_HISTORY_RUNS outcomes of the test
+in the results database ("passed", "failed" or "flaky" when it passed on a
+rerun) and counts flaky runs plus pass/fail flips between consecutive runs.
+Without an earlier .run/results.db (see utils/results_db.py for how CI
+keeps it) only marked tests are rerun.
+
+Usage (conftest.py):
+    config.pluginmanager.register(RerunPolicy(ResultsHistory(ResultsDB())), "rerun_policy")
+"""
+
+import logging
+import re
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List
+
+import pytest
+
+from config import settings
+from utils.results_db import ResultsDB
+
+logger = logging.getLogger(__name__)
+
+_ADDRESS_PATTERN = re.compile(r"0x[0-9a-fA-F]+")
+_NUMBER_PATTERN = re.compile(r"\d+")
+
+
+def error_signature(report: pytest.TestReport) -> str:
+    """
+    Stable signature of a failure: exception line without volatile numbers, plus crash location.
+
+    Two attempts with the same signature failed the same way.
+    """
+    crash = getattr(report.longrepr, "reprcrash", None)
+    if crash is None:
+        lines = str(report.longrepr).strip().splitlines()
+        message, location = lines[-1] if lines else "", ""
+    else:
+        message, location = crash.message, f"{Path(crash.path).name}:{crash.lineno}"
+    first_line = (message.splitlines() or [""])[0]
+    first_line = _NUMBER_PATTERN.sub("N", _ADDRESS_PATTERN.sub("0x?", first_line))
+    return f"{first_line[:200]} @ {location}"
+
+
+class ResultsHistory:
+    """Flake rates from the outcomes of earlier runs in the results database."""
+
+    def __init__(self, db: ResultsDB):
+        self.db = db
+
+    def flake_rate(self, nodeid: str) -> float:
+        """Share of recorded runs where the test passed on a rerun or flipped between pass and fail."""
+        outcomes = self.db.outcomes(nodeid, settings.FLAKY_HISTORY_RUNS)
+        if not outcomes:
+            return 0.0
+        flaky = outcomes.count("flaky")
+        settled = [outcome for outcome in outcomes if outcome != "flaky"]
+        flips = sum(previous != current for previous, current in zip(settled, settled[1:]))
+        return (flaky + flips) / len(outcomes)
+
+    def is_flaky(self, nodeid: str) -> bool:
+        return self.flake_rate(nodeid) > settings.FLAKY_RATE_THRESHOLD
+
+
+class RerunPolicy:
+    """
+    Pytest plugin that reruns known-flaky failures at the end of the run.
+
+    Attributes:
+        history (ResultsHistory): Outcomes of earlier runs
+        results (Dict[str, Dict]): Outcome, attempts and error signatures per test of this run
+    """
+
+    def __init__(self, history: ResultsHistory):
+        self.history = history
+        self.results: Dict[str, Dict] = {}
+        self._pending: Deque[pytest.Item] = deque()
+
+    def max_reruns(self, item: pytest.Item) -> int:
+        """Reruns allowed for the test: the flaky marker's reruns, RETRY_COUNT if known flaky, else 0."""
+        marker = item.get_closest_marker("flaky")
+        if marker is not None:
+            return int(marker.kwargs.get("reruns", settings.RETRY_COUNT))
+        return settings.RETRY_COUNT if self.history.is_flaky(item.nodeid) else 0
+
+    def _should_rerun(self, item: pytest.Item, signatures: List[str]) -> bool:
+        if len(signatures) > self.max_reruns(item):
+            return False
+        if len(signatures) >= 2 and signatures[-1] == signatures[-2]:
+            logger.info(f"Not rerunning {item.nodeid}: failed twice with '{signatures[-1]}'")
+            return False
+        return not (item.session.shouldfail or item.session.shouldstop)
+
+    @pytest.hookimpl(hookwrapper=True, trylast=True)
+    def pytest_runtest_makereport(self, item: pytest.Item, call: pytest.CallInfo):
+        """Turn a failure that will be retried into a "rerun" report and queue the test."""
+        outcome = yield
+        report = outcome.get_result()
+        result = self.results.setdefault(item.nodeid, {"outcome": None, "attempts": 0, "signatures": []})
+
+        if report.when == "setup":
+            result["attempts"] += 1
+            if report.skipped:
+                result["outcome"] = "skipped"
+        if report.failed and report.when in ("setup", "call"):
+            result["signatures"].append(error_signature(report))
+            if self._should_rerun(item, result["signatures"]):
+                report.outcome = "rerun"
+                self._pending.append(item)
+                logger.warning(f"🔁 {item.nodeid} failed (attempt {result['attempts']}), rerun queued: "
+                               f"{result['signatures'][-1]}")
+            else:
+                result["outcome"] = "failed"
+        elif report.when == "call" and report.passed:
+            result["outcome"] = "flaky" if result["signatures"] else "passed"
+        elif report.when == "teardown" and report.failed:
+            result["outcome"] = "failed"
+
+    def pytest_report_teststatus(self, report: pytest.TestReport):
+        if report.outcome == "rerun":
+            return "rerun", "R", ("RERUN", {"yellow": True})
+        return None
+
+    @staticmethod
+    def _reset_item(item: pytest.Item) -> None:
+        """Forget the failed attempt's fixture values, failed fixture results and class instance."""
+        item._initrequest()
+        for fixturedefs in item._fixtureinfo.name2fixturedefs.values():
+            for fixturedef in fixturedefs:
+                cached = fixturedef.cached_result
+                if cached is not None and cached[2] is not None:
+                    fixturedef.cached_result = None
+                    fixturedef._finalizers.clear()
+        if getattr(item, "_instance", None) is not None:
+            del item._instance
+            item._obj = None
+
+    @staticmethod
+    def _xdist_worker(session: pytest.Session):
+        """The xdist worker plugin of this process, None when not running as a worker."""
+        if not hasattr(session.config, "workerinput"):
+            return None
+        # xdist runs its worker module through execnet, so the class can't be imported for isinstance()
+        return next((plugin for plugin in session.config.pluginmanager.get_plugins()
+                     if type(plugin).__name__ == "WorkerInteractor"), None)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtestloop(self, session: pytest.Session):
+        """Drain the rerun queue once this process has no regular tests left."""
+        yield
+        worker = self._xdist_worker(session) if self._pending else None
+        while self._pending and not (session.shouldfail or session.shouldstop):
+            item = self._pending.popleft()
+            self._reset_item(item)
+            if worker is not None:
+                # the worker tags every report it sends with the index of the test it is running
+                worker.item_index = session.items.index(item)
+            item.execution_count = self.results[item.nodeid]["attempts"] + 1
+            nextitem = self._pending[0] if self._pending else None
+            item.ihook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+
+    def final_results(self) -> Dict[str, Dict]:
+        """Tests of this run with a passed/failed/flaky outcome (skipped ones are not history)."""
+        return {nodeid: result for nodeid, result in self.results.items()
+                if result["outcome"] in ("passed", "failed", "flaky")}
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Workers hand their results to the controller for the rerun summary"""
+        config = session.config
+        if hasattr(config, "workerinput"):
+            config.workeroutput["test_results"] = self.final_results()
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error) -> None:
+        """Merge the results of a finished xdist worker"""
+        self.results.update(getattr(node, "workeroutput", {}).get("test_results", {}))
+
+    def pytest_terminal_summary(self, terminalreporter, config) -> None:
+        if hasattr(config, "workerinput"):
+            return
+        retried = {nodeid: result for nodeid, result in self.final_results().items() if result["attempts"] > 1}
+        if not retried:
+            return
+
+        terminalreporter.write_sep("=", "Reruns")
+        for nodeid, result in sorted(retried.items()):
+            terminalreporter.write_line(
+                f"{result['outcome'].upper():<7} after {result['attempts']} attempts: {nodeid} "
+                f"(flake rate {self.history.flake_rate(nodeid):.0%})",
+                yellow=result["outcome"] == "flaky", red=result["outcome"] == "failed"
+            )
@@ -0,0 +1,371 @@
+"""
+SQLite warehouse of test results and timings
+
+Every run writes one row per test (final outcome, attempts, setup/call/
+teardown milliseconds of the last attempt, WebDriver commands sent), the
+page objects each test constructed, its visual baseline comparisons, and
+the per-endpoint API latency percentiles into .run/results.db. Only the controller writes, once per
+run; workers send what they measured along with their test reports.
+
+The database is the source for rerun decisions (flake rate per test) and
+for scheduling (longest tests first), and answers questions from the CLI:
+
+    python -m utils.results_db slowest --limit 20 --runs 30
+    python -m utils.results_db flaky-pages --runs 30
+    python -m utils.results_db trend test_guest_order_flow --runs 30
+    python -m utils.results_db visual --runs 30
+
+Rerun decisions and scheduling only see what the database remembers: the
+CI workflows keep .run/results.db in the Actions cache (per branch, falling
+back to main) and mount .run into the Docker container. A run without that
+history (a fresh checkout, `docker run` without the mount) reruns only
+@pytest.mark.flaky tests and keeps the collection order.
+"""
+
+import argparse
+import logging
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import pytest
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from config import settings
+from utils.driver_commands import command_hooks
+from utils.run_context import artifacts_dir, run_id
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    exitstatus INTEGER
+);
+CREATE TABLE IF NOT EXISTS test_results (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    setup_ms REAL,
+    call_ms REAL,
+    teardown_ms REAL,
+    webdriver_commands INTEGER,
+    worker TEXT,
+    PRIMARY KEY (run_id, nodeid)
+);
+CREATE INDEX IF NOT EXISTS idx_test_results_nodeid ON test_results (nodeid, run_id);
+CREATE TABLE IF NOT EXISTS test_page_objects (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    nodeid TEXT NOT NULL,
+    page_object TEXT NOT NULL,
+    PRIMARY KEY (run_id, nodeid, page_object)
+);
+CREATE INDEX IF NOT EXISTS idx_test_page_objects_page ON test_page_objects (page_object);
+CREATE TABLE IF NOT EXISTS api_latency (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    endpoint TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    p50_ms REAL,
+    p95_ms REAL,
+    p99_ms REAL,
+    PRIMARY KEY (run_id, endpoint)
+);
+CREATE INDEX IF NOT EXISTS idx_api_latency_endpoint ON api_latency (endpoint, run_id);
+CREATE TABLE IF NOT EXISTS visual_comparisons (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    nodeid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    passed INTEGER NOT NULL,
+    prefiltered INTEGER NOT NULL,
+    diff_ratio REAL,
+    compare_ms REAL,
+    baseline_bytes INTEGER,
+    PRIMARY KEY (run_id, nodeid, name)
+);
+"""
+
+# Last N runs, newest first; used as a subquery by the reports
+_RECENT_RUNS = "SELECT run_id FROM runs ORDER BY started_at DESC LIMIT ?"
+
+
+class ResultsDB:
+    """
+    Results warehouse in one SQLite file.
+
+    Attributes:
+        path (Path): Database file
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else artifacts_dir() / "results.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ---- writing ----
+    def record_run(self, run: str, started_at: float, exitstatus: int, tests: Dict[str, Dict],
+                   api_summary: Optional[Dict[str, Dict]] = None) -> None:
+        """Store one run and drop runs beyond RESULTS_DB_RUNS_TO_KEEP."""
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?)",
+                               (run, started_at, time.time(), int(exitstatus)))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO test_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run, nodeid, t["outcome"], t["attempts"], t.get("setup_ms"), t.get("call_ms"),
+                  t.get("teardown_ms"), t.get("webdriver_commands"), t.get("worker"))
+                 for nodeid, t in tests.items()]
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO test_page_objects VALUES (?, ?, ?)",
+                [(run, nodeid, page) for nodeid, t in tests.items() for page in t.get("page_objects", ())]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO api_latency VALUES (?, ?, ?, ?, ?, ?)",
+                [(run, endpoint, row["count"], row["p50_ms"], row["p95_ms"], row["p99_ms"])
+                 for endpoint, row in (api_summary or {}).items()]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO visual_comparisons VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run, nodeid, v["name"], v["passed"], v["prefiltered"], v["diff_ratio"], v["compare_ms"],
+                  v["baseline_bytes"]) for nodeid, t in tests.items() for v in t.get("visual_comparisons", ())]
+            )
+            self._conn.execute(
+                "DELETE FROM runs WHERE run_id NOT IN (SELECT run_id FROM runs ORDER BY started_at DESC LIMIT ?)",
+                (settings.RESULTS_DB_RUNS_TO_KEEP,)
+            )
+
+    # ---- decisions ----
+    def outcomes(self, nodeid: str, runs: int) -> List[str]:
+        """Final outcomes of the test in the last `runs` runs, oldest first."""
+        rows = self._conn.execute(
+            f"SELECT t.outcome FROM test_results t JOIN runs r USING (run_id) "
+            f"WHERE t.nodeid = ? AND t.run_id IN ({_RECENT_RUNS}) AND t.outcome != 'skipped' "
+            f"ORDER BY r.started_at", (nodeid, runs)
+        )
+        return [row["outcome"] for row in rows]
+
+    def mean_durations(self, runs: int) -> Dict[str, float]:
+        """Mean setup+call+teardown milliseconds per test over the last `runs` runs."""
+        rows = self._conn.execute(
+            f"SELECT nodeid, AVG(COALESCE(setup_ms, 0) + COALESCE(call_ms, 0) + COALESCE(teardown_ms, 0)) AS ms "
+            f"FROM test_results WHERE run_id IN ({_RECENT_RUNS}) AND outcome != 'skipped' GROUP BY nodeid", (runs,)
+        )
+        return {row["nodeid"]: row["ms"] for row in rows}
+
+    def api_p95_history(self, runs: int, min_count: int, exclude_run: Optional[str] = None) -> Dict[str, List[float]]:
+        """p95 ms per endpoint over the last `runs` runs other than `exclude_run`, from runs with min_count requests."""
+        rows = self._conn.execute(
+            "SELECT endpoint, p95_ms FROM api_latency WHERE run_id IN "
+            "(SELECT run_id FROM runs WHERE run_id != ? ORDER BY started_at DESC LIMIT ?) "
+            "AND count >= ? AND p95_ms IS NOT NULL", (exclude_run or "", runs, min_count)
+        )
+        history: Dict[str, List[float]] = {}
+        for row in rows:
+            history.setdefault(row["endpoint"], []).append(row["p95_ms"])
+        return history
+
+    # ---- reports ----
+    def slowest_tests(self, limit: int = 20, runs: int = 30) -> List[sqlite3.Row]:
+        return self._conn.execute(
+            f"SELECT nodeid, COUNT(*) AS runs, "
+            f"AVG(COALESCE(setup_ms, 0) + COALESCE(call_ms, 0) + COALESCE(teardown_ms, 0)) AS avg_ms, "
+            f"MAX(COALESCE(setup_ms, 0) + COALESCE(call_ms, 0) + COALESCE(teardown_ms, 0)) AS max_ms, "
+            f"AVG(call_ms) AS avg_call_ms, AVG(webdriver_commands) AS avg_commands "
+            f"FROM test_results WHERE run_id IN ({_RECENT_RUNS}) AND outcome != 'skipped' "
+            f"GROUP BY nodeid ORDER BY avg_ms DESC LIMIT ?", (runs, limit)
+        ).fetchall()
+
+    def flake_rate_by_page_object(self, runs: int = 30) -> List[sqlite3.Row]:
+        """Share of test executions using each page object that passed only on a rerun, plus their failures."""
+        return self._conn.execute(
+            f"SELECT p.page_object, COUNT(*) AS executions, "
+            f"SUM(t.outcome = 'flaky') AS flaky, SUM(t.outcome = 'failed') AS failed, "
+            f"1.0 * SUM(t.outcome = 'flaky') / COUNT(*) AS flake_rate "
+            f"FROM test_page_objects p JOIN test_results t USING (run_id, nodeid) "
+            f"WHERE p.run_id IN ({_RECENT_RUNS}) AND t.outcome != 'skipped' "
+            f"GROUP BY p.page_object ORDER BY flake_rate DESC, failed DESC", (runs,)
+        ).fetchall()
+
+    def visual_stats(self, runs: int = 30) -> List[sqlite3.Row]:
+        """Comparison time, prefilter hit rate, failures and baseline size per visual baseline."""
+        return self._conn.execute(
+            f"SELECT name, COUNT(*) AS comparisons, AVG(compare_ms) AS avg_ms, MAX(compare_ms) AS max_ms, "
+            f"100.0 * SUM(prefiltered) / COUNT(*) AS prefiltered_pct, SUM(NOT passed) AS failed, "
+            f"MAX(baseline_bytes) / 1024.0 AS baseline_kb "
+            f"FROM visual_comparisons WHERE run_id IN ({_RECENT_RUNS}) GROUP BY name ORDER BY avg_ms DESC", (runs,)
+        ).fetchall()
+
+    def duration_trend(self, test: str, runs: int = 30) -> List[sqlite3.Row]:
+        """Per-run durations of every test whose node id contains `test`, oldest run first."""
+        return self._conn.execute(
+            f"SELECT r.run_id, r.started_at, t.nodeid, t.outcome, t.attempts, t.setup_ms, t.call_ms, t.teardown_ms "
+            f"FROM test_results t JOIN runs r USING (run_id) "
+            f"WHERE t.nodeid LIKE ? AND t.run_id IN ({_RECENT_RUNS}) ORDER BY t.nodeid, r.started_at",
+            (f"%{test}%", runs)
+        ).fetchall()
+
+
+class ActivityTracker:
+    """What the running test did in this process: page objects constructed, visual comparisons (reset per test)."""
+
+    def __init__(self):
+        self.page_objects: Set[str] = set()
+        self.visual_comparisons: List[Dict] = []
+
+    def reset(self) -> None:
+        self.page_objects = set()
+        self.visual_comparisons = []
+
+    def record_page_object(self, name: str) -> None:
+        self.page_objects.add(name)
+
+    def record_visual_comparison(self, name: str, passed: bool, prefiltered: bool, diff_ratio: float,
+                                 compare_ms: float, baseline_bytes: int) -> None:
+        self.visual_comparisons.append({"name": name, "passed": passed, "prefiltered": prefiltered,
+                                        "diff_ratio": diff_ratio, "compare_ms": round(compare_ms, 1),
+                                        "baseline_bytes": baseline_bytes})
+
+
+test_activity = ActivityTracker()
+
+
+def count_webdriver_commands(driver: WebDriver) -> Counter:
+    """
+    Count every command the test sends (find_element, click, get, ...) in the returned Counter.
+
+    The framework's own commands (network capture, telemetry) are not counted.
+    """
+    commands: Counter = Counter()
+
+    def count(driver_command: str) -> None:
+        commands[driver_command] += 1
+
+    command_hooks(driver).subscribe(count)
+    return commands
+
+
+class ResultsRecorder:
+    """
+    Pytest plugin that collects every test's outcome and phase durations on the controller
+    and writes the run into the results database at the end.
+
+    Workers add "webdriver_commands", "page_objects" and "visual_comparisons" to the test's user_properties,
+    which travel to the controller with the reports.
+    """
+
+    def __init__(self, db: ResultsDB):
+        self.db = db
+        self.started_at = time.time()
+        self.tests: Dict[str, Dict] = {}
+
+    def pytest_runtest_setup(self, item: pytest.Item) -> None:
+        test_activity.reset()
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_teardown(self, item: pytest.Item) -> None:
+        if test_activity.page_objects:
+            item.user_properties.append(("page_objects", sorted(test_activity.page_objects)))
+        if test_activity.visual_comparisons:
+            item.user_properties.append(("visual_comparisons", test_activity.visual_comparisons))
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        test = self.tests.setdefault(report.nodeid, {"outcome": None, "attempts": 0, "reruns": 0})
+        if report.when == "setup":
+            test["attempts"] += 1
+        test[f"{report.when}_ms"] = round(report.duration * 1000, 1)
+        test["worker"] = getattr(report, "worker_id", "master")
+        for name, value in report.user_properties:
+            if name in ("webdriver_commands", "page_objects", "visual_comparisons"):
+                test[name] = value
+
+        if report.outcome == "rerun":
+            test["reruns"] += 1
+        elif report.failed:
+            test["outcome"] = "failed"
+        elif report.skipped and test["outcome"] is None:
+            test["outcome"] = "skipped"
+        elif report.when == "call" and report.passed:
+            test["outcome"] = "flaky" if test["reruns"] else "passed"
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        if hasattr(session.config, "workerinput"):
+            return
+        from utils.api_timing import api_timings
+        tests = {nodeid: test for nodeid, test in self.tests.items() if test["outcome"]}
+        if tests:
+            self.db.record_run(run_id(), self.started_at, session.exitstatus, tests, api_timings.summary())
+            logger.info(f"Stored {len(tests)} test results of run {run_id()} in {self.db.path}")
+
+
+def order_longest_first(items: List[pytest.Item], durations: Dict[str, float]) -> None:
+    """Sort items in place by historical duration, longest first; tests without history go first."""
+    unknown = float("inf")
+    items.sort(key=lambda item: -durations.get(item.nodeid, unknown))
+
+
+def _print_rows(rows: Iterable[sqlite3.Row], columns: List[str]) -> None:
+    rows = list(rows)
+    if not rows:
+        print("No data")
+        return
+    print("  ".join(f"{column:>12}" if column != columns[0] else f"{column:<70}" for column in columns))
+    for row in rows:
+        cells = []
+        for column in columns:
+            value = row[column]
+            if column == columns[0]:
+                cells.append(f"{str(value)[:70]:<70}")
+            elif isinstance(value, float):
+                cells.append(f"{value:>12.1f}")
+            else:
+                cells.append(f"{'-' if value is None else value:>12}")
+        print("  ".join(cells))
+
+
+def _main() -> int:
+    parser = argparse.ArgumentParser(description="Query the test results warehouse (milliseconds)")
+    parser.add_argument("--db", type=Path, default=None, help="Database file (default: .run/results.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    slowest = commands.add_parser("slowest", help="Slowest tests by mean duration")
+    slowest.add_argument("--limit", type=int, default=20)
+    slowest.add_argument("--runs", type=int, default=30)
+    flaky_pages = commands.add_parser("flaky-pages", help="Flake rate by page object")
+    flaky_pages.add_argument("--runs", type=int, default=30)
+    trend = commands.add_parser("trend", help="Duration of a test per run")
+    trend.add_argument("test", help="Node id or part of it")
+    trend.add_argument("--runs", type=int, default=30)
+    visual = commands.add_parser("visual", help="Comparison time and prefilter hits per visual baseline")
+    visual.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    db = ResultsDB(args.db)
+    if args.command == "slowest":
+        _print_rows(db.slowest_tests(args.limit, args.runs),
+                    ["nodeid", "runs", "avg_ms", "max_ms", "avg_call_ms", "avg_commands"])
+    elif args.command == "flaky-pages":
+        rows = [dict(row, flake_rate=row["flake_rate"] * 100) for row in db.flake_rate_by_page_object(args.runs)]
+        _print_rows(rows, ["page_object", "executions", "flaky", "failed", "flake_rate"])
+    elif args.command == "visual":
+        _print_rows(db.visual_stats(args.runs),
+                    ["name", "comparisons", "avg_ms", "max_ms", "prefiltered_pct", "failed", "baseline_kb"])
+    else:
+        rows = [dict(row, started=time.strftime("%Y-%m-%d %H:%M", time.localtime(row["started_at"])))
+                for row in db.duration_trend(args.test, args.runs)]
+        _print_rows(rows, ["nodeid", "started", "outcome", "attempts", "setup_ms", "call_ms", "teardown_ms"])
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
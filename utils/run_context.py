@@ -0,0 +1,65 @@
+"""
+Run-wide context shared by the controller and all xdist workers
+
+The controller picks a run id in pytest_configure and exports it through the
+environment before workers are spawned, so every process of one pytest run
+agrees on the run id and on the shared artifacts directory.
+"""
+
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from config import settings
+
+RUN_ID_ENV = "ECOM_RUN_ID"
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def init_run_id() -> str:
+    """Create the run id once per pytest run (no-op in xdist workers)."""
+    return os.environ.setdefault(RUN_ID_ENV, uuid.uuid4().hex[:12])
+
+
+def run_id() -> str:
+    """Id of the current pytest run."""
+    return os.environ.get(RUN_ID_ENV) or init_run_id()
+
+
+def worker_id() -> str:
+    """xdist worker id ("gw0", "gw1", ...) or "master" when not distributed."""
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def worker_index() -> int:
+    """Numeric worker index (0 for "master" and "gw0")."""
+    worker = worker_id()
+    return int(worker[2:]) if worker.startswith("gw") else 0
+
+
+def artifacts_dir() -> Path:
+    """Directory for state kept across runs (user pool, histories, caches)."""
+    path = ROOT_DIR / settings.RUN_ARTIFACTS_DIR
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def run_dir() -> Path:
+    """Directory shared by all processes of the current run."""
+    path = artifacts_dir() / "runs" / run_id()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def prune_old_runs(keep: Optional[int] = None) -> None:
+    """Delete run directories beyond the newest `keep` runs."""
+    keep = settings.RUN_DIRS_TO_KEEP if keep is None else keep
+    runs_root = artifacts_dir() / "runs"
+    if not runs_root.exists():
+        return
+    runs = sorted(runs_root.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in runs[keep:]:
+        shutil.rmtree(old, ignore_errors=True)
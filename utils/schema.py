@@ -0,0 +1,263 @@
+"""
+Compiled JSON schema validation for API responses
+
+Schemas from data/schemas.py are compiled once per worker into nested
+closures, so validating a response is a walk over the document with no
+schema interpretation left. Array responses can be validated while they
+stream in: items are decoded one by one from response.iter_content(), so
+a long /api/products/ list never exists in memory as a whole.
+
+Usage:
+    assert_matches_schema(response, "basket")
+
+    response = session.get(API_ENDPOINTS["products"], stream=True)
+    count = assert_stream_matches_schema(response, "product_list")
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Callable, Iterator, List
+
+import requests
+
+from data.schemas import SCHEMAS
+
+MAX_REPORTED_ERRORS = 20
+
+# Characters that may follow a complete item of a streamed JSON array
+_ITEM_DELIMITERS = " \t\r\n,]"
+
+Validator = Callable[[Any, str, List[str]], None]
+
+_TYPES = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+_FORMATS = {
+    "uri": re.compile(r"^https?://[^\s/$.?#][^\s]*$"),
+    "decimal": re.compile(r"^-?\d+\.\d+$"),
+}
+
+
+class SchemaValidationError(AssertionError):
+    """Raised when a response does not match its schema; lists every violation found."""
+
+    def __init__(self, schema_name: str, errors: List[str]):
+        self.errors = errors
+        shown = "\n".join(f"  {e}" for e in errors[:MAX_REPORTED_ERRORS])
+        more = f"\n  ... and {len(errors) - MAX_REPORTED_ERRORS} more" if len(errors) > MAX_REPORTED_ERRORS else ""
+        super().__init__(f"Response does not match schema '{schema_name}':\n{shown}{more}")
+
+
+def compile_schema(schema: dict) -> Validator:
+    """
+    Turn a schema into a function validate(value, path, errors) that appends violations to errors.
+
+    Raises:
+        ValueError: If the schema uses an unsupported keyword value
+    """
+    checks: List[Validator] = []
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+        checks.append(lambda v, p, e: v in allowed or e.append(f"{p}: {v!r} not one of {allowed}"))
+    if "pattern" in schema:
+        pattern = re.compile(schema["pattern"])
+        checks.append(lambda v, p, e: not isinstance(v, str) or pattern.search(v)
+                      or e.append(f"{p}: {v!r} does not match {pattern.pattern}"))
+    if "format" in schema:
+        if schema["format"] not in _FORMATS:
+            raise ValueError(f"Unsupported format: {schema['format']}")
+        fmt_name, fmt = schema["format"], _FORMATS[schema["format"]]
+        checks.append(lambda v, p, e: not isinstance(v, str) or fmt.match(v)
+                      or e.append(f"{p}: {v!r} is not a valid {fmt_name}"))
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+        checks.append(lambda v, p, e: not isinstance(v, str) or len(v) >= min_length
+                      or e.append(f"{p}: shorter than {min_length}"))
+    if "minimum" in schema:
+        minimum = schema["minimum"]
+        checks.append(lambda v, p, e: not isinstance(v, (int, float)) or v >= minimum
+                      or e.append(f"{p}: {v} is below {minimum}"))
+
+    if "properties" in schema or "required" in schema or schema.get("additionalProperties") is False:
+        properties = {name: compile_schema(sub) for name, sub in schema.get("properties", {}).items()}
+        required = tuple(schema.get("required", ()))
+        closed = schema.get("additionalProperties") is False
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}: missing required field '{name}'")
+            for name, item in value.items():
+                validator = properties.get(name)
+                if validator is not None:
+                    validator(item, f"{path}.{name}", errors)
+                elif closed:
+                    errors.append(f"{path}: unexpected field '{name}'")
+        checks.append(check_object)
+
+    if "items" in schema or "minItems" in schema:
+        items = compile_schema(schema["items"]) if "items" in schema else None
+        min_items = schema.get("minItems", 0)
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if len(value) < min_items:
+                errors.append(f"{path}: fewer than {min_items} items")
+            if items is not None:
+                for index, item in enumerate(value):
+                    items(item, f"{path}[{index}]", errors)
+        checks.append(check_array)
+
+    type_names = schema.get("type")
+    if type_names is None:
+        def validate(value, path, errors):
+            for check in checks:
+                check(value, path, errors)
+        return validate
+
+    type_names = [type_names] if isinstance(type_names, str) else list(type_names)
+    python_types = tuple(t for name in type_names for t in _TYPES[name])
+    reject_bool = "boolean" not in type_names  # bool is a subclass of int
+
+    def validate_typed(value, path, errors):
+        if not isinstance(value, python_types) or (reject_bool and isinstance(value, bool)):
+            errors.append(f"{path}: expected {'/'.join(type_names)}, got {type(value).__name__}")
+            return
+        for check in checks:
+            check(value, path, errors)
+    return validate_typed
+
+
+@lru_cache(maxsize=None)
+def validator_for(schema_name: str) -> Validator:
+    """Compiled validator for a schema in data/schemas.py, built once per worker."""
+    return compile_schema(SCHEMAS[schema_name])
+
+
+def validate(document: Any, schema_name: str) -> List[str]:
+    """All violations of a decoded document, empty if it matches."""
+    errors: List[str] = []
+    validator_for(schema_name)(document, "$", errors)
+    return errors
+
+
+def assert_matches_schema(response: requests.Response, schema_name: str) -> Any:
+    """
+    Validate a response body against a schema.
+
+    Returns:
+        Decoded JSON document
+
+    Raises:
+        SchemaValidationError: If the body does not match
+    """
+    try:
+        document = response.json()
+    except ValueError:
+        raise SchemaValidationError(schema_name, [f"$: body is not JSON: {response.text[:200]!r}"])
+    errors = validate(document, schema_name)
+    if errors:
+        raise SchemaValidationError(schema_name, errors)
+    return document
+
+
+def iter_json_array(response: requests.Response, chunk_size: int = 16384) -> Iterator[Any]:
+    """
+    Decode the items of a top-level JSON array one by one as the body arrives.
+
+    A paginated object ({"results": [...]}) is decoded whole and its results yielded.
+
+    Raises:
+        ValueError: If the body is not a JSON array or is truncated
+    """
+    decoder = json.JSONDecoder()
+    if response.encoding is None:
+        response.encoding = "utf-8"
+    chunks = response.iter_content(chunk_size=chunk_size, decode_unicode=True)
+
+    buffer = ""
+    position = 0
+    started = False
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            # skip whitespace and separators between items
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position >= len(buffer):
+                break
+            if not started:
+                if buffer[position] == "{":
+                    document = json.loads(buffer[position:] + "".join(chunks))
+                    yield from document.get("results", [])
+                    return
+                if buffer[position] != "[":
+                    raise ValueError(f"Expected a JSON array, got {buffer[position:position + 40]!r}")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # item not complete yet, wait for the next chunk
+            # A scalar is complete only once a delimiter follows it: "5" decodes from a
+            # buffer ending in "5." or "5e" and would be yielded before the rest arrives
+            if not isinstance(item, (dict, list)) and (end >= len(buffer) or buffer[end] not in _ITEM_DELIMITERS):
+                break
+            yield item
+            position = end
+        buffer = buffer[position:]
+        position = 0
+    raise ValueError("JSON array ended unexpectedly")
+
+
+def assert_stream_matches_schema(response: requests.Response, schema_name: str) -> int:
+    """
+    Validate an array response item by item while it streams in (request it with stream=True).
+
+    Returns:
+        Number of items validated
+
+    Raises:
+        SchemaValidationError: If any item (or the array itself) does not match
+    """
+    schema = SCHEMAS[schema_name]
+    if schema.get("type") != "array" or "items" not in schema:
+        raise ValueError(f"Schema '{schema_name}' is not an array schema")
+    item_validator = compile_item_validator(schema_name)
+
+    errors: List[str] = []
+    count = 0
+    try:
+        for count, item in enumerate(iter_json_array(response), start=1):
+            item_validator(item, f"$[{count - 1}]", errors)
+    except ValueError as e:
+        errors.append(f"$: {e}")
+    finally:
+        response.close()
+
+    if count < schema.get("minItems", 0):
+        errors.append(f"$: fewer than {schema['minItems']} items")
+    if errors:
+        raise SchemaValidationError(schema_name, errors)
+    return count
+
+
+@lru_cache(maxsize=None)
+def compile_item_validator(schema_name: str) -> Validator:
+    """Compiled validator for the items of an array schema."""
+    return compile_schema(SCHEMAS[schema_name]["items"])
@@ -0,0 +1,203 @@
+"""
+Failure screenshots, compressed off the test thread and deduplicated across reruns
+
+On a failed or rerun attempt the PNG is grabbed from the driver right away
+(the browser is gone after teardown) and handed to an encoder thread that
+converts it to SCREENSHOT_FORMAT (WebP, AVIF, or a 256-colour PNG). The
+encoded images are attached once the test's teardown is reported, so the
+encoding overlaps with driver.quit instead of delaying it.
+
+Every screenshot gets a 64-bit difference hash (dHash). One within
+SCREENSHOT_DEDUPE_DISTANCE bits of a screenshot already attached for the
+same test (an earlier attempt, or an earlier step frame) is not attached
+again, so a test failing the same way on every rerun keeps one image.
+
+With --step-screenshots N a screenshot is also taken after every top-level
+Allure step and the last N are kept in memory as raw PNGs; they are encoded
+and attached only when the test fails.
+"""
+
+import io
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+import allure
+import allure_commons
+import pytest
+from PIL import Image
+from selenium.common.exceptions import WebDriverException
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# SCREENSHOT_FORMAT -> (mime type, file extension)
+_FORMATS = {
+    "webp": ("image/webp", "webp"),
+    "avif": ("image/avif", "avif"),
+    "png": ("image/png", "png"),
+}
+
+
+class EncodedScreenshot(NamedTuple):
+    body: bytes
+    mime_type: str
+    extension: str
+    fingerprint: int
+    raw_size: int
+
+
+def dhash(image: Image.Image, size: int = 8) -> int:
+    """Difference hash: one bit per "brighter than its right neighbour" on a (size+1) x size grayscale thumbnail."""
+    pixels = image.convert("L").resize((size + 1, size), Image.Resampling.BILINEAR).tobytes()
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            offset = row * (size + 1) + col
+            bits = (bits << 1) | (pixels[offset] > pixels[offset + 1])
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def encode(png: bytes, image_format: Optional[str] = None) -> EncodedScreenshot:
+    """Re-encode a driver PNG to the configured format and fingerprint it."""
+    image_format = image_format or settings.SCREENSHOT_FORMAT
+    mime_type, extension = _FORMATS[image_format]
+    with Image.open(io.BytesIO(png)) as image:
+        image = image.convert("RGB")
+        fingerprint = dhash(image)
+        out = io.BytesIO()
+        if image_format == "png":
+            image.quantize(colors=256, method=Image.Quantize.FASTOCTREE).save(out, format="PNG", compress_level=6)
+        else:
+            image.save(out, format=image_format.upper(), quality=settings.SCREENSHOT_QUALITY)
+    return EncodedScreenshot(out.getvalue(), mime_type, extension, fingerprint, len(png))
+
+
+class _StepScreenshots:
+    """allure-commons hooks that keep a screenshot after every top-level step of the running test."""
+
+    def __init__(self, size: int):
+        self.frames: Deque[Tuple[str, bytes]] = deque(maxlen=size)
+        self.driver = None
+        self._titles: List[str] = []
+
+    def reset(self, driver=None) -> None:
+        self.frames.clear()
+        self._titles.clear()
+        self.driver = driver
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        self._titles.append(title)
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        title = self._titles.pop() if self._titles else ""
+        if self._titles or self.driver is None:
+            return
+        try:
+            self.frames.append((title, self.driver.get_screenshot_as_png()))
+        except WebDriverException:
+            pass
+
+
+class ScreenshotPlugin:
+    """
+    Pytest plugin taking screenshots of failed attempts and attaching them after teardown.
+
+    Attributes:
+        stats (Dict[str, int]): attached, deduplicated, raw_bytes and encoded_bytes of this process
+    """
+
+    def __init__(self, step_screenshots: int = 0):
+        self._executor = ThreadPoolExecutor(max_workers=settings.SCREENSHOT_ENCODE_WORKERS,
+                                            thread_name_prefix="screenshot")
+        self._pending: Dict[str, List[Tuple[str, bytes, Future]]] = {}
+        self._seen: Dict[str, List[Tuple[int, int]]] = {}
+        self.stats = dict.fromkeys(("attached", "deduplicated", "raw_bytes", "encoded_bytes"), 0)
+        self._steps = _StepScreenshots(step_screenshots) if step_screenshots else None
+        if self._steps is not None:
+            allure_commons.plugin_manager.register(self._steps)
+
+    def _submit(self, item: pytest.Item, name: str, png: bytes) -> None:
+        self._pending.setdefault(item.nodeid, []).append((name, png, self._executor.submit(encode, png)))
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_call(self, item: pytest.Item) -> None:
+        if self._steps is not None:
+            self._steps.reset(item.funcargs.get("browser"))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item: pytest.Item, call: pytest.CallInfo):
+        outcome = yield
+        report = outcome.get_result()
+        if report.when == "call" and report.outcome in ("failed", "rerun"):
+            self._capture(item)
+        elif report.when == "teardown":
+            self._attach(item)
+
+    def _capture(self, item: pytest.Item) -> None:
+        """
+        Grab the screenshots while the browser is still open; encoding happens in the background.
+
+        The failure screenshot goes first, so it is the one kept when step frames look the same.
+        """
+        browser = item.funcargs.get("browser")
+        if browser is not None:
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            try:
+                self._submit(item, f"screenshot_on_failure_{item.name}_{timestamp}", browser.get_screenshot_as_png())
+            except WebDriverException as e:
+                logger.warning(f"Could not take a failure screenshot of {item.nodeid}: {e.msg}")
+        if self._steps is not None:
+            frames = list(self._steps.frames)
+            for number, (title, png) in enumerate(frames, 1):
+                self._submit(item, f"step {number}/{len(frames)}: {title}", png)
+            self._steps.reset()
+
+    def _attach(self, item: pytest.Item) -> None:
+        """Attach the encoded screenshots of this attempt, skipping near-duplicates of ones already attached"""
+        pending = self._pending.pop(item.nodeid, [])
+        if not pending:
+            return
+        attempt = getattr(item, "execution_count", 1)
+        seen = self._seen.setdefault(item.nodeid, [])
+        duplicates = []
+        for name, png, future in pending:
+            try:
+                shot = future.result()
+            except Exception as e:
+                logger.warning(f"Could not encode screenshot '{name}', attaching the PNG: {e}")
+                allure.attach(png, name=name, attachment_type=allure.attachment_type.PNG)
+                continue
+            match = next((earlier for fingerprint, earlier in seen
+                          if hamming(fingerprint, shot.fingerprint) <= settings.SCREENSHOT_DEDUPE_DISTANCE), None)
+            if match is not None:
+                duplicates.append(f"{name} (same as attempt {match})")
+                continue
+            seen.append((shot.fingerprint, attempt))
+            allure.attach(shot.body, name=name, attachment_type=shot.mime_type, extension=shot.extension)
+            self.stats["attached"] += 1
+            self.stats["raw_bytes"] += shot.raw_size
+            self.stats["encoded_bytes"] += len(shot.body)
+        if duplicates:
+            self.stats["deduplicated"] += len(duplicates)
+            allure.attach("\n".join(duplicates), name=f"{len(duplicates)} near-identical screenshots not attached",
+                          attachment_type=allure.attachment_type.TEXT)
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        self._executor.shutdown(wait=True)
+        if self._steps is not None:
+            allure_commons.plugin_manager.unregister(self._steps)
+        if self.stats["attached"]:
+            logger.info(f"Screenshots: {self.stats['attached']} attached "
+                        f"({self.stats['raw_bytes'] / 1024:.0f} KB as PNG, "
+                        f"{self.stats['encoded_bytes'] / 1024:.0f} KB as {settings.SCREENSHOT_FORMAT}), "
+                        f"{self.stats['deduplicated']} near-duplicates skipped")
@@ -0,0 +1,282 @@
+"""
+Low-overhead Allure reporting for low-level helper steps
+
+BasePage helpers (is_element_present, click, send_keys, wait_for_*, ...)
+run hundreds of times per test. As Allure steps they make the result files
+large and deeply nested and cost time per call. helper_step replaces
+allure.step on them; business steps (page object actions, should_* checks)
+stay plain Allure steps.
+
+Modes (--helper-steps):
+    full       every helper call is an Allure step (the old behaviour)
+    collapsed  helper calls only go into a per-test ring buffer (default)
+    sampled    every HELPER_STEP_SAMPLE_EVERY-th helper call is an Allure step,
+               the others go into the ring buffer
+
+The ring buffer keeps the last HELPER_STEP_BUFFER_SIZE helper calls with
+duration and error, plus attachments deferred with attach_detail(). It is
+attached to the test only when the test fails, so passing tests cost one
+deque append per helper call.
+
+Benchmark of result size and reporting time per mode:
+    python -m utils.step_reporting --tests 20 --calls 500
+"""
+
+import argparse
+import functools
+import inspect
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import allure
+import pytest
+
+from config import settings
+
+MODES = ("full", "collapsed", "sampled")
+
+
+def _format_title(title: str, func: Optional[Callable], args: Tuple, kwargs: Dict) -> str:
+    """Fill the step title from the call arguments the way allure.step does, but only when needed."""
+    if func is None:
+        return title
+    try:
+        arguments = inspect.signature(func).bind(*args, **kwargs).arguments
+        return title.format(**arguments)
+    except (TypeError, KeyError, IndexError, ValueError):
+        return title
+
+
+class HelperStepBuffer:
+    """
+    Per-process helper step mode and ring buffer of the running test.
+
+    Attributes:
+        mode (str): One of MODES
+        calls (Deque): Last helper calls: (title, func, args, kwargs, duration_ms, error)
+        attachments (Deque): Deferred attachments: (body, name, attachment_type)
+        total (int): Helper calls of the running test, including ones that fell out of the buffer
+    """
+
+    def __init__(self):
+        self.mode = "full"
+        self.calls: Deque[Tuple] = deque(maxlen=settings.HELPER_STEP_BUFFER_SIZE)
+        self.attachments: Deque[Tuple] = deque(maxlen=settings.HELPER_STEP_BUFFER_SIZE)
+        self.total = 0
+        self._sample_counter = 0
+
+    def configure(self, mode: str) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown helper step mode '{mode}', expected one of {MODES}")
+        if settings.HELPER_STEP_SAMPLE_EVERY < 1:
+            raise ValueError(f"HELPER_STEP_SAMPLE_EVERY must be at least 1, got {settings.HELPER_STEP_SAMPLE_EVERY}")
+        self.mode = mode
+
+    def reset(self) -> None:
+        self.calls.clear()
+        self.attachments.clear()
+        self.total = 0
+
+    def report_next(self) -> bool:
+        """Whether the next helper call becomes a real Allure step."""
+        if self.mode == "full":
+            return True
+        if self.mode == "collapsed":
+            return False
+        self._sample_counter += 1
+        return (self._sample_counter - 1) % settings.HELPER_STEP_SAMPLE_EVERY == 0
+
+    def record(self, title: str, func: Optional[Callable], args: Tuple, kwargs: Dict,
+               started_ns: int, error: Optional[BaseException]) -> None:
+        self.total += 1
+        self.calls.append((title, func, args, kwargs, (time.perf_counter_ns() - started_ns) / 1e6,
+                           f"{type(error).__name__}: {error}" if error is not None else None))
+
+    def attach(self, body: Any, name: str, attachment_type: Any) -> None:
+        if self.mode == "full":
+            allure.attach(body, name=name, attachment_type=attachment_type)
+        else:
+            self.attachments.append((body, name, attachment_type))
+
+    def dump(self) -> None:
+        """Attach the buffered helper calls and deferred attachments to the current test."""
+        if self.calls:
+            skipped = self.total - len(self.calls)
+            lines = [f"... {skipped} earlier helper calls not kept"] if skipped else []
+            for title, func, args, kwargs, duration_ms, error in self.calls:
+                line = f"{duration_ms:9.1f} ms  {_format_title(title, func, args, kwargs)}"
+                lines.append(f"{line}  FAILED {error}" if error else line)
+            allure.attach("\n".join(lines), name=f"Helper steps (last {len(self.calls)} of {self.total})",
+                          attachment_type=allure.attachment_type.TEXT)
+        for body, name, attachment_type in self.attachments:
+            allure.attach(body, name=name, attachment_type=attachment_type)
+        self.reset()
+
+
+helper_steps = HelperStepBuffer()
+
+
+class helper_step:
+    """
+    allure.step for low-level helpers; usable as decorator or context manager.
+
+    Usage:
+        @helper_step("Click on element: {locator}")
+        def click(self, locator, timeout=None): ...
+
+        with helper_step(f"Case: {case['name']}"):
+            ...
+    """
+
+    def __init__(self, title: str):
+        self.title = title
+        self._step = None
+        self._started_ns = 0
+
+    def __call__(self, func: Callable) -> Callable:
+        title = self.title
+        stepped = allure.step(title)(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if helper_steps.report_next():
+                return stepped(*args, **kwargs)
+            started = time.perf_counter_ns()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                helper_steps.record(title, func, args, kwargs, started, e)
+                raise
+            helper_steps.record(title, func, args, kwargs, started, None)
+            return result
+
+        return wrapper
+
+    def __enter__(self):
+        if helper_steps.report_next():
+            self._step = allure.step(self.title)
+            return self._step.__enter__()
+        self._started_ns = time.perf_counter_ns()
+        return None
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._step is not None:
+            step, self._step = self._step, None
+            return step.__exit__(exc_type, exc_val, exc_tb)
+        helper_steps.record(self.title, None, (), {}, self._started_ns, exc_val)
+        return False
+
+
+def attach_detail(body: Any, name: str, attachment_type: Any = allure.attachment_type.TEXT) -> None:
+    """allure.attach for evidence only needed when the test fails (deferred unless mode is full)."""
+    helper_steps.attach(body, name, attachment_type)
+
+
+class HelperStepPlugin:
+    """Pytest plugin that resets the ring buffer per test and attaches it when the test fails."""
+
+    def __init__(self, mode: str):
+        helper_steps.configure(mode)
+        self._failed = False
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item: pytest.Item) -> None:
+        helper_steps.reset()
+        self._failed = False
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item: pytest.Item, call: pytest.CallInfo):
+        """Dump after teardown, so attachments deferred by fixture teardowns are included."""
+        outcome = yield
+        report = outcome.get_result()
+        self._failed = self._failed or report.outcome in ("failed", "rerun")
+        if report.when != "teardown":
+            return
+        item.user_properties.append(("helper_steps", helper_steps.total))
+        if self._failed:
+            helper_steps.dump()
+        helper_steps.reset()
+
+
+# ---- benchmark ----
+_BENCHMARK_TEST = '''
+import allure
+import pytest
+from utils.step_reporting import attach_detail, helper_step
+
+
+@helper_step("Check element: {{locator}}")
+def check(locator, timeout=None):
+    return True
+
+
+@pytest.mark.parametrize("test", range({tests}))
+def test_helpers(test):
+    with allure.step(f"Business step {{test}}"):
+        for n in range({calls}):
+            check(("css selector", f"#item-{{n}}"))
+        attach_detail("x" * 2000, name="Response body")
+    assert test != 0, "one failing test to include the ring buffer dump"
+'''
+
+_BENCHMARK_CONFTEST = '''
+import os
+from utils.step_reporting import HelperStepPlugin
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(HelperStepPlugin(os.environ["HELPER_STEPS_MODE"]))
+'''
+
+
+def _run_benchmark(tests: int, calls: int) -> None:
+    root = Path(__file__).resolve().parent.parent
+    work = Path(tempfile.mkdtemp(prefix="helper_steps_"))
+    (work / "test_bench.py").write_text(textwrap.dedent(_BENCHMARK_TEST.format(tests=tests, calls=calls)))
+    (work / "conftest.py").write_text(_BENCHMARK_CONFTEST)
+    (work / "pytest.ini").write_text("[pytest]\n")
+
+    rows = []
+    # the first run pays for imports and bytecode compilation, so it is not measured
+    for mode in ("no allure", "no allure") + MODES:
+        results = work / f"allure-{mode.replace(' ', '-')}"
+        command = [sys.executable, "-m", "pytest", str(work / "test_bench.py"), "-q", "-p", "no:cacheprovider",
+                   "-p", "no:xdist", "--rootdir", str(work)]
+        if mode != "no allure":
+            command += ["--alluredir", str(results)]
+        env = {**os.environ, "PYTHONPATH": str(root),
+               "HELPER_STEPS_MODE": "collapsed" if mode == "no allure" else mode}
+        started = time.perf_counter()
+        subprocess.run(command, cwd=work, env=env, capture_output=True)
+        elapsed = time.perf_counter() - started
+        files = list(results.glob("*")) if results.exists() else []
+        rows.append((mode, elapsed, sum(f.stat().st_size for f in files), len(files)))
+
+    rows = rows[1:]
+    baseline = rows[0][1]
+    print(f"{tests} tests x {calls} helper calls")
+    print(f"{'mode':<12} {'seconds':>8} {'reporting s':>12} {'result KB':>10} {'files':>6}")
+    for mode, elapsed, size, count in rows:
+        print(f"{mode:<12} {elapsed:>8.2f} {elapsed - baseline:>12.2f} {size / 1024:>10.0f} {count:>6}")
+    shutil.rmtree(work, ignore_errors=True)
+
+
+def _main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Allure result size and time per helper step mode")
+    parser.add_argument("--tests", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=500, help="Helper calls per test")
+    args = parser.parse_args()
+    _run_benchmark(args.tests, args.calls)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
@@ -0,0 +1,342 @@
+"""
+Local stand-in for the shop API
+
+A small in-memory imitation of the django-oscar API endpoints used by the
+suite (login, basket, products, checkout) plus the paginated catalogue
+listing and product pages, so load, crawler and sweep tooling can run in
+CI without touching selenium1py.pythonanywhere.com.
+
+Usage:
+    python -m utils.stub_server --port 8001 --latency-ms 20
+
+    with StubServer() as server:
+        server.base_url   # http://127.0.0.1:<free port>
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+PRODUCTS = [
+    {"id": product_id, "title": title, "slug": slug, "price": price, "num_in_stock": stock}
+    for product_id, title, slug, price, stock in [
+        (209, "The shellcoder's handbook", "the-shellcoders-handbook", "9.99", 20),
+        (207, "Coders at Work", "coders-at-work", "19.99", 20),
+        (208, "Hacking Exposed Wireless", "hacking-exposed-wireless", "15.99", 20),
+        (95, "The City and the Stars", "the-city-and-the-stars", "10.99", 20),
+    ]
+]
+
+CATALOGUE_PAGE_SIZE = 2
+
+
+class _ShopState:
+    """Baskets per session, shared by all handler threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.baskets: Dict[str, Dict] = {}
+        self.users: Dict[str, str] = {}
+        self.orders = 0
+
+    def basket_for(self, session_key: str) -> Dict:
+        with self.lock:
+            if session_key not in self.baskets:
+                self.baskets[session_key] = {"id": len(self.baskets) + 1, "lines": []}
+            return self.baskets[session_key]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_StubHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    # ---- plumbing ----
+    def _session_key(self) -> Tuple[str, bool]:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        if "sessionid" in cookie:
+            return cookie["sessionid"].value, False
+        return uuid.uuid4().hex, True
+
+    def _read_json(self) -> Dict:
+        try:
+            return json.loads(self._body) if self._body else {}
+        except ValueError:
+            return {}
+
+    def _send(self, status: int, body=None, extra_headers: Optional[Dict[str, str]] = None) -> None:
+        if self.server.latency_ms:
+            time.sleep(random.uniform(0.5, 1.5) * self.server.latency_ms / 1000)
+        payload = b"" if body is None else json.dumps(body).encode()
+        extra_headers = dict(extra_headers or {})
+        if self.command == "GET" and status == 200:
+            etag = '"%s"' % hashlib.sha1(payload).hexdigest()[:16]
+            extra_headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                status, payload = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in extra_headers.items():
+            self.send_header(name, value)
+        if self._new_session:
+            self.send_header("Set-Cookie", f"sessionid={self._session}; Path=/")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_html(self, status: int, page: str) -> None:
+        payload = page.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _url(self, path: str) -> str:
+        return f"{self.server.base_url}{path}"
+
+    def _dispatch(self, method: str) -> None:
+        self._session, self._new_session = self._session_key()
+        # Always consume the body so the next request on a keep-alive connection starts cleanly
+        self._body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = urlparse(self.path).path
+        for route_method, pattern, handler in _ROUTES:
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match:
+                return handler(self, *match.groups())
+        self._send(404, {"detail": "Not found."})
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    # ---- API ----
+    def _basket_json(self) -> Dict:
+        basket = self.server.state.basket_for(self._session)
+        total = sum(float(line["price"]) * line["quantity"] for line in basket["lines"])
+        return {
+            "id": basket["id"],
+            "url": self._url(f"/api/baskets/{basket['id']}/"),
+            "lines": self._url(f"/api/baskets/{basket['id']}/lines/"),
+            "total_excl_tax": f"{total:.2f}",
+            "currency": "GBP",
+        }
+
+    def login(self):
+        data = self._read_json()
+        if not data.get("username") or not data.get("password"):
+            return self._send(401, {"non_field_errors": ["This field may not be blank."]})
+        known = self.server.state.users.setdefault(data["username"], data["password"])
+        if known != data["password"]:
+            return self._send(401, {"non_field_errors": ["Invalid login details."]})
+        self._send(200, None)
+
+    def logout(self):
+        with self.server.state.lock:
+            self.server.state.baskets.pop(self._session, None)
+        self._send(204)
+
+    def basket(self):
+        self._send(200, self._basket_json())
+
+    def basket_lines(self, basket_id):
+        basket = self.server.state.basket_for(self._session)
+        self._send(200, [
+            {"url": self._url(f"/api/baskets/{basket_id}/lines/{n}/"), "product": line["product"],
+             "quantity": line["quantity"], "price_excl_tax": line["price"]}
+            for n, line in enumerate(basket["lines"], start=1)
+        ])
+
+    def add_product(self):
+        data = self._read_json()
+        match = re.search(r"/api/products/(\d+)/", data.get("url", ""))
+        product = _product(int(match.group(1))) if match else None
+        if product is None:
+            return self._send(406, {"reason": "Product not found"})
+        basket = self.server.state.basket_for(self._session)
+        with self.server.state.lock:
+            basket["lines"].append({"product": data["url"], "quantity": int(data.get("quantity", 1)),
+                                    "price": product["price"]})
+        self._send(200, self._basket_json())
+
+    def add_voucher(self):
+        data = self._read_json()
+        self._send(406, {"reason": f"Voucher {data.get('vouchercode', '')!r} is not valid"})
+
+    def shipping_methods(self):
+        self._send(200, [{"code": "free-shipping", "name": "Free shipping",
+                          "price": {"currency": "GBP", "excl_tax": "0.00", "incl_tax": "0.00"}}])
+
+    def products(self):
+        self._send(200, [_product_json(self, p) for p in PRODUCTS])
+
+    def product(self, product_id):
+        product = _product(int(product_id))
+        if product is None:
+            return self._send(404, {"detail": "Not found."})
+        self._send(200, _product_json(self, product))
+
+    def product_price(self, product_id):
+        product = _product(int(product_id))
+        if product is None:
+            return self._send(404, {"detail": "Not found."})
+        self._send(200, {"currency": "GBP", "excl_tax": product["price"], "incl_tax": product["price"]})
+
+    def product_availability(self, product_id):
+        product = _product(int(product_id))
+        if product is None:
+            return self._send(404, {"detail": "Not found."})
+        self._send(200, {"is_available_to_buy": product["num_in_stock"] > 0,
+                         "num_available": product["num_in_stock"]})
+
+    def countries(self):
+        self._send(200, [{"url": self._url("/api/countries/GB/"), "iso_3166_1_a2": "GB",
+                          "printable_name": "United Kingdom"}])
+
+    def options(self):
+        self._send(200, [])
+
+    def checkout(self):
+        basket = self.server.state.basket_for(self._session)
+        if not basket["lines"]:
+            return self._send(406, {"non_field_errors": ["Cannot checkout with empty basket"]})
+        with self.server.state.lock:
+            self.server.state.orders += 1
+            number = 100000 + self.server.state.orders
+            basket["lines"] = []
+        self._send(200, {"number": str(number), "status": "new", "url": self._url(f"/api/orders/{number}/")})
+
+    def orders(self):
+        self._send(200, [])
+
+    # ---- HTML ----
+    def catalogue(self):
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query.get("page", ["1"])[0])
+        pages = max((len(PRODUCTS) + CATALOGUE_PAGE_SIZE - 1) // CATALOGUE_PAGE_SIZE, 1)
+        if not 1 <= page <= pages:
+            return self._send_html(404, "<h1>Not found</h1>")
+        cards = "".join(
+            f'<article class="product_pod"><h3><a href="/catalogue/{p["slug"]}_{p["id"]}/" '
+            f'title="{html.escape(p["title"])}">{html.escape(p["title"])}</a></h3>'
+            f'<div class="product_price"><p class="price_color">\u00a3{p["price"]}</p>'
+            f'<p class="instock availability"><i class="icon-ok"></i> In stock</p></div></article>'
+            for p in PRODUCTS[(page - 1) * CATALOGUE_PAGE_SIZE:page * CATALOGUE_PAGE_SIZE]
+        )
+        pager = f'<li class="current">Page {page} of {pages}</li>'
+        if page < pages:
+            pager += f'<li class="next"><a href="?page={page + 1}">next</a></li>'
+        self._send_html(200, f"<html><body><ol class='row'>{cards}</ol><ul class='pager'>{pager}</ul></body></html>")
+
+    def product_page(self, slug, product_id):
+        product = _product(int(product_id))
+        if product is None or product["slug"] != slug:
+            return self._send_html(404, "<h1>Not found</h1>")
+        self._send_html(200, (
+            f'<html><body><div class="col-sm-6 product_main"><h1>{html.escape(product["title"])}</h1>'
+            f'<p class="price_color">\u00a3{product["price"]}</p></div>'
+            f'<form><button type="submit" class="btn btn-lg btn-primary btn-add-to-basket">Add to basket</button>'
+            f'</form></body></html>'
+        ))
+
+
+def _product(product_id: int) -> Optional[Dict]:
+    return next((p for p in PRODUCTS if p["id"] == product_id), None)
+
+
+def _product_json(handler: _Handler, product: Dict) -> Dict:
+    api = handler._url(f"/api/products/{product['id']}/")
+    return {"id": product["id"], "url": api, "title": product["title"],
+            "price": api + "price/", "availability": api + "availability/"}
+
+
+_ROUTES: List[Tuple[str, str, Callable]] = [
+    ("POST", r"/api/login/", _Handler.login),
+    ("DELETE", r"/api/login/", _Handler.logout),
+    ("GET", r"/api/basket/", _Handler.basket),
+    ("POST", r"/api/basket/add-product/", _Handler.add_product),
+    ("POST", r"/api/basket/add-voucher/", _Handler.add_voucher),
+    ("GET", r"/api/basket/shipping-methods/", _Handler.shipping_methods),
+    ("GET", r"/api/baskets/(\d+)/lines/", _Handler.basket_lines),
+    ("GET", r"/api/products/", _Handler.products),
+    ("GET", r"/api/products/(\d+)/", _Handler.product),
+    ("GET", r"/api/products/(\d+)/price/", _Handler.product_price),
+    ("GET", r"/api/products/(\d+)/availability/", _Handler.product_availability),
+    ("GET", r"/api/countries/", _Handler.countries),
+    ("GET", r"/api/options/", _Handler.options),
+    ("POST", r"/api/checkout/", _Handler.checkout),
+    ("GET", r"/api/orders/", _Handler.orders),
+    ("GET", r"/catalogue/", _Handler.catalogue),
+    ("GET", r"/catalogue/([\w-]+)_(\d+)/", _Handler.product_page),
+]
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms: float):
+        super().__init__(address, _Handler)
+        self.state = _ShopState()
+        self.latency_ms = latency_ms
+        self.base_url = f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+class StubServer:
+    """
+    Runs the stand-in shop in a background thread.
+
+    Attributes:
+        base_url (str): Root URL to use instead of settings.BASE_URL
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0):
+        self._server = _StubHTTPServer((host, port), latency_ms)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self.base_url = self._server.base_url
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the local stand-in shop API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Average artificial response delay")
+    args = parser.parse_args()
+
+    server = _StubHTTPServer((args.host, args.port), args.latency_ms)
+    print(f"Stub shop API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,216 @@
+"""
+Span timing in Chrome trace-event format
+
+With --timeline every test is split into spans measured with
+perf_counter_ns:
+
+- the test, its setup/call/teardown phases
+- every fixture setup and teardown (browser startup, driver binary
+  resolution, user pool lease, ...)
+- BasePage.open and every wait_for_* call
+- every allure.step (login, add to basket, ...)
+
+Spans nest by time on the thread that ran them, so the trace shows the
+same tree as the test code. Each test gets its spans attached to Allure as
+a trace; each xdist worker writes its spans to the run directory and the
+controller merges them into one timeline.json with one process per worker.
+Open it in chrome://tracing or https://ui.perfetto.dev.
+
+Usage:
+    with tracer.span("ChromeDriverManager.install", "browser"):
+        ...
+
+    @traced
+    def wait_for_visibility(self, locator, timeout=None): ...
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import allure
+import allure_commons
+import pytest
+
+from utils.run_context import run_dir, worker_id, worker_index
+
+
+class Tracer:
+    """
+    Collects complete ("ph": "X") trace events of this process.
+
+    Timestamps are perf_counter_ns shifted to wall-clock microseconds, so
+    events from different workers line up in one timeline.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict] = []
+        self._offset_ns = time.time_ns() - time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._thread_ids: Dict[int, int] = {}
+
+    def _tid(self) -> int:
+        ident = threading.get_ident()
+        if ident not in self._thread_ids:
+            self._thread_ids[ident] = len(self._thread_ids) + 1
+        return self._thread_ids[ident]
+
+    def now_us(self) -> float:
+        return (time.perf_counter_ns() + self._offset_ns) / 1000
+
+    def add(self, name: str, category: str, start_us: float, end_us: float, args: Optional[Dict] = None) -> None:
+        """Record a finished span."""
+        if not self.enabled:
+            return
+        event = {"name": name, "cat": category, "ph": "X", "ts": start_us, "dur": end_us - start_us,
+                 "pid": worker_index() + 1, "tid": self._tid()}
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, category: str = "code", **args) -> Iterator[None]:
+        """Time the block as one span."""
+        if not self.enabled:
+            yield
+            return
+        start = self.now_us()
+        try:
+            yield
+        finally:
+            self.add(name, category, start, self.now_us(), {k: str(v) for k, v in args.items()} or None)
+
+    def events_since(self, start_us: float) -> List[Dict]:
+        with self._lock:
+            return [event for event in self.events if event["ts"] >= start_us]
+
+    def metadata(self) -> List[Dict]:
+        """Process and thread names shown by the trace viewer."""
+        pid = worker_index() + 1
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": worker_id()}}]
+        events += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                    "args": {"name": "main" if tid == 1 else f"thread-{tid}"}}
+                   for tid in self._thread_ids.values()]
+        return events
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            events = self.metadata() + self.events
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
+
+
+tracer = Tracer()
+
+
+def traced(func: Callable) -> Callable:
+    """Record every call of a page object method as a span named Class.method."""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not tracer.enabled:
+            return func(self, *args, **kwargs)
+        with tracer.span(f"{type(self).__name__}.{func.__name__}", "page", **({"args": args} if args else {})):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
+class _AllureStepSpans:
+    """allure-commons hooks that turn every allure.step into a span."""
+
+    def __init__(self):
+        self._started: Dict[str, tuple] = {}
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        self._started[uuid] = (title, tracer.now_us())
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        title, start = self._started.pop(uuid, (None, None))
+        if title is not None:
+            tracer.add(title, "step", start, tracer.now_us(), {"error": exc_type.__name__} if exc_type else None)
+
+
+def merge_timelines(directory: Path, target: Path) -> int:
+    """Merge the per-worker trace files into one; returns the number of spans."""
+    events = []
+    for part in sorted(directory.glob("*.json")):
+        events += json.loads(part.read_text(encoding="utf-8"))["traceEvents"]
+    target.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
+    return sum(event["ph"] == "X" for event in events)
+
+
+class TimelinePlugin:
+    """Pytest plugin recording test, phase and fixture spans and exporting the run timeline."""
+
+    def __init__(self):
+        tracer.enabled = True
+        self._step_spans = _AllureStepSpans()
+        allure_commons.plugin_manager.register(self._step_spans)
+        self._test_start: Dict[str, float] = {}
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item, nextitem):
+        start = self._test_start[item.nodeid] = tracer.now_us()
+        yield
+        tracer.add(item.nodeid, "test", start, tracer.now_us())
+        del self._test_start[item.nodeid]
+
+    def _phase(self, item: pytest.Item, phase: str):
+        start = tracer.now_us()
+        yield
+        tracer.add(phase, "phase", start, tracer.now_us(), {"test": item.nodeid})
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item: pytest.Item):
+        yield from self._phase(item, "setup")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item):
+        yield from self._phase(item, "call")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item: pytest.Item):
+        yield from self._phase(item, "teardown")
+        allure.attach(json.dumps({"traceEvents": tracer.metadata() + tracer.events_since(self._test_start[item.nodeid]),
+                                  "displayTimeUnit": "ms"}),
+                      name="Timeline (chrome://tracing)", attachment_type=allure.attachment_type.JSON)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        """Span the fixture setup; register a finalizer that starts the teardown span."""
+        start = tracer.now_us()
+        yield
+        tracer.add(fixturedef.argname, "fixture", start, tracer.now_us(), {"scope": fixturedef.scope})
+        # finalizers run last-in first-out, so this one runs right before the fixture's own teardown
+        fixturedef.addfinalizer(lambda: setattr(fixturedef, "_teardown_started_us", tracer.now_us()))
+
+    def pytest_fixture_post_finalizer(self, fixturedef, request):
+        """Called after all of the fixture's finalizers: ends the teardown span."""
+        start = getattr(fixturedef, "_teardown_started_us", None)
+        if start is not None:
+            tracer.add(f"{fixturedef.argname} (teardown)", "fixture", start, tracer.now_us(),
+                       {"scope": fixturedef.scope})
+            del fixturedef._teardown_started_us
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Every process writes its spans; the controller merges them into timeline.json"""
+        if tracer.events:
+            tracer.write(run_dir() / "timeline" / f"{worker_id()}-{os.getpid()}.json")
+        allure_commons.plugin_manager.unregister(self._step_spans)
+        if hasattr(session.config, "workerinput"):
+            return
+        self.spans = merge_timelines(run_dir() / "timeline", run_dir() / "timeline.json")
+
+    def pytest_terminal_summary(self, terminalreporter, config) -> None:
+        if not hasattr(config, "workerinput") and getattr(self, "spans", 0):
+            terminalreporter.write_sep("=", "Timeline")
+            terminalreporter.write_line(f"{self.spans} spans in {run_dir() / 'timeline.json'} "
+                                        f"(open in chrome://tracing or ui.perfetto.dev)")
@@ -0,0 +1,198 @@
+"""
+Pre-provisioned test user pool
+
+Accounts are registered in bulk once and reused across runs. During a run
+each test leases one account exclusively (lease files in the shared run
+directory), so xdist workers never share a user and never collide on the
+same basket. On release the account's basket is emptied before the lease
+is dropped.
+
+Only tests that are about registration should create users inline; every
+other test that needs a logged-in user takes one from the pool:
+
+    def test_something(browser, pooled_user):
+        login_page.login_user(pooled_user["email"], pooled_user["password"])
+"""
+
+import json
+import logging
+import re
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import settings
+from data.api_endpoints import API_ENDPOINTS
+from data.data_manager import data_manager
+from utils.api_timing import timed_session
+from utils.file_lock import FileLock
+from utils.run_context import worker_id
+
+logger = logging.getLogger(__name__)
+
+_CSRF_INPUT_PATTERN = re.compile(r'name=["\']csrfmiddlewaretoken["\'] value=["\']([^"\']+)["\']')
+
+
+class UserPoolExhausted(TimeoutError):
+    """Raised when no pooled user becomes free within the lease timeout."""
+
+
+def extract_csrf_token(page_html: str) -> Optional[str]:
+    """csrfmiddlewaretoken value of the first form on a page, None if there is none."""
+    match = _CSRF_INPUT_PATTERN.search(page_html)
+    return match.group(1) if match else None
+
+
+def register_account(email: str, password: str) -> bool:
+    """
+    Register one account through the registration form over HTTP.
+
+    Args:
+        email: New account email
+        password: New account password
+
+    Returns:
+        True if the site logged the new user in after registration
+    """
+    with timed_session() as session:
+        page = session.get(settings.LOGIN_URL, timeout=settings.PAGE_LOAD_TIMEOUT)
+        token = extract_csrf_token(page.text)
+        if not token:
+            logger.error("No CSRF token on registration page %s", page.url)
+            return False
+
+        response = session.post(page.url, data={
+            "csrfmiddlewaretoken": token,
+            "registration-email": email,
+            "registration-password1": password,
+            "registration-password2": password,
+            "registration_submit": "Register",
+        }, headers={"Referer": page.url}, timeout=settings.PAGE_LOAD_TIMEOUT)
+
+        registered = response.ok and "sessionid" in session.cookies
+        if not registered:
+            logger.error("Registration of %s failed with status %s", email, response.status_code)
+        return registered
+
+
+def reset_account(user: Dict[str, str]) -> None:
+    """Empty the account's basket over the API so the next lease starts clean."""
+    with timed_session() as session:
+        login = session.post(API_ENDPOINTS["login"], json={
+            "username": user["username"],
+            "password": user["password"]
+        }, timeout=settings.PAGE_LOAD_TIMEOUT)
+        if login.status_code != 200:
+            logger.warning("Could not log in %s to reset state: %s", user["email"], login.status_code)
+            return
+
+        headers = {"X-CSRFToken": session.cookies.get("csrftoken", ""), "Referer": settings.BASE_URL}
+        basket = session.get(API_ENDPOINTS["basket"], timeout=settings.PAGE_LOAD_TIMEOUT).json()
+        lines_url = basket.get("lines")
+        if lines_url:
+            for line in session.get(lines_url, timeout=settings.PAGE_LOAD_TIMEOUT).json():
+                session.delete(line["url"], headers=headers, timeout=settings.PAGE_LOAD_TIMEOUT)
+
+        session.delete(API_ENDPOINTS["login"], headers=headers, timeout=settings.PAGE_LOAD_TIMEOUT)
+        logger.debug("Reset state of pooled user %s", user["email"])
+
+
+class UserPool:
+    """
+    Pool of registered accounts leased one per test.
+
+    Attributes:
+        pool_file (Path): JSON file with provisioned accounts, kept across runs
+        lease_dir (Path): Directory with one lease file per leased account
+        size (int): Number of accounts the pool should contain
+    """
+
+    def __init__(self, pool_file: Path, lease_dir: Path, size: int = settings.USER_POOL_SIZE):
+        self.pool_file = Path(pool_file)
+        self.lease_dir = Path(lease_dir)
+        self.size = size
+        self._users: List[Dict[str, str]] = []
+
+    def _read_accounts(self) -> List[Dict[str, str]]:
+        if not self.pool_file.exists():
+            return []
+        with open(self.pool_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get(settings.BASE_URL, [])
+
+    def _write_accounts(self, users: List[Dict[str, str]]) -> None:
+        data = {}
+        if self.pool_file.exists():
+            with open(self.pool_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        data[settings.BASE_URL] = users
+        with open(self.pool_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    def provision(self) -> "UserPool":
+        """
+        Make sure the pool holds `size` accounts, registering missing ones in bulk.
+
+        The first worker to get here registers the accounts; the others wait
+        on the lock and then read the finished pool.
+        """
+        with FileLock(self.pool_file.with_suffix(".lock"), timeout=settings.USER_POOL_PROVISION_TIMEOUT):
+            users = self._read_accounts()
+            missing = self.size - len(users)
+            if missing > 0:
+                password = data_manager.strong_passwords[0]
+                candidates = []
+                for _ in range(missing):
+                    email = data_manager.generate_unique_email(prefix="pool")
+                    candidates.append({"email": email, "username": email, "password": password})
+
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=min(missing, 8)) as executor:
+                    results = list(executor.map(lambda u: register_account(u["email"], u["password"]), candidates))
+
+                users.extend(user for user, ok in zip(candidates, results) if ok)
+                self._write_accounts(users)
+                logger.info("Registered %d/%d pool accounts in %.1fs",
+                            sum(results), missing, time.perf_counter() - start)
+
+        self._users = users
+        if not self._users:
+            raise UserPoolExhausted("User pool is empty - account provisioning failed")
+        return self
+
+    def lease(self, timeout: float = settings.USER_POOL_LEASE_TIMEOUT) -> Dict[str, str]:
+        """
+        Lease a free account exclusively for the calling test.
+
+        Raises:
+            UserPoolExhausted: If every account stays leased for `timeout` seconds
+        """
+        # Start scanning at a worker-specific offset so workers rarely contend on one file
+        offset = zlib.crc32(worker_id().encode()) % len(self._users)
+        order = self._users[offset:] + self._users[:offset]
+
+        deadline = time.monotonic() + timeout
+        while True:
+            for user in order:
+                if self._lock_for(user).try_acquire():
+                    logger.info("Leased pooled user %s", user["email"])
+                    return dict(user)
+            if time.monotonic() >= deadline:
+                raise UserPoolExhausted(f"No free pooled user within {timeout}s (pool size {len(self._users)})")
+            time.sleep(0.2)
+
+    def release(self, user: Dict[str, str], reset: bool = True) -> None:
+        """Reset the account's state and return it to the pool."""
+        try:
+            if reset:
+                reset_account(user)
+        except Exception as e:
+            logger.warning("Resetting pooled user %s failed: %s", user["email"], e)
+        finally:
+            self._lock_for(user).release()
+            logger.info("Released pooled user %s", user["email"])
+
+    def _lock_for(self, user: Dict[str, str]) -> FileLock:
+        name = zlib.crc32(user["email"].encode())
+        return FileLock(self.lease_dir / f"{name}.lease", stale_after=None)
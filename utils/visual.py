@@ -0,0 +1,208 @@
+"""
+Visual regression checks against stored baselines
+
+BasePage.should_match_visual_baseline() screenshots the page or one element
+and compares it with data/visual_baselines/<browser>-<width>x<height>/<name>.png:
+
+1. Masked regions (dynamic content such as basket totals or messages) are
+   blanked in both images.
+2. Prefilter: index.json keeps a digest of the baseline's masked pixels
+   and its 64-bit perceptual hash (DCT of a 32x32 grayscale thumbnail).
+   An equal digest means the page did not change: the baseline is not even
+   decoded. The perceptual hash alone is not trusted to skip the diff, it
+   does not see small layout shifts; its distance is reported with the diff.
+3. Otherwise a vectorized NumPy diff marks pixels whose largest channel
+   difference is above VISUAL_PIXEL_TOLERANCE. The check fails when more
+   than VISUAL_MAX_DIFF_RATIO of the unmasked pixels changed.
+
+Baselines are reviewed and committed. The visual tests are opt-in
+(--visual), since baselines only hold for the browser and window size they
+were taken with. A missing baseline fails the check; with
+--update-baselines every compared baseline (missing or not) is written
+from the current screenshot instead. Comparison time, prefilter hits and
+baseline size are recorded per test in the results database:
+
+    python -m utils.results_db visual --runs 30
+"""
+
+import hashlib
+import io
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from config import settings
+from utils.file_lock import FileLock
+
+# (x, y, width, height) in screenshot pixels
+Region = Tuple[int, int, int, int]
+
+_HASH_SIZE = 8
+_THUMBNAIL_SIZE = 32
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    return np.cos(np.pi * (2 * n + 1) * k / (2 * size))
+
+
+_DCT = _dct_matrix(_THUMBNAIL_SIZE)
+
+
+def to_array(png: bytes) -> np.ndarray:
+    """Decode a PNG into an (height, width, 3) uint8 array."""
+    with Image.open(io.BytesIO(png)) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def region_mask(shape: Tuple[int, ...], regions: Sequence[Region]) -> np.ndarray:
+    """Boolean (height, width) mask that is True inside the regions."""
+    mask = np.zeros(shape[:2], dtype=bool)
+    for x, y, width, height in regions:
+        mask[max(y, 0):max(y + height, 0), max(x, 0):max(x + width, 0)] = True
+    return mask
+
+
+def phash(pixels: np.ndarray) -> int:
+    """Perceptual hash: signs of the low-frequency DCT coefficients of a grayscale thumbnail against their median."""
+    gray = Image.fromarray(pixels).convert("L").resize((_THUMBNAIL_SIZE, _THUMBNAIL_SIZE), Image.Resampling.BOX)
+    coefficients = (_DCT @ np.asarray(gray, dtype=np.float64) @ _DCT.T)[:_HASH_SIZE, :_HASH_SIZE].flatten()
+    bits = coefficients[1:] > np.median(coefficients[1:])
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def changed_pixels(actual: np.ndarray, baseline: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Pixels outside the mask whose largest channel difference is above VISUAL_PIXEL_TOLERANCE."""
+    # max - min stays in uint8 (no widened copies); per-channel ORs are much faster than max(axis=2)
+    delta = np.maximum(actual, baseline)
+    delta -= np.minimum(actual, baseline)
+    tolerance = settings.VISUAL_PIXEL_TOLERANCE
+    changed = delta[..., 0] > tolerance
+    changed |= delta[..., 1] > tolerance
+    changed |= delta[..., 2] > tolerance
+    changed &= ~mask
+    return changed
+
+
+def diff_image(actual: np.ndarray, changed: np.ndarray) -> bytes:
+    """PNG of the actual screenshot faded to a third, with changed pixels in red."""
+    overlay = (actual // 3 + 170).astype(np.uint8)
+    overlay[changed] = (255, 0, 0)
+    out = io.BytesIO()
+    Image.fromarray(overlay).save(out, format="PNG")
+    return out.getvalue()
+
+
+class VisualResult(NamedTuple):
+    name: str
+    passed: bool
+    message: str
+    diff_ratio: float
+    compare_ms: float
+    prefiltered: bool
+    baseline_bytes: int
+    diff_png: Optional[bytes] = None
+    missing: bool = False
+
+
+class VisualBaselines:
+    """
+    Baseline PNGs per browser and window size, with their perceptual hashes in index.json.
+
+    Attributes:
+        root (Path): Baseline directory (VISUAL_BASELINE_DIR)
+        update (bool): Overwrite baselines with the current screenshots (--update-baselines)
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or settings.VISUAL_BASELINE_DIR)
+        self.update = False
+
+    def directory(self, browser_name: str) -> Path:
+        """Baselines of the browser at the configured window size."""
+        return self.root / f"{browser_name}-{settings.WINDOW_WIDTH}x{settings.WINDOW_HEIGHT}"
+
+    @staticmethod
+    def _index(directory: Path) -> Dict[str, Dict]:
+        try:
+            return json.loads((directory / "index.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _store(directory: Path, name: str, png: bytes, digest: str, fingerprint: int) -> int:
+        """Write the baseline and its hash; xdist workers share the index, so it is updated under a lock."""
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{name}.png").write_bytes(png)
+        with FileLock(directory / "index.lock", timeout=30):
+            index = VisualBaselines._index(directory)
+            index[name] = {"digest": digest, "phash": f"{fingerprint:016x}", "bytes": len(png),
+                           "updated_at": time.time()}
+            (directory / "index.json").write_text(json.dumps(index, indent=2, sort_keys=True), encoding="utf-8")
+        return len(png)
+
+    def compare(self, browser_name: str, name: str, png: bytes, masks: Sequence[Region] = ()) -> VisualResult:
+        """Compare a screenshot with the browser's baseline `name`, ignoring the masked regions."""
+        started = time.perf_counter()
+        actual = to_array(png)
+        mask = region_mask(actual.shape, masks)
+        masked = actual.copy()
+        masked[mask] = 0
+        digest = hashlib.blake2b(masked.tobytes(), digest_size=16).hexdigest()
+
+        def result(passed: bool, message: str, ratio: float = 0.0, prefiltered: bool = False,
+                   baseline_bytes: int = 0, diff_png: Optional[bytes] = None, missing: bool = False) -> VisualResult:
+            return VisualResult(name, passed, message, ratio, (time.perf_counter() - started) * 1000,
+                                prefiltered, baseline_bytes, diff_png, missing)
+
+        directory = self.directory(browser_name)
+        baseline_path = directory / f"{name}.png"
+        if self.update:
+            size = self._store(directory, name, png, digest, phash(masked))
+            return result(True, f"Baseline '{name}' written to {baseline_path}", baseline_bytes=size)
+        entry = self._index(directory).get(name)
+        if entry is None or not baseline_path.exists():
+            return result(False, f"No baseline at {baseline_path}; create it with --update-baselines, "
+                                 f"review it and commit it", 1.0, missing=True)
+
+        if entry["digest"] == digest:
+            return result(True, "Unchanged", prefiltered=True, baseline_bytes=entry["bytes"])
+
+        baseline = to_array(baseline_path.read_bytes())
+        if baseline.shape != actual.shape:
+            return result(False, f"Size changed from {baseline.shape[1]}x{baseline.shape[0]} "
+                                 f"to {actual.shape[1]}x{actual.shape[0]}", 1.0, baseline_bytes=entry["bytes"])
+        changed = changed_pixels(actual, baseline, mask)
+        ratio = float(changed.sum()) / max(int((~mask).sum()), 1)
+        passed = ratio <= settings.VISUAL_MAX_DIFF_RATIO
+        distance = bin(int(entry["phash"], 16) ^ phash(masked)).count("1")
+        return result(passed, f"{ratio:.3%} of pixels changed (allowed {settings.VISUAL_MAX_DIFF_RATIO:.3%}), "
+                              f"perceptual hash distance {distance}/{_HASH_SIZE ** 2 - 1}",
+                      ratio, baseline_bytes=entry["bytes"], diff_png=None if passed else diff_image(actual, changed))
+
+    def storage_bytes(self) -> int:
+        """Size of all stored baseline images."""
+        return sum(path.stat().st_size for path in self.root.rglob("*.png"))
+
+
+visual_baselines = VisualBaselines()
+
+
+def element_regions(browser, elements: List, origin=None) -> List[Region]:
+    """Screenshot-pixel regions of elements, relative to the viewport or to the `origin` element."""
+    script = ("var r = arguments[0].getBoundingClientRect(); "
+              "return [r.left, r.top, r.width, r.height, window.devicePixelRatio];")
+    offset_x = offset_y = 0.0
+    if origin is not None:
+        offset_x, offset_y = browser.execute_script(script, origin)[:2]
+    regions = []
+    for element in elements:
+        left, top, width, height, ratio = browser.execute_script(script, element)
+        regions.append((int((left - offset_x) * ratio), int((top - offset_y) * ratio),
+                        int(width * ratio) + 1, int(height * ratio) + 1))
+    return regions